@@ -1,30 +1,170 @@
 """
 Authentication middleware and utilities
 """
-from fastapi import HTTPException, Security, status, Depends
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+import httpx
+from fastapi import HTTPException, Request, Security, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
 from app.core.config import settings
-from supabase import create_client, Client
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-security = HTTPBearer(auto_error=not settings.DEV_MODE)  # Don't auto-error in dev mode
+# supabase and jose are imported on first use to keep them off the import path
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
 
-_supabase_client: Optional[Client] = None
+class _DevModeBearer(HTTPBearer):
+    """HTTPBearer that reads DEV_MODE per request rather than when auth is imported"""
 
-def get_supabase_client() -> Client:
+    @property
+    def auto_error(self) -> bool:
+        return not settings.DEV_MODE  # Don't auto-error in dev mode
+
+    @auto_error.setter
+    def auto_error(self, value: bool):
+        pass  # Set by HTTPBearer.__init__; DEV_MODE decides
+
+security = _DevModeBearer(scheme_name="HTTPBearer")
+
+_supabase_client: Optional["Client"] = None
+_async_supabase_client: Optional["AsyncClient"] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_async_client_lock = asyncio.Lock()
+
+def get_supabase_client() -> "Client":
     """Get Supabase client instance (Singleton)"""
     global _supabase_client
     if _supabase_client is None:
+        from supabase import create_client
         _supabase_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
     return _supabase_client
 
-async def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Security(security)) -> dict:
+async def get_async_supabase_client() -> "AsyncClient":
+    """Get async Supabase client instance (Singleton) on a pooled HTTP connection pool"""
+    global _async_supabase_client, _async_http_client
+    if _async_supabase_client is None:
+        async with _async_client_lock:
+            if _async_supabase_client is None:
+                from supabase import acreate_client, AsyncClientOptions
+                _async_http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.SUPABASE_POOL_SIZE,
+                        max_keepalive_connections=settings.SUPABASE_POOL_SIZE
+                    ),
+                    timeout=httpx.Timeout(settings.SUPABASE_TIMEOUT_SECONDS)
+                )
+                _async_supabase_client = await acreate_client(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_SERVICE_KEY,
+                    options=AsyncClientOptions(httpx_client=_async_http_client)
+                )
+    return _async_supabase_client
+
+async def get_async_http_client() -> httpx.AsyncClient:
+    """The pooled HTTP client behind the async Supabase client (for raw streaming requests)"""
+    await get_async_supabase_client()
+    return _async_http_client
+
+async def close_async_supabase_client():
+    """Release pooled connections (app shutdown)"""
+    global _async_supabase_client, _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+    _async_supabase_client = None
+    _async_http_client = None
+
+class TokenCache:
+    """
+    Verified JWT claims keyed by the token's SHA-256, so a token is decoded
+    once rather than on every request. Entries expire at the token's own
+    `exp`, and the least recently used entries are evicted past `max_size`.
+    """
+
+    def __init__(self, max_size: int, default_ttl: int):
+        self.max_size = max_size
+        self.default_ttl = default_ttl  # For tokens without an exp claim
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user_data, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_data
+
+    def set(self, token: str, user_data: dict, exp: Optional[float]):
+        expires_at = float(exp) if exp else time.time() + self.default_ttl
+        key = self.key(token)
+        self._entries[key] = (user_data, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions
+        }
+
+
+_token_cache: Optional[TokenCache] = None
+
+def get_token_cache() -> TokenCache:
+    """Get the verified-token cache (Singleton)"""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+    return _token_cache
+
+def token_cache_stats() -> Dict[str, int]:
+    return get_token_cache().stats()
+
+async def verify_token(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(security)
+) -> dict:
     """
     Verify Supabase JWT token
     Returns user data if valid
     In DEV_MODE, returns a test user if no credentials provided
+    Resolved once per request (kept on request.state) and cached per token
+    until it expires.
     """
+    # Already resolved for this request (e.g. by another dependency)
+    user_data = getattr(request.state, "user", None)
+    if user_data is not None:
+        return user_data
+
+    user_data = _resolve_user(credentials)
+    request.state.user = user_data
+    return user_data
+
+def _resolve_user(credentials: Optional[HTTPAuthorizationCredentials]) -> dict:
     # Development Mode
     if settings.DEV_MODE:
         # Use a REAL user ID that exists in the database to satisfy Foreign Key constraints
@@ -46,7 +186,12 @@ async def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Sec
         )
     
     token = credentials.credentials
+
+    cached = get_token_cache().get(token)
+    if cached is not None:
+        return dict(cached)
     
+    from jose import jwt, JWTError  # First uncached token per worker pays for the import
     try:
         # Decode JWT token
         payload = jwt.decode(
@@ -63,11 +208,13 @@ async def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Sec
                 detail="Invalid authentication credentials"
             )
         
-        return {
+        user_data = {
             "user_id": user_id,
             "email": payload.get("email"),
             "role": payload.get("role", "user")
         }
+        get_token_cache().set(token, user_data, payload.get("exp"))
+        return user_data
         
     except JWTError as e:
         if settings.DEV_MODE:
@@ -85,3 +232,22 @@ async def verify_token(credentials: Optional[HTTPAuthorizationCredentials] = Sec
 async def get_current_user(user_data: dict = Security(verify_token)) -> dict:
     """Dependency to get current authenticated user"""
     return user_data
+
+def is_admin(user: dict) -> bool:
+    return settings.DEV_MODE or user.get("role") == "admin" or user["user_id"] in settings.ADMIN_USER_IDS
+
+def resolve_authorization(authorization: Optional[str]) -> dict:
+    """User for a raw Authorization header, outside dependency injection (e.g. in middleware)"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return _resolve_user(None)
+    return _resolve_user(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+
+async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """Dependency for operator-only routes"""
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
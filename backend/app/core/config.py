@@ -2,7 +2,7 @@
 Core configuration settings
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional, cast
 
 class Settings(BaseSettings):
     # API Settings
@@ -17,28 +17,105 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str
     SUPABASE_JWT_SECRET: str
     
+    # Admin endpoints (/api/admin): user ids allowed in addition to tokens with role "admin"
+    ADMIN_USER_IDS: List[str] = []
+    
+    # Tracing (OpenTelemetry): none | otlp | json
+    TRACING_EXPORTER: str = "none"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_JSON_PATH: str = ".cache/traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+    TRACING_SERVICE_NAME: str = "studycopilot-api"
+    
+    # Request profiling (pyinstrument, speedscope output per route); off unless one of the first two is set
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled
+    PROFILING_ADMIN_HEADER: bool = False  # Admins can profile a request with "X-Profile: 1"
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = ".cache/profiles"
+    PROFILING_MAX_PER_ROUTE: int = 50
+    
+    # Verified-token cache (per worker)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300  # Only for tokens without an exp claim
+    
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    OPENAI_BASE_URL: Optional[str] = None  # OpenAI-compatible endpoint (e.g. benchmarks.fake_openai)
     
     # Development Mode
     DEV_MODE: bool = False
     
     # Database
     DATABASE_URL: str = ""
+    SUPABASE_POOL_SIZE: int = 50  # Pooled HTTP connections per worker for the async client
+    SUPABASE_TIMEOUT_SECONDS: float = 30.0
     
     # File Upload
-    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_SIZE: int = 200 * 1024 * 1024  # 200MB (uploads and downloads are streamed)
+    STORAGE_SPOOL_MAX_MEMORY: int = 8 * 1024 * 1024  # Larger PDFs spill to a temp file and are mmapped
+    STORAGE_CHUNK_SIZE: int = 1024 * 1024
     ALLOWED_EXTENSIONS: List[str] = [".pdf"]
     
+    # Document deletion (soft delete + background sweeper)
+    DOCUMENT_SWEEP_INTERVAL_SECONDS: float = 30.0
+    DOCUMENT_SWEEP_BATCH_SIZE: int = 20  # Documents per sweep pass
+    CHUNK_DELETE_BATCH_SIZE: int = 1000  # Chunk rows per DELETE statement
+    
     # RAG Settings
     CHUNK_SIZE: int = 800 # Reduced chunk size for more granular retrieval
     CHUNK_OVERLAP: int = 100
     TOP_K_RESULTS: int = 20 # Increased from 5 to 20 for broader context
+    SEARCH_THRESHOLDS: List[float] = [0.4, 0.2, 0.1] # Similarity cut-offs tried in order until a search returns chunks
+    EMBEDDING_BATCH_SIZE: int = 100 # Chunks per embeddings request (progress is reported per batch)
+    
+    PROGRESS_PERSIST_SECONDS: float = 1.0 # Min interval between progress counter writes to documents
+    
+    # Progress stream: with no events for this long, re-check status once (other worker may own the job)
+    PROGRESS_STREAM_FALLBACK_SECONDS: float = 15.0
+    
+    # LLM Scheduler (per worker, per model)
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200000
+    
+    # Chat write-behind (session/message rows are written in background batches)
+    CHAT_WRITE_FLUSH_MS: int = 200
+    CHAT_WRITE_BATCH_SIZE: int = 500
+    CHAT_WRITE_MAX_PENDING: int = 50000
+    
+    # LLM Response Cache (SQLite, shared by workers on one host)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = ".cache/llm_cache.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB
+    # Opt-in per route: route -> TTL in seconds (0 = no expiry). Unlisted routes are never cached.
+    # Off by default: every cacheable route samples (temperature 0.5-1), so caching one replays
+    # its first sample to every user with the same input until the TTL expires.
+    # Worth it where identical inputs are common and one good answer is enough
+    # (e.g. {"summary": 0} for a shared course PDF); not where users expect a fresh take.
+    LLM_CACHE_ROUTES: Dict[str, int] = {}
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+_settings: Optional[Settings] = None
+
+def get_settings() -> Settings:
+    """Get Settings instance (Singleton), read from the environment and .env on first call"""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+class _LazySettings:
+    """Stands in for the Settings instance until an attribute is first read,
+    so importing a module doesn't validate the environment"""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+settings = cast(Settings, _LazySettings())
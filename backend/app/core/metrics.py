@@ -0,0 +1,224 @@
+"""
+Prometheus metrics
+
+Served at /metrics. With several uvicorn/gunicorn workers, set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers (before
+they start); each worker writes its samples there and /metrics aggregates
+them with the multiprocess collector. Without it, /metrics reports the
+worker that served the scrape.
+
+Request metrics come from MetricsMiddleware, LLM metrics from the scheduler,
+stage durations from the pipeline timing store. Values the app already
+counts elsewhere (cache hits, queue depths, buffer sizes) are copied in by
+a sampler task that also measures event-loop lag.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    REGISTRY, generate_latest, multiprocess
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+SAMPLE_INTERVAL_SECONDS = 1.0
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency (until the response body is sent)",
+    ["method", "route", "status"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being handled", multiprocess_mode="livesum"
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Delay of a timer callback past its deadline",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+)
+
+INGESTION_JOBS = Gauge(
+    "ingestion_jobs_in_progress", "Documents being processed", multiprocess_mode="livesum"
+)
+INGESTION_STAGE_DURATION = Histogram(
+    "ingestion_stage_duration_seconds", "Duration of each ingestion stage",
+    ["stage"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+)
+
+LLM_QUEUE_DEPTH = Gauge(
+    "llm_scheduler_queue_depth", "Calls waiting for rate-limit capacity",
+    ["model"], multiprocess_mode="livesum"
+)
+LLM_CALL_LATENCY = Histogram(
+    "llm_call_duration_seconds", "LLM/embedding call latency after admission",
+    ["model", "priority", "outcome"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120]
+)
+LLM_TOKENS = Counter(
+    "llm_tokens", "Tokens reported by the API", ["model", "priority"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Cache lookups by result", ["cache", "result"]
+)
+CHAT_WRITE_PENDING = Gauge(
+    "chat_write_buffer_pending", "Chat rows waiting to be written", multiprocess_mode="livesum"
+)
+PROGRESS_SUBSCRIBERS = Gauge(
+    "progress_stream_subscribers", "Open document progress streams", multiprocess_mode="livesum"
+)
+
+
+def observe_llm_call(model: str, priority: str, seconds: float, tokens: Optional[int], outcome: str):
+    LLM_CALL_LATENCY.labels(model, priority, outcome).observe(seconds)
+    if tokens:
+        LLM_TOKENS.labels(model, priority).inc(tokens)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition text for /metrics (aggregated across workers in multiprocess mode)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    """Drop this worker's live gauges from the shared directory (worker shutdown)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Route template for the request ("/api/documents/{document_id}/status").
+    Routes of included routers only know their path relative to the prefix,
+    so the prefix is recovered from the part of the URL the route did not match.
+    """
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path"):
+        return "unmatched"
+    try:
+        matched = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return route.path
+    path = scope["path"]
+    prefix = path[:len(path) - len(matched)] if path.endswith(matched) else ""
+    return prefix + route.path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times each request until its body has been sent
+    (so streaming responses are measured end to end) and labels it with the
+    route template rather than the raw path.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                route_template(scope),
+                str(status["code"])
+            ).observe(time.perf_counter() - start)
+
+
+class MetricsSampler:
+    """Measures event-loop lag and copies in-process stats into metrics"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_counts: Dict[Tuple[str, str], int] = {}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - deadline))
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️ [Metrics] Sampling failed: {e}")
+
+    def _count(self, cache: str, result: str, total: int):
+        """Turn a running total kept elsewhere into counter increments"""
+        key = (cache, result)
+        delta = total - self._last_counts.get(key, 0)
+        if delta > 0:
+            CACHE_REQUESTS.labels(cache, result).inc(delta)
+        self._last_counts[key] = total
+
+    def sample(self):
+        from app.core.auth import token_cache_stats
+        from app.services.llm_cache import _llm_cache
+        from app.services.llm_scheduler import _schedulers
+        from app.services.single_flight import single_flight_stats
+        from app.services.chat_writer import _chat_writer
+        from app.services.progress import _progress_bus
+
+        for model, scheduler in _schedulers.items():
+            LLM_QUEUE_DEPTH.labels(model).set(scheduler.queue_depth)
+
+        tokens = token_cache_stats()
+        self._count("auth_token", "hit", tokens["hits"])
+        self._count("auth_token", "miss", tokens["misses"])
+
+        if _llm_cache is not None:
+            self._count("llm_response", "hit", _llm_cache.hits)
+            self._count("llm_response", "miss", _llm_cache.misses)
+
+        for name, stats in single_flight_stats().items():
+            self._count(f"single_flight_{name}", "hit", stats["coalesced"])
+            self._count(f"single_flight_{name}", "miss", stats["executed"])
+
+        if _chat_writer is not None:
+            CHAT_WRITE_PENDING.set(_chat_writer.pending)
+        if _progress_bus is not None:
+            PROGRESS_SUBSCRIBERS.set(_progress_bus.stats()["subscribers"])
+
+
+_metrics_sampler: Optional[MetricsSampler] = None
+
+def get_metrics_sampler() -> MetricsSampler:
+    """Get metrics sampler instance (Singleton per worker)"""
+    global _metrics_sampler
+    if _metrics_sampler is None:
+        _metrics_sampler = MetricsSampler()
+    return _metrics_sampler
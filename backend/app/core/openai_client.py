@@ -0,0 +1,28 @@
+"""
+Shared OpenAI client
+
+The openai package is the largest import in the app (~0.5s), so it is
+imported when the first client is created rather than when app.main loads.
+"""
+from typing import TYPE_CHECKING, Optional
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+_openai_client: Optional["AsyncOpenAI"] = None
+
+def get_openai_client() -> "AsyncOpenAI":
+    """Get AsyncOpenAI client instance (Singleton, one connection pool per worker)"""
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+    return _openai_client
+
+async def close_openai_client():
+    """Release pooled connections (app shutdown)"""
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+    _openai_client = None
@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination on (updated_at, id)
+
+Lists are ordered newest first by (updated_at DESC, id DESC). The cursor is
+an opaque token holding the last row's sort key, so each page is an index
+range scan instead of an OFFSET. List endpoints keep returning plain arrays;
+the cursor for the next page is sent in the X-Next-Cursor response header.
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Query, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after: Optional[Tuple[str, str]]  # (updated_at, id) of the last row already seen
+
+
+def encode_cursor(row: dict, sort_field: str = "updated_at") -> str:
+    raw = json.dumps([row[sort_field], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    (timestamp, id) from a cursor, re-serialized from a parsed ISO timestamp
+    and UUID: the values go into PostgREST filter strings, so nothing else may
+    pass. Raises ValueError for anything that isn't such a pair.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    if not isinstance(key, list) or len(key) != 2 or not all(isinstance(v, str) for v in key):
+        raise ValueError("Cursor is not a [timestamp, id] pair")
+    timestamp, row_id = key
+    return datetime.fromisoformat(timestamp).isoformat(), str(uuid.UUID(row_id))
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Decode a client-supplied cursor; 400 if it was tampered with"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+) -> PageParams:
+    """FastAPI dependency for ?limit=&cursor="""
+    return PageParams(limit=limit, after=parse_cursor(cursor))
+
+
+def apply_keyset(query, page: PageParams):
+    """Order newest first and continue after the cursor; fetches one extra row to detect more"""
+    if page.after:
+        updated_at, row_id = page.after
+        query = query.or_(
+            f'updated_at.lt."{updated_at}",and(updated_at.eq."{updated_at}",id.lt.{row_id})'
+        )
+    return query\
+        .order("updated_at", desc=True)\
+        .order("id", desc=True)\
+        .limit(page.limit + 1)
+
+
+def split_page(rows: List[dict], page: PageParams) -> Tuple[List[dict], Optional[str]]:
+    """Trim the look-ahead row and build the next cursor"""
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,164 @@
+"""
+Opt-in request profiling
+
+ProfilingMiddleware runs selected requests under pyinstrument, a sampling
+profiler that follows the request's coroutine across awaits: CPU time shows
+up under the Python frames that spent it (regex, JSON, pydantic), time spent
+waiting on the database, OpenAI or storage as [await] frames. Each profile is
+written as speedscope JSON (a flamegraph at https://www.speedscope.app) to
+PROFILING_DIR/<route>/, keeping the newest PROFILING_MAX_PER_ROUTE per route.
+The response names it in X-Profile-Id; /api/admin/profiles lists and serves
+the files of the worker's host.
+
+A request is profiled when
+  - it sends "X-Profile: 1" with an admin token (PROFILING_ADMIN_HEADER), or
+  - it is sampled at PROFILING_SAMPLE_RATE.
+
+Both are off by default, and then the middleware is not installed at all
+(profiling_middleware decides when the middleware stack is built);
+pyinstrument is imported when the first request is profiled.
+"""
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import route_template
+
+PROFILE_REQUEST_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SUFFIX = ".speedscope.json"
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def profiling_enabled() -> bool:
+    return settings.PROFILING_SAMPLE_RATE > 0 or settings.PROFILING_ADMIN_HEADER
+
+
+def route_slug(method: str, route: str) -> str:
+    """Directory name for a route ("POST /api/chat/query" -> "POST_api_chat_query")"""
+    return re.sub(r"[^A-Za-z0-9]+", "_", f"{method} {route}").strip("_")
+
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles per route, newest first"""
+    routes = []
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return routes
+    for slug in sorted(os.listdir(settings.PROFILING_DIR)):
+        directory = os.path.join(settings.PROFILING_DIR, slug)
+        if not os.path.isdir(directory):
+            continue
+        files = []
+        for name in sorted(os.listdir(directory), reverse=True):
+            if name.endswith(PROFILE_SUFFIX):
+                stat = os.stat(os.path.join(directory, name))
+                files.append({"id": name[:-len(PROFILE_SUFFIX)], "bytes": stat.st_size, "created_at": stat.st_mtime})
+        routes.append({"route": slug, "profiles": files})
+    return routes
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile (ids are unique across routes), or None"""
+    if not _NAME_PATTERN.match(profile_id) or not os.path.isdir(settings.PROFILING_DIR):
+        return None
+    for slug in os.listdir(settings.PROFILING_DIR):
+        path = os.path.join(settings.PROFILING_DIR, slug, profile_id + PROFILE_SUFFIX)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _write_profile(profiler, directory: str, name: str):
+    """Render and store one profile, then prune the route's oldest (runs in a thread)"""
+    from pyinstrument.renderers import SpeedscopeRenderer
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + PROFILE_SUFFIX)
+    with open(path + ".part", "w", encoding="utf-8") as f:
+        f.write(profiler.output(renderer=SpeedscopeRenderer()))
+    os.replace(path + ".part", path)
+
+    stored = sorted(n for n in os.listdir(directory) if n.endswith(PROFILE_SUFFIX))
+    for old in stored[:-settings.PROFILING_MAX_PER_ROUTE]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            pass  # Another worker pruned it first
+
+
+def profiling_middleware(app: ASGIApp) -> ASGIApp:
+    """Middleware factory: ProfilingMiddleware when enabled, otherwise the app itself"""
+    return ProfilingMiddleware(app) if profiling_enabled() else app
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware: profiles a request from the first byte in until its
+    body has been sent. The profile is rendered and written off the event loop
+    after the response is complete.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._unavailable = False
+
+    def _requested_by_admin(self, headers: Headers) -> bool:
+        if not settings.PROFILING_ADMIN_HEADER or headers.get(PROFILE_REQUEST_HEADER) != "1":
+            return False
+        from app.core.auth import is_admin, resolve_authorization
+        try:
+            return is_admin(resolve_authorization(headers.get("authorization")))
+        except Exception:
+            return False  # The route's own auth dependency answers bad tokens
+
+    def _selected(self, scope: Scope) -> bool:
+        if self._unavailable:
+            return False
+        if self._requested_by_admin(Headers(scope=scope)):
+            return True
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            self._unavailable = True
+            print("⚠️ [Profiling] pyinstrument is not installed; profiling disabled")
+            await self.app(scope, receive, send)
+            return
+
+        # Named before the response starts so the header can carry it (the
+        # route directory is only known once the router has run)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.lower().encode(), name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_MS / 1000, async_mode="enabled")
+        profiler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            slug = route_slug(scope["method"], route_template(scope))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            directory = os.path.join(settings.PROFILING_DIR, slug)
+            try:
+                await asyncio.to_thread(_write_profile, profiler, directory, name)
+                print(f"🔬 [Profiling] {scope['method']} {scope['path']} ({elapsed_ms:.0f} ms) -> {slug}/{name}{PROFILE_SUFFIX}")
+            except Exception as e:
+                print(f"⚠️ [Profiling] Could not store profile: {e}")
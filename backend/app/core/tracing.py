@@ -0,0 +1,75 @@
+"""
+OpenTelemetry tracing
+
+Code creates spans through the OpenTelemetry API (`tracer` below). Until
+init_tracing() installs an SDK provider those spans are no-ops, so tracing
+costs nothing when TRACING_EXPORTER is "none". Exporters:
+  - "otlp": OTLP/HTTP to a collector (TRACING_OTLP_ENDPOINT)
+  - "json": one JSON span per line appended to TRACING_JSON_PATH
+"""
+import os
+import threading
+from typing import Sequence
+from opentelemetry import trace
+from app.core.config import settings
+
+tracer = trace.get_tracer("studycopilot")
+
+
+def _json_file_exporter(path: str):
+    from opentelemetry.sdk.trace import ReadableSpan
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonFileSpanExporter(SpanExporter):
+        def __init__(self):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+            lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+    return JsonFileSpanExporter()
+
+
+def init_tracing():
+    """Install the SDK tracer provider for the configured exporter (call once at startup)"""
+    exporter_name = settings.TRACING_EXPORTER.lower()
+    if exporter_name == "none":
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    elif exporter_name == "json":
+        exporter = _json_file_exporter(settings.TRACING_JSON_PATH)
+    else:
+        print(f"⚠️ [Tracing] Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}', tracing disabled")
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBasedTraceIdRatio(settings.TRACING_SAMPLE_RATIO)
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    print(f"🔭 [Tracing] Exporting spans via {exporter_name}")
+
+
+def shutdown_tracing():
+    """Flush buffered spans (app shutdown)"""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
@@ -0,0 +1,15 @@
+-- Incremental chat history
+-- Messages are read in (created_at, id) order after a `since` cursor.
+-- Sources are stored as chunk references ({chunk_id, similarity, page});
+-- the UPDATE strips chunk text from messages saved before that change.
+
+CREATE INDEX IF NOT EXISTS chat_messages_session_created_idx
+    ON chat_messages (session_id, created_at, id);
+
+UPDATE chat_messages
+SET sources = (
+    SELECT jsonb_agg(source - 'text')
+    FROM jsonb_array_elements(sources) AS source
+)
+WHERE jsonb_typeof(sources) = 'array'
+    AND jsonb_path_exists(sources, '$[*].text');
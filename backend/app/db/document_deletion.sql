@@ -0,0 +1,33 @@
+-- Soft delete for documents
+-- DELETE /api/documents/{id} and the bulk endpoint only set deleted_at; the
+-- API's background sweeper removes storage objects, then chunks in batches,
+-- then the row itself.
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+
+-- Sweeper queue (small: only rows waiting to be purged)
+CREATE INDEX IF NOT EXISTS documents_deleted_at_idx
+    ON documents (deleted_at)
+    WHERE deleted_at IS NOT NULL;
+
+-- Delete at most p_batch_size chunks of a document; returns rows deleted
+CREATE OR REPLACE FUNCTION purge_document_chunks(
+    p_document_id uuid,
+    p_batch_size int
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deleted_count int;
+BEGIN
+    DELETE FROM document_chunks
+    WHERE id IN (
+        SELECT id FROM document_chunks
+        WHERE document_id = p_document_id
+        LIMIT p_batch_size
+    );
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$;
@@ -0,0 +1,26 @@
+-- Processing progress counters on documents
+-- Maintained by the ingestion pipeline so the status endpoint is a single
+-- primary-key read instead of COUNT(*) over document_chunks.
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS stage TEXT NOT NULL DEFAULT 'queued';
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS pages_extracted INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_total INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_embedded INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_stored INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS error_message TEXT;
+
+-- Backfill documents processed before the counters existed
+UPDATE documents
+SET stage = documents.status,
+    pages_extracted = COALESCE(documents.page_count, 0),
+    chunks_total = counts.chunk_count,
+    chunks_embedded = counts.chunk_count,
+    chunks_stored = counts.chunk_count
+FROM (
+    SELECT d.id, COUNT(c.id) AS chunk_count
+    FROM documents d
+    LEFT JOIN document_chunks c ON c.document_id = d.id
+    WHERE d.stage = 'queued' AND d.status IN ('ready', 'failed')
+    GROUP BY d.id
+) counts
+WHERE documents.id = counts.id;
@@ -0,0 +1,18 @@
+-- Indexes for keyset pagination of list endpoints
+-- Lists are ordered by (updated_at DESC, id DESC) per user, so each page is an
+-- index range scan instead of a sort over all of the user's rows.
+
+CREATE INDEX IF NOT EXISTS documents_user_updated_idx
+    ON documents (user_id, updated_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS chat_sessions_user_updated_idx
+    ON chat_sessions (user_id, updated_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS notes_user_updated_idx
+    ON notes (user_id, updated_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS study_plans_user_updated_idx
+    ON study_plans (user_id, updated_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS notebooks_user_updated_idx
+    ON notebooks (user_id, updated_at DESC, id DESC);
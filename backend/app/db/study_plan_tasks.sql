@@ -0,0 +1,61 @@
+-- Atomic task updates for study plans
+-- Patches a single task's "completed" flag in one statement instead of
+-- rewriting the whole plan JSON from the application.
+
+CREATE OR REPLACE FUNCTION update_study_plan_task(
+    p_plan_id uuid,
+    p_user_id uuid,
+    p_task_id text,
+    p_completed boolean,
+    p_day_number int DEFAULT NULL
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Fast path: plan.task_index maps task id -> [day position, task position]
+    UPDATE study_plans
+    SET plan = jsonb_set(
+        plan,
+        ARRAY[
+            'days', plan->'task_index'->p_task_id->>0,
+            'tasks', plan->'task_index'->p_task_id->>1,
+            'completed'
+        ],
+        to_jsonb(p_completed),
+        true
+    )
+    WHERE id = p_plan_id
+        AND user_id = p_user_id
+        AND plan->'task_index' ? p_task_id;
+
+    IF FOUND THEN
+        RETURN true;
+    END IF;
+
+    -- Legacy plans without an index: locate the task inside the same statement
+    UPDATE study_plans
+    SET plan = jsonb_set(
+        study_plans.plan,
+        ARRAY['days', (loc.day_pos - 1)::text, 'tasks', (loc.task_pos - 1)::text, 'completed'],
+        to_jsonb(p_completed),
+        true
+    )
+    FROM (
+        SELECT d.ord AS day_pos, t.ord AS task_pos
+        FROM study_plans s,
+            jsonb_array_elements(s.plan->'days') WITH ORDINALITY AS d(day, ord),
+            jsonb_array_elements(d.day->'tasks') WITH ORDINALITY AS t(task, ord)
+        WHERE s.id = p_plan_id
+            AND s.user_id = p_user_id
+            AND t.task->>'id' = p_task_id
+            AND (p_day_number IS NULL OR (d.day->>'day_number')::int = p_day_number)
+        ORDER BY d.ord, t.ord
+        LIMIT 1
+    ) loc
+    WHERE study_plans.id = p_plan_id
+        AND study_plans.user_id = p_user_id;
+
+    RETURN FOUND;
+END;
+$$;
@@ -2,10 +2,22 @@
 FastAPI Backend for StudyCopilot
 Main application entry point
 """
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
 from app.core.config import settings
-from app.routes import auth, documents, chat, notes, quiz, summary, planner, notebooks
+from app.core.auth import close_async_supabase_client
+from app.core.openai_client import close_openai_client
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.tracing import init_tracing, shutdown_tracing
+from app.core.metrics import MetricsMiddleware, get_metrics_sampler, mark_worker_dead, render_metrics
+from app.core.profiling import PROFILE_ID_HEADER, profiling_middleware
+from app.services.chat_writer import get_chat_writer
+from app.services.document_sweeper import get_document_sweeper
+from app.routes import auth, documents, chat, notes, quiz, summary, planner, notebooks, admin
 
 app = FastAPI(
     title="StudyCopilot API",
@@ -13,14 +25,20 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Middleware is built when the server starts, so settings are read then, not on import
+def cors_middleware(app: ASGIApp) -> ASGIApp:
+    return CORSMiddleware(
+        app,
+        allow_origins=settings.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, PROFILE_ID_HEADER],
+    )
+
+app.add_middleware(cors_middleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(profiling_middleware)  # Not installed at all unless enabled
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -31,6 +49,30 @@ app.include_router(quiz.router, prefix="/api/quiz", tags=["Quiz"])
 app.include_router(summary.router, prefix="/api/summary", tags=["Summary"])
 app.include_router(planner.router, prefix="/api/planner", tags=["Planner"])
 app.include_router(notebooks.router, prefix="/api/notebooks", tags=["Notebooks"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+
+IMPORT_SECONDS = time.perf_counter() - _import_started  # Reported at startup (see benchmarks/startup.py)
+
+@app.on_event("startup")
+async def startup():
+    started = time.perf_counter()
+    init_tracing()
+    get_metrics_sampler().start()
+    get_chat_writer().start()
+    get_document_sweeper().start()
+    print(f"🚀 [Startup] App imported in {IMPORT_SECONDS * 1000:.0f} ms, "
+          f"startup hooks took {(time.perf_counter() - started) * 1000:.0f} ms")
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Flush buffered chat rows before the client goes away
+    await get_chat_writer().stop()
+    await get_document_sweeper().stop()
+    await close_async_supabase_client()
+    await close_openai_client()
+    shutdown_tracing()
+    await get_metrics_sampler().stop()
+    mark_worker_dead()
 
 @app.get("/")
 async def root():
@@ -43,3 +85,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
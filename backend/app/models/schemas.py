@@ -1,7 +1,7 @@
 """
 Database models using Pydantic
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -27,6 +27,9 @@ class Document(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class BulkDeleteRequest(BaseModel):
+    document_ids: List[str] = Field(..., min_length=1, max_length=500)
+
 # Chat Models
 class ChatMessage(BaseModel):
     role: str  # 'user' or 'assistant'
@@ -37,10 +40,31 @@ class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
 
+class SourceRef(BaseModel):
+    """Reference to a retrieved chunk; text is fetched on demand via /chat/sources"""
+    chunk_id: str
+    similarity: float = 0
+    page: Optional[int] = None
+
 class ChatResponse(BaseModel):
     session_id: str
     message: str
-    sources: List[dict]
+    sources: List[SourceRef]
+
+class ChatHistoryResponse(BaseModel):
+    session: dict
+    messages: List[dict]
+    next_cursor: Optional[str] = None  # Pass back as ?since= to fetch only newer messages
+    has_more: bool = False
+
+class SourceTextRequest(BaseModel):
+    chunk_ids: List[str] = Field(..., max_length=100)
+
+class SourceText(BaseModel):
+    chunk_id: str
+    document_id: str
+    chunk_index: int
+    content: str
 
 # Notes Models
 class NotesRequest(BaseModel):
@@ -54,6 +78,13 @@ class NotesResponse(BaseModel):
     created_at: datetime
     document_ids: List[str] = []
 
+class NoteListItem(BaseModel):
+    id: str
+    title: Optional[str] = None
+    document_ids: List[str] = []
+    created_at: datetime
+    updated_at: datetime
+
 # Quiz Models
 class QuizRequest(BaseModel):
     document_ids: List[str]
@@ -94,6 +125,18 @@ class StudyPlanResponse(BaseModel):
     status: str
     created_at: datetime
 
+class StudyPlanListItem(BaseModel):
+    id: str
+    title: Optional[str] = None
+    status: str
+    document_ids: List[str] = []
+    duration_days: Optional[int] = None
+    hours_per_day: Optional[int] = None
+    start_date: Optional[str] = None
+    exam_date: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # Notebook Models
 class NotebookCreate(BaseModel):
     title: str
@@ -0,0 +1,4 @@
+"""
+Repositories package initialization
+Async data access over the pooled Supabase client
+"""
@@ -0,0 +1,22 @@
+"""
+Base class for async repositories
+"""
+from typing import TYPE_CHECKING, List, Optional
+from app.core.auth import get_async_supabase_client
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+class BaseRepository:
+    table: str = ""
+
+    async def client(self) -> "AsyncClient":
+        return await get_async_supabase_client()
+
+    async def query(self):
+        """Query builder for this repository's table"""
+        return (await self.client()).table(self.table)
+
+    @staticmethod
+    def first(data: Optional[List[dict]]) -> Optional[dict]:
+        return data[0] if data else None
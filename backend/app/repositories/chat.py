@@ -0,0 +1,78 @@
+"""
+Chat sessions and messages repository
+"""
+from typing import List, Optional, Tuple
+from app.repositories.base import BaseRepository
+from app.core.pagination import PageParams, apply_keyset, split_page
+
+# Lightweight list projection; full bodies come from the detail lookups
+LIST_COLUMNS = "id, title, created_at, updated_at"
+
+class ChatRepository(BaseRepository):
+    table = "chat_sessions"
+
+    async def messages(self):
+        return (await self.client()).table("chat_messages")
+
+    async def list_sessions(self, user_id: str, page: PageParams, columns: str = LIST_COLUMNS) -> Tuple[List[dict], Optional[str]]:
+        """One keyset page, newest first by (updated_at, id); columns must include both"""
+        query = (await self.query())\
+            .select(columns)\
+            .eq("user_id", user_id)
+        result = await apply_keyset(query, page).execute()
+        return split_page(result.data, page)
+
+    async def upsert_sessions(self, sessions: List[dict]):
+        """Insert sessions with preassigned ids; existing ids are left untouched"""
+        await (await self.query())\
+            .upsert(sessions, on_conflict="id", ignore_duplicates=True)\
+            .execute()
+
+    async def get_session_owner(self, session_id: str) -> Optional[str]:
+        result = await (await self.query())\
+            .select("user_id")\
+            .eq("id", session_id)\
+            .limit(1)\
+            .execute()
+        row = self.first(result.data)
+        return row["user_id"] if row else None
+
+    async def get_session(self, session_id: str, user_id: str) -> Optional[dict]:
+        result = await (await self.query())\
+            .select("*")\
+            .eq("id", session_id)\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return self.first(result.data)
+
+    async def list_messages(
+        self,
+        session_id: str,
+        since: Optional[Tuple[str, str]] = None,
+        limit: int = 100
+    ) -> Tuple[List[dict], bool]:
+        """
+        Messages oldest first by (created_at, id), strictly after the `since`
+        key. Returns the rows and whether more are already available.
+        """
+        query = (await self.messages())\
+            .select("id, role, content, sources, created_at")\
+            .eq("session_id", session_id)
+        if since:
+            created_at, message_id = since
+            query = query.or_(
+                f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{message_id})'
+            )
+        result = await query\
+            .order("created_at")\
+            .order("id")\
+            .limit(limit + 1)\
+            .execute()
+        return result.data[:limit], len(result.data) > limit
+
+    async def upsert_messages(self, messages: List[dict]):
+        """Idempotent batch insert (messages carry preassigned ids)"""
+        await (await self.messages())\
+            .upsert(messages, on_conflict="id", ignore_duplicates=True)\
+            .execute()
@@ -0,0 +1,71 @@
+"""
+Document chunks repository
+"""
+from typing import List
+from app.repositories.base import BaseRepository
+
+class ChunkRepository(BaseRepository):
+    table = "document_chunks"
+
+    async def insert_many(self, records: List[dict]):
+        await (await self.query()).insert(records).execute()
+
+    async def first_chunks(self, document_id: str, limit: int, columns: str = "content") -> List[dict]:
+        result = await (await self.query())\
+            .select(columns)\
+            .eq("document_id", document_id)\
+            .order("chunk_index")\
+            .limit(limit)\
+            .execute()
+        return result.data
+
+    async def get_many(self, chunk_ids: List[str], columns: str = "id, document_id, chunk_index, content") -> List[dict]:
+        if not chunk_ids:
+            return []
+        result = await (await self.query())\
+            .select(columns)\
+            .in_("id", chunk_ids)\
+            .execute()
+        return result.data
+
+    async def find_page(self, document_ids: List[str], page: int) -> List[dict]:
+        """Chunks whose content carries the "[Page X]" marker"""
+        result = await (await self.query())\
+            .select("id, content, document_id, chunk_index")\
+            .in_("document_id", document_ids)\
+            .ilike("content", f"%[Page {page}] %")\
+            .execute()
+        return result.data
+
+    async def match(self, query_embedding: List[float], threshold: float, count: int, document_ids: List[str]) -> List[dict]:
+        """Vector similarity search (match_document_chunks RPC)"""
+        client = await self.client()
+        result = await client.rpc(
+            "match_document_chunks",
+            {
+                "query_embedding": query_embedding,
+                "match_threshold": threshold,
+                "match_count": count,
+                "document_ids": document_ids
+            }
+        ).execute()
+        return result.data
+
+    async def purge_batch(self, document_id: str, batch_size: int) -> int:
+        """Delete up to batch_size chunks of a document (purge_document_chunks RPC); returns rows deleted"""
+        client = await self.client()
+        result = await client.rpc(
+            "purge_document_chunks",
+            {"p_document_id": document_id, "p_batch_size": batch_size}
+        ).execute()
+        return result.data or 0
+
+    async def purge_document(self, document_id: str, batch_size: int) -> int:
+        """Delete all chunks of a document, batch_size rows per statement; returns rows deleted"""
+        total = 0
+        while True:
+            deleted = await self.purge_batch(document_id, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
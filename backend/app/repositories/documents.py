@@ -0,0 +1,85 @@
+"""
+Documents repository
+Reads skip soft-deleted rows (deleted_at set); the sweeper purges them later.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from app.repositories.base import BaseRepository
+from app.core.pagination import PageParams, apply_keyset, split_page
+
+# Lightweight list projection; full bodies come from the detail lookups
+LIST_COLUMNS = "id, user_id, title, file_path, file_size, page_count, status, summary, created_at, updated_at"
+
+class DocumentRepository(BaseRepository):
+    table = "documents"
+
+    async def insert(self, data: dict) -> Optional[dict]:
+        result = await (await self.query()).insert(data).execute()
+        return self.first(result.data)
+
+    async def list_page(self, user_id: str, page: PageParams, columns: str = LIST_COLUMNS) -> Tuple[List[dict], Optional[str]]:
+        """One keyset page, newest first by (updated_at, id); columns must include both"""
+        query = (await self.query())\
+            .select(columns)\
+            .eq("user_id", user_id)\
+            .is_("deleted_at", "null")
+        result = await apply_keyset(query, page).execute()
+        return split_page(result.data, page)
+
+    async def get_for_user(self, document_id: str, user_id: str, columns: str = "*") -> Optional[dict]:
+        result = await (await self.query())\
+            .select(columns)\
+            .eq("id", document_id)\
+            .eq("user_id", user_id)\
+            .is_("deleted_at", "null")\
+            .limit(1)\
+            .execute()
+        return self.first(result.data)
+
+    async def get(self, document_id: str, columns: str = "*") -> Optional[dict]:
+        result = await (await self.query())\
+            .select(columns)\
+            .eq("id", document_id)\
+            .is_("deleted_at", "null")\
+            .limit(1)\
+            .execute()
+        return self.first(result.data)
+
+    async def get_many(self, document_ids: List[str], columns: str = "*") -> List[dict]:
+        if not document_ids:
+            return []
+        result = await (await self.query())\
+            .select(columns)\
+            .in_("id", document_ids)\
+            .is_("deleted_at", "null")\
+            .execute()
+        return result.data
+
+    async def update(self, document_id: str, data: dict) -> Optional[dict]:
+        result = await (await self.query()).update(data).eq("id", document_id).execute()
+        return self.first(result.data)
+
+    async def mark_deleted(self, document_ids: List[str], user_id: str) -> List[str]:
+        """Soft delete; returns the ids that were live and owned by the user"""
+        if not document_ids:
+            return []
+        result = await (await self.query())\
+            .update({"deleted_at": datetime.now(timezone.utc).isoformat()})\
+            .in_("id", document_ids)\
+            .eq("user_id", user_id)\
+            .is_("deleted_at", "null")\
+            .execute()
+        return [row["id"] for row in result.data]
+
+    async def list_deleted(self, limit: int) -> List[dict]:
+        """Oldest soft-deleted documents waiting for the sweeper"""
+        result = await (await self.query())\
+            .select("id, file_path")\
+            .not_.is_("deleted_at", "null")\
+            .order("deleted_at")\
+            .limit(limit)\
+            .execute()
+        return result.data
+
+    async def delete(self, document_id: str):
+        await (await self.query()).delete().eq("id", document_id).execute()
@@ -0,0 +1,88 @@
+"""
+Request-scoped batching loaders (DataLoader-style)
+
+All load() calls made in the same event-loop tick are merged into one
+`in_` query, and results are cached for the rest of the request.
+Routes get a fresh set per request through the get_request_loaders dependency.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from app.repositories.documents import DocumentRepository
+
+# Document metadata every loader consumer needs (summary is a documents column)
+DOCUMENT_LOADER_COLUMNS = "id, user_id, title, summary, page_count, status"
+
+
+class BatchLoader:
+    def __init__(self, batch_fn: Callable[[List[str]], Awaitable[Dict[str, Any]]]):
+        self._batch_fn = batch_fn
+        self._cache: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._seen_pending = 0
+
+    async def load(self, key: str) -> Optional[Any]:
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending.append(key)
+        return await future
+
+    async def load_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*[self.load(k) for k in keys]))
+
+    def _dispatch(self):
+        # Keep waiting while callers (e.g. nested gathers) are still queueing keys
+        if len(self._pending) != self._seen_pending:
+            self._seen_pending = len(self._pending)
+            asyncio.get_running_loop().call_soon(self._dispatch)
+            return
+
+        keys, self._pending = self._pending, []
+        self._seen_pending = 0
+        asyncio.ensure_future(self._run(keys))
+
+    async def _run(self, keys: List[str]):
+        try:
+            results = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Failed keys may be retried by a later load()
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+class RequestLoaders:
+    """Loaders for one request"""
+
+    def __init__(self):
+        self._documents = DocumentRepository()
+        self.documents = BatchLoader(self._load_documents)
+
+    async def _load_documents(self, document_ids: List[str]) -> Dict[str, dict]:
+        rows = await self._documents.get_many(document_ids, DOCUMENT_LOADER_COLUMNS)
+        return {row["id"]: row for row in rows}
+
+
+async def require_documents(loaders: RequestLoaders, document_ids: List[str], user_id: str) -> List[dict]:
+    """The user's live documents, in order; 404 if any is missing, deleted or not theirs"""
+    docs = await loaders.documents.load_many(document_ids)
+    if not all(d and d["user_id"] == user_id for d in docs):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return docs
+
+
+async def get_request_loaders() -> RequestLoaders:
+    """FastAPI dependency: one RequestLoaders per request (shared by nested dependencies)"""
+    return RequestLoaders()
@@ -0,0 +1,48 @@
+"""
+Notebooks repository
+"""
+from typing import List, Optional, Tuple
+from app.repositories.base import BaseRepository
+from app.core.pagination import PageParams, apply_keyset, split_page
+
+# Lightweight list projection; full bodies come from the detail lookups
+LIST_COLUMNS = "id, title, document_ids, created_at, updated_at"
+
+class NotebookRepository(BaseRepository):
+    table = "notebooks"
+
+    async def insert(self, data: dict) -> Optional[dict]:
+        result = await (await self.query()).insert(data).execute()
+        return self.first(result.data)
+
+    async def list_page(self, user_id: str, page: PageParams, columns: str = LIST_COLUMNS) -> Tuple[List[dict], Optional[str]]:
+        """One keyset page, newest first by (updated_at, id); columns must include both"""
+        query = (await self.query())\
+            .select(columns)\
+            .eq("user_id", user_id)
+        result = await apply_keyset(query, page).execute()
+        return split_page(result.data, page)
+
+    async def get_for_user(self, notebook_id: str, user_id: str) -> Optional[dict]:
+        result = await (await self.query())\
+            .select("*")\
+            .eq("id", notebook_id)\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return self.first(result.data)
+
+    async def update_for_user(self, notebook_id: str, user_id: str, data: dict) -> Optional[dict]:
+        result = await (await self.query())\
+            .update(data)\
+            .eq("id", notebook_id)\
+            .eq("user_id", user_id)\
+            .execute()
+        return self.first(result.data)
+
+    async def delete_for_user(self, notebook_id: str, user_id: str):
+        await (await self.query())\
+            .delete()\
+            .eq("id", notebook_id)\
+            .eq("user_id", user_id)\
+            .execute()
@@ -0,0 +1,56 @@
+"""
+Study plans repository
+"""
+from typing import List, Optional, Tuple
+from app.repositories.base import BaseRepository
+from app.core.pagination import PageParams, apply_keyset, split_page
+
+# Lightweight list projection; full bodies come from the detail lookups
+LIST_COLUMNS = "id, title, status, document_ids, duration_days, hours_per_day, start_date, exam_date, created_at, updated_at"
+
+class StudyPlanRepository(BaseRepository):
+    table = "study_plans"
+
+    async def insert(self, data: dict) -> Optional[dict]:
+        result = await (await self.query()).insert(data).execute()
+        return self.first(result.data)
+
+    async def list_page(self, user_id: str, page: PageParams, columns: str = LIST_COLUMNS) -> Tuple[List[dict], Optional[str]]:
+        """One keyset page, newest first by (updated_at, id); columns must include both"""
+        query = (await self.query())\
+            .select(columns)\
+            .eq("user_id", user_id)
+        result = await apply_keyset(query, page).execute()
+        return split_page(result.data, page)
+
+    async def get_for_user(self, plan_id: str, user_id: str, columns: str = "*") -> Optional[dict]:
+        result = await (await self.query())\
+            .select(columns)\
+            .eq("id", plan_id)\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return self.first(result.data)
+
+    async def update_for_user(self, plan_id: str, user_id: str, data: dict) -> Optional[dict]:
+        result = await (await self.query())\
+            .update(data)\
+            .eq("id", plan_id)\
+            .eq("user_id", user_id)\
+            .execute()
+        return self.first(result.data)
+
+    async def set_task_completed(self, plan_id: str, user_id: str, task_id: str, completed: bool, day_number: Optional[int]) -> bool:
+        """Single-statement task patch (update_study_plan_task RPC)"""
+        client = await self.client()
+        result = await client.rpc(
+            "update_study_plan_task",
+            {
+                "p_plan_id": plan_id,
+                "p_user_id": user_id,
+                "p_task_id": task_id,
+                "p_completed": completed,
+                "p_day_number": day_number
+            }
+        ).execute()
+        return bool(result.data)
@@ -0,0 +1,40 @@
+"""
+Operator routes (admin only)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from app.core.auth import require_admin
+from app.core.profiling import list_profiles, profile_path
+from app.services.pipeline_timing import get_timing_store
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/pipeline/timings")
+async def get_pipeline_timings(limit: int = Query(50, ge=1, le=500)):
+    """Recent ingestion timing records and per-stage latency histograms (this worker)"""
+    store = get_timing_store()
+    return {
+        "histograms": store.histograms(),
+        "documents": store.recent(limit)
+    }
+
+@router.get("/pipeline/timings/{document_id}")
+async def get_document_timings(document_id: str):
+    """Per-stage timing record for one document"""
+    record = get_timing_store().get(document_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="No timing record for this document")
+    return record
+
+@router.get("/profiles")
+async def get_profiles():
+    """Request profiles stored on this host, per route (see app/core/profiling.py)"""
+    return {"routes": list_profiles()}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """One profile as speedscope JSON (open at https://www.speedscope.app)"""
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
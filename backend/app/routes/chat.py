@@ -1,12 +1,27 @@
 """
 Chat and RAG routes
 """
-from fastapi import APIRouter, Depends, HTTPException
-from app.core.auth import get_current_user, get_supabase_client
-from app.models.schemas import ChatRequest, ChatResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from datetime import datetime, timezone
+from app.core.auth import get_current_user
+from app.repositories.chat import ChatRepository
+from app.repositories.chunks import ChunkRepository
+from app.repositories.loader import RequestLoaders, get_request_loaders
+from app.models.schemas import (
+    ChatRequest, ChatResponse, ChatHistoryResponse, SourceTextRequest, SourceText
+)
 from app.services.embedding_service import EmbeddingService
-from openai import AsyncOpenAI
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_message_tokens
+from app.services.chat_writer import get_chat_writer
+from app.core.ids import uuid7
+from app.core.tracing import tracer
+from opentelemetry import context as otel_context, trace
+from opentelemetry.trace import Status, StatusCode
 from app.core.config import settings
+from app.core.openai_client import get_openai_client
+from app.core.pagination import PageParams, page_params, parse_cursor, encode_cursor, set_next_cursor
+import asyncio
 import uuid
 import traceback
 import sys
@@ -16,57 +31,66 @@ router = APIRouter()
 @router.post("/query", response_model=ChatResponse)
 async def chat_query(
     request: ChatRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Query documents using RAG"""
     """Query documents using RAG"""
     print(f"💬 [Chat] Processing query: {request.message[:50]}...")
     
+    # Root span for the request; each step below is a child span
+    root_span = tracer.start_span("chat.query", attributes={
+        "chat.documents_requested": len(request.document_ids),
+        "chat.message_chars": len(request.message)
+    })
+    span_context = otel_context.attach(trace.set_span_in_context(root_span))
+    owner_lookup: Optional[asyncio.Future] = None
+    
     try:
-        supabase = get_supabase_client()
+        chat_repo = ChatRepository()
+        chunk_repo = ChunkRepository()
         embedding_service = EmbeddingService()
-        openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        openai_client = get_openai_client()
         
-        # 1. Create or get session
+        # 1. Session id: new sessions get a UUIDv7 here and are written behind;
+        #    an existing id is checked for ownership while retrieval runs
+        started_at = datetime.now(timezone.utc)
         session_id = request.session_id
-        if not session_id:
+        if session_id:
             try:
-                session_data = {
-                    "user_id": current_user["user_id"],
-                    "title": request.message[:50]
-                }
-                session_result = supabase.table("chat_sessions").insert(session_data).execute()
-                session_id = session_result.data[0]["id"]
-            except Exception as e:
-                print(f"❌ [Chat] Session creation error: {e}")
-                # Create a temporary session ID if DB fails
-                session_id = str(uuid.uuid4())
+                uuid.UUID(session_id)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid session_id")
+            owner_lookup = asyncio.ensure_future(chat_repo.get_session_owner(session_id))
+        else:
+            session_id = str(uuid7())
         
         # 2. Get Document Summaries (Context Enhancement)
-        doc_summaries = []
-        if request.document_ids:
-            try:
-                 docs_res = supabase.table("documents")\
-                    .select("title, summary")\
-                    .in_("id", request.document_ids)\
-                    .execute()
-                 doc_summaries = [f"Summary of {d['title']}: {d['summary']}" for d in docs_res.data if d.get('summary')]
-            except Exception as e:
-                print(f"⚠️ [Chat] Failed to fetch summaries: {e}")
+        #    Only the caller's live documents; deleted ones are hidden by the repository
+        with tracer.start_as_current_span("chat.load_documents") as span:
+            docs = [
+                d for d in await loaders.documents.load_many(request.document_ids)
+                if d and d["user_id"] == current_user["user_id"]
+            ]
+            document_ids = [d["id"] for d in docs]
+            span.set_attribute("documents.found", len(docs))
+        doc_summaries = [f"Summary of {d['title']}: {d['summary']}" for d in docs if d.get('summary')]
 
         # 3. Generate query embedding
         try:
-            query_embedding = await embedding_service.create_embedding(request.message)
+            with tracer.start_as_current_span("chat.embed_query") as span:
+                query_embedding = await embedding_service.create_embedding(
+                    request.message,
+                    priority=Priority.INTERACTIVE,
+                    user_id=current_user["user_id"]
+                )
+                span.set_attribute("llm.model", embedding_service.model)
+                span.set_attribute("llm.tokens", embedding_service.tokens_used)
         except Exception as e:
             raise HTTPException(status_code=500, detail="Failed to process your question")
         
         # 4. Strategy Selection based on Document Size
         # If documents are small (< 10 pages total), fetch ALL content to ensure "total analysis"
-        total_pages = 0
-        try:
-             docs_info = supabase.table("documents").select("page_count").in_("id", request.document_ids).execute()
-             total_pages = sum([d['page_count'] for d in docs_info.data if d.get('page_count')])
-        except: pass
+        total_pages = sum([d['page_count'] for d in docs if d.get('page_count')])
 
         search_results_data = []
         is_full_context = False
@@ -86,23 +110,14 @@ async def chat_query(
                 print(f"🎯 [Chat] User asked for Page {target_page}. searching specifically...")
                 
                 # Search for "[Page X]" marker
-                page_search = supabase.table("document_chunks")\
-                    .select("id, content, document_id, chunk_index")\
-                    .in_("document_id", request.document_ids)\
-                    .ilike("content", f"%[Page {target_page}]% दुष्प्रभाव%")\
-                    .execute() # 'ilike' might be slow or weird, let's just use text search if possible or just filter locally if we could...
-                    # Actually Supabase 'ilike' is standard. But simply `ilike '%[Page 30]%'` is safest.
-                
-                # Correct ILIKE query:
-                page_search = supabase.table("document_chunks")\
-                    .select("id, content, document_id, chunk_index")\
-                    .in_("document_id", request.document_ids)\
-                    .ilike("content", f"%[Page {target_page}] %")\
-                    .execute()
+                with tracer.start_as_current_span("chat.page_search") as span:
+                    page_chunks = await chunk_repo.find_page(document_ids, target_page)
+                    span.set_attribute("search.page", target_page)
+                    span.set_attribute("search.chunks_returned", len(page_chunks))
 
-                if page_search.data:
-                    print(f"✅ [Chat] Found {len(page_search.data)} chunks for Page {target_page}")
-                    search_results_data = page_search.data
+                if page_chunks:
+                    print(f"✅ [Chat] Found {len(page_chunks)} chunks for Page {target_page}")
+                    search_results_data = page_chunks
                     for c in search_results_data: 
                         c['similarity'] = 1.0
             except Exception as e:
@@ -111,24 +126,24 @@ async def chat_query(
         # If not full context or failed to fetch, use Vector Search
         if not search_results_data:
             # ... existing vector search ...
-            thresholds = [0.4, 0.2, 0.1] # Try progressively lower thresholds
-            
-            for threshold in thresholds:
+            # Try progressively lower thresholds
+            for threshold in settings.SEARCH_THRESHOLDS:
                 print(f"🔍 [Chat] Searching with threshold {threshold}...")
                 try:
-                    res = supabase.rpc(
-                        'match_document_chunks',
-                        {
-                            'query_embedding': query_embedding,
-                            'match_threshold': threshold,
-                            'match_count': settings.TOP_K_RESULTS,
-                            'document_ids': request.document_ids
-                        }
-                    ).execute()
+                    with tracer.start_as_current_span("chat.vector_search") as span:
+                        matches = await chunk_repo.match(
+                            query_embedding,
+                            threshold,
+                            settings.TOP_K_RESULTS,
+                            document_ids
+                        )
+                        span.set_attribute("search.threshold", threshold)
+                        span.set_attribute("search.top_k", settings.TOP_K_RESULTS)
+                        span.set_attribute("search.chunks_returned", len(matches))
                     
-                    if res.data:
-                        search_results_data = res.data
-                        print(f"✅ [Chat] Found {len(res.data)} chunks at threshold {threshold}")
+                    if matches:
+                        search_results_data = matches
+                        print(f"✅ [Chat] Found {len(matches)} chunks at threshold {threshold}")
                         break
                 except Exception as e:
                     print(f"❌ [Chat] Vector search error: {e}")
@@ -169,19 +184,52 @@ async def chat_query(
                 # If we really want to guess for legacy docs (risky but better than nothing or all Page 1? No, all Page 1 is worst)
                 # Let's just leave it as None.
                 
+                # References only; clients resolve text through /chat/sources
                 sources.append({
                     "chunk_id": c["id"], 
                     "similarity": c.get("similarity", 0),
-                    "page": page_num,
-                    "text": c["content"]
+                    "page": page_num
                 })
         else:
             sources = []
 
+        # Don't spend a completion on someone else's session
+        is_new_session = owner_lookup is None
+        if owner_lookup is not None:
+            with tracer.start_as_current_span("chat.session_check"):
+                owner = await owner_lookup
+            if owner and owner != current_user["user_id"]:
+                raise HTTPException(status_code=404, detail="Session not found")
+            is_new_session = owner is None
+
+        root_span.set_attribute("chat.new_session", is_new_session)
+        root_span.set_attribute("chat.chunks_used", len(search_results_data))
+
+        def save_history(answer: str, sources: list):
+            """Write-behind: batched and flushed in the background"""
+            with tracer.start_as_current_span("chat.save_history"):
+                writer = get_chat_writer()
+                if is_new_session:
+                    writer.add_session({
+                        "id": session_id,
+                        "user_id": current_user["user_id"],
+                        "title": request.message[:50],
+                        "created_at": started_at.isoformat(),
+                        "updated_at": started_at.isoformat()
+                    })
+                writer.add_messages([
+                    {"id": str(uuid7()), "session_id": session_id, "role": "user",
+                     "content": request.message, "created_at": started_at.isoformat()},
+                    {"id": str(uuid7()), "session_id": session_id, "role": "assistant",
+                     "content": answer, "sources": sources, "created_at": datetime.now(timezone.utc).isoformat()}
+                ])
+        
         # If we have NO context (no chunks AND no summaries), fail gracefully
         if not context_parts:
             print("⚠️ [Chat] No context found")
             fallback_msg = "I couldn't find relevant information in the uploaded documents."
+            # Saved like any answer, so the returned session_id exists
+            save_history(fallback_msg, [])
             return ChatResponse(session_id=session_id, message=fallback_msg, sources=[])
             
         full_context = "\n\n".join(context_parts)
@@ -201,25 +249,30 @@ Question: {request.message}
 Answer:"""
 
         print(f"🤖 [Chat] Requesting completion from {settings.OPENAI_MODEL}...")
-        response = await openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3, # Lower temperature for factual accuracy
-            max_tokens=800
-        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        scheduler = get_llm_scheduler(settings.OPENAI_MODEL)
+        with tracer.start_as_current_span("chat.completion") as span:
+            span.set_attribute("llm.model", settings.OPENAI_MODEL)
+            span.set_attribute("llm.estimated_tokens", estimate_message_tokens(messages, 800))
+            async with scheduler.reserve(Priority.INTERACTIVE, current_user["user_id"], tokens=estimate_message_tokens(messages, 800)) as slot:
+                response = await openai_client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=messages,
+                    temperature=0.3, # Lower temperature for factual accuracy
+                    max_tokens=800
+                )
+                slot.settle(response.usage.total_tokens if response.usage else None)
+            if response.usage:
+                span.set_attribute("llm.prompt_tokens", response.usage.prompt_tokens)
+                span.set_attribute("llm.completion_tokens", response.usage.completion_tokens)
         
         answer = response.choices[0].message.content
         
         # 7. Save history
-        try:
-            supabase.table("chat_messages").insert([
-                {"session_id": session_id, "role": "user", "content": request.message},
-                {"session_id": session_id, "role": "assistant", "content": answer, "sources": sources}
-            ]).execute()
-        except: pass
+        save_history(answer, sources)
         
         return ChatResponse(
             session_id=session_id,
@@ -228,50 +281,96 @@ Answer:"""
         )
 
     except HTTPException as he:
+        root_span.set_attribute("http.status_code", he.status_code)
         raise he
     except Exception as e:
         print(f"❌ [Chat] Unexpected error: {e}")
         traceback.print_exc()
+        root_span.record_exception(e)
+        root_span.set_status(Status(StatusCode.ERROR, str(e)))
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Errors before the ownership check leave the lookup pending or unretrieved
+        if owner_lookup is not None:
+            if not owner_lookup.done():
+                owner_lookup.cancel()
+            elif not owner_lookup.cancelled():
+                owner_lookup.exception()
+        otel_context.detach(span_context)
+        root_span.end()
 
 @router.get("/sessions")
-async def get_chat_sessions(current_user: dict = Depends(get_current_user)):
-    """Get all chat sessions for user"""
-    supabase = get_supabase_client()
-    result = supabase.table("chat_sessions")\
-        .select("*")\
-        .eq("user_id", current_user["user_id"])\
-        .order("updated_at", desc=True)\
-        .execute()
-    return result.data
+async def get_chat_sessions(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get chat sessions for user (paginated, next page cursor in X-Next-Cursor)"""
+    sessions, next_cursor = await ChatRepository().list_sessions(current_user["user_id"], page)
+    set_next_cursor(response, next_cursor)
+    return sessions
+
+def _source_refs(sources: Optional[List[dict]]) -> List[dict]:
+    """Drop chunk text from sources (messages saved before sources were references)"""
+    return [{k: v for k, v in s.items() if k != "text"} for s in sources or []]
 
-@router.get("/sessions/{session_id}")
+@router.get("/sessions/{session_id}", response_model=ChatHistoryResponse)
 async def get_chat_session(
     session_id: str,
+    since: Optional[str] = Query(None, description="next_cursor from a previous response"),
+    limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get chat session with messages"""
-    supabase = get_supabase_client()
+    """
+    Get chat session with messages, oldest first.
+    Clients keep the returned next_cursor and pass it as ?since= to fetch only
+    messages added afterwards; has_more means another page is ready now.
+    """
+    after = parse_cursor(since)
+    chat_repo = ChatRepository()
+    await get_chat_writer().flush_session(session_id)
     
     # Get session
-    session = supabase.table("chat_sessions")\
-        .select("*")\
-        .eq("id", session_id)\
-        .eq("user_id", current_user["user_id"])\
-        .single()\
-        .execute()
+    session = await chat_repo.get_session(session_id, current_user["user_id"])
     
-    if not session.data:
+    if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Get messages
-    messages = supabase.table("chat_messages")\
-        .select("*")\
-        .eq("session_id", session_id)\
-        .order("created_at")\
-        .execute()
+    messages, has_more = await chat_repo.list_messages(session_id, after, limit)
+    for message in messages:
+        message["sources"] = _source_refs(message.get("sources"))
+
+    next_cursor = encode_cursor(messages[-1], "created_at") if messages else since
     
-    return {
-        "session": session.data,
-        "messages": messages.data
-    }
+    return ChatHistoryResponse(
+        session=session,
+        messages=messages,
+        next_cursor=next_cursor,
+        has_more=has_more
+    )
+
+@router.post("/sources", response_model=List[SourceText])
+async def get_source_texts(
+    request: SourceTextRequest,
+    current_user: dict = Depends(get_current_user),
+    loaders: RequestLoaders = Depends(get_request_loaders)
+):
+    """Resolve source references to chunk text in one round trip"""
+    chunk_ids = list(dict.fromkeys(request.chunk_ids))
+    chunks = await ChunkRepository().get_many(chunk_ids)
+
+    # Only return chunks from the caller's own documents
+    docs = await loaders.documents.load_many(list({c["document_id"] for c in chunks}))
+    owned = {d["id"] for d in docs if d and d["user_id"] == current_user["user_id"]}
+
+    by_id = {c["id"]: c for c in chunks if c["document_id"] in owned}
+    return [
+        SourceText(
+            chunk_id=chunk_id,
+            document_id=by_id[chunk_id]["document_id"],
+            chunk_index=by_id[chunk_id]["chunk_index"],
+            content=by_id[chunk_id]["content"]
+        )
+        for chunk_id in chunk_ids if chunk_id in by_id
+    ]
@@ -1,56 +1,96 @@
 """
 Document management routes
 """
-from fastapi import APIRouter, UploadFile, File, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, BackgroundTasks, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.core.auth import get_current_user
 from app.services.document_service import DocumentService
 from app.services.pdf_extractor import PDFExtractor
 from app.services.embedding_service import EmbeddingService
-from app.services.summary_service import SummaryService
-from app.core.auth import get_supabase_client
+from app.services.summary_service import SummaryService, SUMMARY_INPUT_CHARS
+from app.services.llm_scheduler import Priority
+from app.services.storage_service import StorageService, mapped
+from app.services.pipeline_timing import DocumentTimings
+from app.services.progress import DocumentProgress, get_progress_bus, TERMINAL_STAGES, PROGRESS_COLUMNS
+from app.repositories.documents import DocumentRepository
+from app.repositories.chunks import ChunkRepository
 from app.core.config import settings
+from app.models.schemas import BulkDeleteRequest
+from app.core.pagination import PageParams, page_params, set_next_cursor
+import asyncio
+import json
 import traceback
 import sys
 
 router = APIRouter()
 
-async def process_document_background(document_id: str, file_path: str):
-    """Background task to process uploaded PDF"""
+# Rows per chunk insert, to stay under request size limits
+CHUNK_INSERT_BATCH_SIZE = 50
+
+async def process_document_background(document_id: str, file_path: str, user_id: Optional[str] = None):
+    """
+    Background task to process uploaded PDF
+
+    Memory per job is bounded by the extracted text: the PDF is spooled to
+    disk, the page texts are dropped once chunked, and embeddings (~50KB per
+    chunk as Python floats) are stored one EMBEDDING_BATCH_SIZE batch at a
+    time instead of being collected for the whole document. A failed job
+    removes the chunks it already stored.
+    """
     print(f"🚀 [BgTask] Starting processing for document {document_id}")
-    supabase = get_supabase_client()
+    documents = DocumentRepository()
+    chunk_repo = ChunkRepository()
+    progress = DocumentProgress(document_id)
+    timings = DocumentTimings(document_id)
     
     try:
         # 1. Download PDF from storage
         print(f"📥 [BgTask] Downloading file: {file_path}")
+        await progress.stage("downloading")
         try:
-            file_data = supabase.storage.from_("documents").download(file_path)
+            # Streamed to a spooled temp file; never held whole in memory
+            with timings.stage("download") as span:
+                spool, file_size = await StorageService("documents").download_to_spool(
+                    file_path, settings.MAX_UPLOAD_SIZE
+                )
+                span.set(bytes=file_size)
         except Exception as e:
             print(f"❌ [BgTask] Download failed: {e}")
             raise Exception(f"Failed to download file from storage: {e}")
         
         # 2. Extract text
         print(f"📄 [BgTask] Extracting text...")
+        await progress.stage("extracting")
         extractor = PDFExtractor()
         try:
-            extracted = extractor.extract_text(file_data)
+            def extract():
+                with mapped(spool, file_size) as pdf:
+                    return extractor.extract_text(pdf)
+
+            # Parsing is CPU-bound; keep it off the event loop
+            with spool, timings.stage("extract") as span:
+                extracted = await asyncio.to_thread(extract)
+                span.set(bytes=file_size, pages=extracted['page_count'], chars=len(extracted['text']))
             print(f"✅ [BgTask] Extraction complete. Pages: {extracted.get('page_count')}, Text length: {len(extracted.get('text', ''))}")
         except Exception as e:
             print(f"❌ [BgTask] Text extraction failed: {e}")
             raise Exception(f"Text extraction failed: {e}")
         
-        # 3. Update page count
-        supabase.table("documents").update({
-            "page_count": extracted['page_count']
-        }).eq("id", document_id).execute()
-        
-        # 4. Chunk text
+        # 3-4. Record page count and chunk text
         print(f"🔪 [BgTask] Chunking text...")
-        chunks = extractor.chunk_text(
-            extracted['pages'],
-            chunk_size=settings.CHUNK_SIZE,
-            overlap=settings.CHUNK_OVERLAP
+        await progress.stage(
+            "chunking",
+            extra={"page_count": extracted['page_count']},
+            pages_extracted=extracted['page_count']
         )
+        with timings.stage("chunk") as span:
+            chunks = extractor.chunk_text(
+                extracted['pages'],
+                chunk_size=settings.CHUNK_SIZE,
+                overlap=settings.CHUNK_OVERLAP
+            )
+            span.set(pages=extracted['page_count'], chunks=len(chunks))
         print(f"✅ [BgTask] Created {len(chunks)} chunks")
         
         if not chunks:
@@ -62,52 +102,73 @@ async def process_document_background(document_id: str, file_path: str):
             else:
                 raise Exception("Document appears to be empty (no text extracted)")
 
-        # 5. Generate embeddings
-        print(f"🧠 [BgTask] Generating embeddings for {len(chunks)} chunks...")
+        # The chunks carry the text from here on; only the summary's input is kept
+        summary_text = extracted['text'][:SUMMARY_INPUT_CHARS]
+        del extracted
+
+        # 5-6. Embed and store each batch, then drop its vectors
+        print(f"🧠 [BgTask] Embedding and saving {len(chunks)} chunks...")
+        await progress.stage("embedding", chunks_total=len(chunks), chunks_embedded=0, chunks_stored=0)
         embedding_service = EmbeddingService()
-        try:
-            embeddings = await embedding_service.create_embeddings_batch(chunks)
-            print(f"✅ [BgTask] Embeddings generated successfully")
-        except Exception as e:
-            print(f"❌ [BgTask] Embedding generation failed: {e}")
-            # Identify if it's an API key issue
-            if "api_key" in str(e).lower() or "authentication" in str(e).lower():
-                print("❌ [BgTask] CRITICAL: OpenAI API Key invalid or expired")
-            raise Exception(f"Embedding generation failed: {e}")
-        
-        # 6. Store chunks with embeddings
-        print(f"💾 [BgTask] Saving chunks to database...")
-        chunk_records = []
-        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_records.append({
-                "document_id": document_id,
-                "chunk_index": idx,
-                "content": chunk,
-                "embedding": embedding
-            })
-        
-        if chunk_records:
+        for start in range(0, len(chunks), settings.EMBEDDING_BATCH_SIZE):
+            batch = chunks[start:start + settings.EMBEDDING_BATCH_SIZE]
+            try:
+                with timings.stage("embed") as span:
+                    embeddings = await embedding_service.create_embeddings_batch(
+                        batch,
+                        priority=Priority.INGESTION,
+                        user_id=user_id
+                    )
+                    span.add(batches=1, chunks=len(embeddings))
+                    span.set(tokens=embedding_service.tokens_used)
+                await progress.update(chunks_embedded=start + len(embeddings))
+            except Exception as e:
+                print(f"❌ [BgTask] Embedding generation failed: {e}")
+                # Identify if it's an API key issue
+                if "api_key" in str(e).lower() or "authentication" in str(e).lower():
+                    print("❌ [BgTask] CRITICAL: OpenAI API Key invalid or expired")
+                raise Exception(f"Embedding generation failed: {e}")
+
+            records = [
+                {
+                    "document_id": document_id,
+                    "chunk_index": start + offset,
+                    "content": chunk,
+                    "embedding": embedding
+                }
+                for offset, (chunk, embedding) in enumerate(zip(batch, embeddings))
+            ]
+            del embeddings
             try:
-                # Insert in batches of 50 to avoid request size limits
-                batch_size = 50
-                for i in range(0, len(chunk_records), batch_size):
-                    batch = chunk_records[i:i + batch_size]
-                    supabase.table("document_chunks").insert(batch).execute()
-                print(f"✅ [BgTask] Saved {len(chunk_records)} chunks to DB")
+                with timings.stage("store") as span:
+                    for i in range(0, len(records), CHUNK_INSERT_BATCH_SIZE):
+                        await chunk_repo.insert_many(records[i:i + CHUNK_INSERT_BATCH_SIZE])
+                        span.add(batches=1)
+                    span.add(chunks=len(records))
+                await progress.update(chunks_stored=start + len(records))
             except Exception as e:
                 print(f"❌ [BgTask] Database insertion failed: {e}")
                 raise Exception(f"Failed to save chunks to database: {e}")
+            del records
+        print(f"✅ [BgTask] Saved {len(chunks)} chunks with embeddings to DB")
         
         # 7. Generate Summary (Optional but good)
         print(f"📝 [BgTask] Generating summary...")
+        await progress.stage("summarizing")
         summary_service = SummaryService()
         try:
-            summary = await summary_service.generate_summary(extracted['text'])
+            with timings.stage("summary") as span:
+                summary = await summary_service.generate_summary(
+                    summary_text,
+                    priority=Priority.INGESTION,
+                    user_id=user_id
+                )
+                span.set(chars=len(summary or ""))
             # Check if summary column exists first or handle error
             try:
-                supabase.table("documents").update({
+                await documents.update(document_id, {
                     "summary": summary
-                }).eq("id", document_id).execute()
+                })
                 print(f"✅ [BgTask] Summary saved")
             except Exception as db_e:
                 print(f"⚠️ [BgTask] Could not save summary (column might be missing): {db_e}")
@@ -116,24 +177,28 @@ async def process_document_background(document_id: str, file_path: str):
             # Don't fail the whole process if summary fails
         
         # 8. Update document status to ready
-        supabase.table("documents").update({
-            "status": "ready"
-        }).eq("id", document_id).execute()
-        print(f"✨ [BgTask] Document {document_id} processing COMPLETE!")
+        await progress.stage("ready", extra={"status": "ready"})
+        timings.finish("ready")
+        print(f"✨ [BgTask] Document {document_id} processing COMPLETE in {timings.total_seconds:.2f}s!")
         
     except Exception as e:
         # Mark as failed
         print(f"❌ [BgTask] FAILURE processing document {document_id}")
         traceback.print_exc()
         
-        # Try to save error message if possible
-        error_msg = str(e)
-        update_data = {"status": "failed"}
-        
-        # Try to save error info in title or summary for visibility if possible
-        # Or just leave it as failed
+        timings.finish("failed")
+
+        # Chunks are stored batch by batch; don't leave a partial set behind
+        try:
+            purged = await chunk_repo.purge_document(document_id, settings.CHUNK_DELETE_BATCH_SIZE)
+            if purged:
+                print(f"🧹 [BgTask] Removed {purged} partially stored chunks")
+        except Exception as purge_e:
+            print(f"⚠️ [BgTask] Could not remove partial chunks: {purge_e}")
         
-        supabase.table("documents").update(update_data).eq("id", document_id).execute()
+        # Save the error message alongside the failed status
+        error_msg = str(e)
+        await progress.stage("failed", extra={"status": "failed"}, error=error_msg)
         print(f"Error processing document {document_id}: {str(e)}")
 
 @router.post("/upload")
@@ -150,16 +215,23 @@ async def upload_document(
     background_tasks.add_task(
         process_document_background,
         document["id"],
-        document["file_path"]
+        document["file_path"],
+        current_user["user_id"]
     )
     
     return document
 
 @router.get("")
-async def get_documents(current_user: dict = Depends(get_current_user)):
-    """Get all documents for current user"""
+async def get_documents(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get documents for current user (paginated, next page cursor in X-Next-Cursor)"""
     doc_service = DocumentService()
-    return await doc_service.get_user_documents(current_user["user_id"])
+    documents, next_cursor = await doc_service.get_user_documents(current_user["user_id"], page)
+    set_next_cursor(response, next_cursor)
+    return documents
 
 @router.get("/{document_id}")
 async def get_document(
@@ -175,41 +247,90 @@ async def get_document_status(
     document_id: str, 
     current_user: dict = Depends(get_current_user)
 ):
-    """Get specific document processing status"""
-    supabase = get_supabase_client()
-    
-    # Get document
-    result = supabase.table("documents")\
-        .select("id, status, error_message, created_at, page_count")\
-        .eq("id", document_id)\
-        .eq("user_id", current_user["user_id"])\
-        .single()\
-        .execute()
+    """Get specific document processing status (one primary-key read of the progress counters)"""
+    doc = await DocumentRepository().get_for_user(
+        document_id,
+        current_user["user_id"],
+        f"id, status, page_count, {PROGRESS_COLUMNS}"
+    )
         
-    if not result.data:
+    if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
         
-    doc = result.data
-    
-    # Get chunk count to see progress
-    chunks_count = 0
-    try:
-        chunks_res = supabase.table("document_chunks")\
-            .select("id", count="exact")\
-            .eq("document_id", document_id)\
-            .execute()
-        chunks_count = chunks_res.count
-    except:
-        pass
-        
     return {
         "id": doc["id"],
         "status": doc["status"],
+        "stage": doc.get("stage"),
         "page_count": doc.get("page_count"),
-        "chunks_created": chunks_count,
+        "pages_extracted": doc.get("pages_extracted"),
+        "chunks_total": doc.get("chunks_total"),
+        "chunks_embedded": doc.get("chunks_embedded"),
+        "chunks_stored": doc.get("chunks_stored"),
+        "chunks_created": doc.get("chunks_stored"),  # Kept for older clients
+        "error_message": doc.get("error_message"),
         "is_ready": doc["status"] == "ready"
     }
 
+def _sse(snapshot: dict) -> str:
+    return f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+
+@router.get("/{document_id}/events")
+async def stream_document_events(
+    document_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of processing progress (stage, pages extracted,
+    chunks embedded/stored). Sends a snapshot first and closes after
+    'ready' or 'failed'.
+    """
+    documents = DocumentRepository()
+    columns = f"id, status, {PROGRESS_COLUMNS}"
+    doc = await documents.get_for_user(document_id, current_user["user_id"], columns)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    bus = get_progress_bus()
+
+    def db_snapshot(row: dict) -> dict:
+        snapshot = {k: v for k, v in row.items() if k not in ("id", "status", "error_message") and v is not None}
+        snapshot.update(document_id=row["id"])
+        # Terminal status wins over a stage that was never persisted
+        if row["status"] in TERMINAL_STAGES or not snapshot.get("stage"):
+            snapshot["stage"] = row["status"]
+        if row.get("error_message"):
+            snapshot["error"] = row["error_message"]
+        return snapshot
+
+    async def events():
+        async for snapshot in bus.subscribe(document_id, settings.PROGRESS_STREAM_FALLBACK_SECONDS, db_snapshot(doc)):
+            if snapshot is not None:
+                yield _sse(snapshot)
+                continue
+
+            # Quiet for a while: the job may be running in another worker
+            if bus.state(document_id) is None:
+                row = await documents.get_for_user(document_id, current_user["user_id"], columns)
+                if row is None or row["status"] in TERMINAL_STAGES:
+                    yield _sse(db_snapshot(row) if row else {"document_id": document_id, "stage": "failed"})
+                    return
+            yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/bulk-delete")
+async def bulk_delete_documents(
+    request: BulkDeleteRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Delete many documents at once; returns the ids that were deleted"""
+    doc_service = DocumentService()
+    return await doc_service.delete_documents(request.document_ids, current_user["user_id"])
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: str,
@@ -2,11 +2,12 @@
 """
 Notebooks management routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from app.core.auth import get_current_user
 from app.models.schemas import NotebookCreate, NotebookUpdate, NotebookResponse
 from app.services.notebook_service import NotebookService
+from app.core.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
@@ -23,10 +24,16 @@ async def create_notebook(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[NotebookResponse])
-async def get_notebooks(current_user: dict = Depends(get_current_user)):
-    """List all user notebooks"""
+async def get_notebooks(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """List user notebooks (paginated, next page cursor in X-Next-Cursor)"""
     service = NotebookService()
-    return await service.get_user_notebooks(current_user["user_id"])
+    notebooks, next_cursor = await service.get_user_notebooks(current_user["user_id"], page)
+    set_next_cursor(response, next_cursor)
+    return notebooks
 
 @router.get("/{notebook_id}", response_model=NotebookResponse)
 async def get_notebook(
@@ -1,20 +1,26 @@
 """
 Notes generation routes (placeholder for Phase 3)
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List
 from app.core.auth import get_current_user
-from app.models.schemas import NotesRequest, NotesResponse
+from app.core.pagination import PageParams, page_params, set_next_cursor
+from app.repositories.loader import RequestLoaders, get_request_loaders, require_documents
+from app.models.schemas import NotesRequest, NotesResponse, NoteListItem
 
 router = APIRouter()
 
 @router.post("/generate", response_model=NotesResponse)
 async def generate_notes(
     request: NotesRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
     """Generate and save notes from documents"""
     from app.services.notes_service import NotesService
     
+    # Chunks of deleted documents stay until the sweeper purges them
+    await require_documents(loaders, request.document_ids, current_user["user_id"])
     service = NotesService()
     try:
         # We use create_note which persists it
@@ -23,9 +29,28 @@ async def generate_notes(
         # Fallback if DB fails? Or just bubble up.
         raise e
 
-@router.get("", response_model=list[NotesResponse])
-async def get_notes(current_user: dict = Depends(get_current_user)):
-    """Get all user notes"""
+@router.get("", response_model=List[NoteListItem])
+async def get_notes(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get user notes without bodies (paginated, next page cursor in X-Next-Cursor)"""
+    from app.services.notes_service import NotesService
+    service = NotesService()
+    notes, next_cursor = await service.get_user_notes(current_user["user_id"], page)
+    set_next_cursor(response, next_cursor)
+    return notes
+
+@router.get("/{note_id}", response_model=NotesResponse)
+async def get_note(
+    note_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a note with its full content"""
     from app.services.notes_service import NotesService
     service = NotesService()
-    return await service.get_user_notes(current_user["user_id"])
+    note = await service.get_note(note_id, current_user["user_id"])
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return note
@@ -1,18 +1,21 @@
 """
 Study planner routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from app.core.auth import get_current_user
-from app.models.schemas import StudyPlanRequest, StudyPlanResponse
+from app.models.schemas import StudyPlanRequest, StudyPlanResponse, StudyPlanListItem
+from app.core.pagination import PageParams, page_params, set_next_cursor
 from app.services.planner_service import PlannerService
+from app.repositories.loader import RequestLoaders, get_request_loaders
 
 router = APIRouter()
 
 @router.post("/generate", response_model=StudyPlanResponse)
 async def generate_study_plan(
     request: StudyPlanRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
     """Generate study plan from documents"""
     service = PlannerService()
@@ -21,17 +24,36 @@ async def generate_study_plan(
             user_id=current_user["user_id"],
             document_ids=request.document_ids,
             exam_date=request.exam_date,
-            hours_per_day=request.hours_per_day
+            hours_per_day=request.hours_per_day,
+            loaders=loaders
         )
         return plan
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("", response_model=List[StudyPlanResponse])
-async def get_plans(current_user: dict = Depends(get_current_user)):
-    """Get all user plans"""
+@router.get("", response_model=List[StudyPlanListItem])
+async def get_plans(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get user plan summaries without plan JSON (paginated, next page cursor in X-Next-Cursor)"""
+    service = PlannerService()
+    plans, next_cursor = await service.get_user_plans(current_user["user_id"], page)
+    set_next_cursor(response, next_cursor)
+    return plans
+
+@router.get("/{plan_id}", response_model=StudyPlanResponse)
+async def get_plan(
+    plan_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a plan with its full day-by-day JSON"""
     service = PlannerService()
-    return await service.get_user_plans(current_user["user_id"])
+    plan = await service.get_plan(plan_id, current_user["user_id"])
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return plan
 
 @router.patch("/{plan_id}/tasks/{task_id}")
 async def update_task(
@@ -44,19 +66,11 @@ async def update_task(
     service = PlannerService()
     success = await service.update_task_status(
         plan_id=plan_id,
-        day_number=-1, # Not needed if searching solely by task_id in JSON or we need to pass it. 
-                   # Service implementation assumed searching all days, 
-                   # but passing day_number might be efficient. 
-                   # For now, let's stick to the service signature or update it.
-                   # Checking service... it takes day_number. I should probably accept it in query or body.
-                   # Let's simplify service generic search or pass day_number.
+        day_number=-1, # Unknown: the task is resolved through the plan's task_id index
         task_id=task_id,
         is_completed=completed,
         user_id=current_user["user_id"]
     )
-    # Wait, the service signature I wrote earlier was: update_task_status(plan_id, day_number, task_id, is_completed, user_id)
-    # I need to get day_number from request body or query param.
-    # Let's assume the frontend sends it.
     
     return {"success": success} 
 
@@ -78,3 +92,15 @@ async def update_task_status(
         user_id=current_user["user_id"]
     )
     return {"success": success}
+
+@router.post("/{plan_id}/replan", response_model=StudyPlanResponse)
+async def replan_study_plan(
+    plan_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Re-spread unfinished tasks over the remaining days (local, no LLM call)"""
+    service = PlannerService()
+    try:
+        return await service.replan(plan_id, current_user["user_id"])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -3,6 +3,7 @@ Quiz generation routes (placeholder for Phase 3)
 """
 from fastapi import APIRouter, Depends
 from app.core.auth import get_current_user
+from app.repositories.loader import RequestLoaders, get_request_loaders, require_documents
 from app.models.schemas import QuizRequest, QuizResponse
 
 router = APIRouter()
@@ -10,18 +11,22 @@ router = APIRouter()
 @router.post("/generate", response_model=QuizResponse)
 async def generate_quiz(
     request: QuizRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
     """Generate quiz from documents"""
     from app.services.quiz_service import QuizService
     
     service = QuizService()
     doc_id = request.document_ids[0]
+    # Chunks of deleted documents stay until the sweeper purges them
+    await require_documents(loaders, [doc_id], current_user["user_id"])
     
     result = await service.generate_quiz(
         doc_id, 
         request.num_questions, 
-        request.difficulty
+        request.difficulty,
+        user_id=current_user["user_id"]
     )
     
     return result
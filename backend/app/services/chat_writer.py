@@ -0,0 +1,166 @@
+"""
+Write-behind persistence for chat sessions and messages
+
+chat_query no longer waits on database writes: session and message rows are
+queued in memory and a background task upserts them in batches across
+requests. Sessions are flushed before messages so foreign keys hold. Rows
+carry API-generated UUIDv7 ids and client-set timestamps, and upserts ignore
+duplicates, so a retried batch is idempotent. Pending rows are flushed on
+graceful shutdown; a hard crash can lose at most one flush interval.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.repositories.chat import ChatRepository
+
+
+class ChatWriteBuffer:
+    def __init__(self, flush_interval: float, batch_size: int, max_pending: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.repo = ChatRepository()
+
+        self._sessions: Dict[str, dict] = {}
+        self._messages: List[dict] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write everything still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.pending:
+            print(f"❌ [ChatWriter] {self.pending} rows could not be written on shutdown")
+
+    @property
+    def pending(self) -> int:
+        return len(self._sessions) + len(self._messages)
+
+    def add_session(self, session: dict):
+        self._sessions.setdefault(session["id"], session)
+        self._notify()
+
+    def add_messages(self, messages: List[dict]):
+        self._messages.extend(messages)
+        self._notify()
+
+    def has_pending(self, session_id: str) -> bool:
+        return session_id in self._sessions or any(m["session_id"] == session_id for m in self._messages)
+
+    def _notify(self):
+        if self._wakeup is not None and self.pending >= self.batch_size:
+            self._wakeup.set()
+        if self._task is None:
+            # Not started (e.g. scripts, tests): write without the background loop
+            asyncio.ensure_future(self.flush())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write pending rows; on failure they are kept for the next flush"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            while self.pending:
+                sessions = list(self._sessions.values())[:self.batch_size]
+                messages = self._messages[:self.batch_size] if len(sessions) < self.batch_size else []
+                written = 0
+                try:
+                    if sessions:
+                        written += await self._write(self.repo.upsert_sessions, sessions)
+                        for session in sessions:
+                            self._sessions.pop(session["id"], None)
+                    if messages:
+                        written += await self._write(self.repo.upsert_messages, messages)
+                        del self._messages[:len(messages)]
+                except Exception as e:
+                    self.failures += 1
+                    print(f"⚠️ [ChatWriter] Flush failed, {self.pending} rows kept: {e}")
+                    self._drop_overflow()
+                    return
+
+                self.flushes += 1
+                self.rows_written += written
+
+    async def _write(self, upsert: Callable[[List[dict]], Awaitable[None]], rows: List[dict]) -> int:
+        """
+        Upsert a batch. If the database rejects it (bad row rather than an
+        outage), retry row by row and drop only the rejected rows so one bad
+        row cannot block every later flush.
+        """
+        from postgrest.exceptions import APIError  # Loaded with the client by the first flush
+        try:
+            await upsert(rows)
+            return len(rows)
+        except APIError as e:
+            print(f"⚠️ [ChatWriter] Batch rejected ({e.message}), retrying rows individually")
+
+        written = 0
+        for row in rows:
+            try:
+                await upsert([row])
+                written += 1
+            except APIError as row_error:
+                self.failures += 1
+                print(f"❌ [ChatWriter] Dropped row {row.get('id')}: {row_error.message}")
+        return written
+
+    def _drop_overflow(self):
+        # Bound memory while the database is unreachable; oldest messages go first
+        overflow = len(self._messages) - self.max_pending
+        if overflow > 0:
+            del self._messages[:overflow]
+            print(f"❌ [ChatWriter] Dropped {overflow} chat messages (buffer full)")
+
+    async def flush_session(self, session_id: str):
+        """Read-your-writes: make sure a session's pending rows are stored before reading it"""
+        if self.has_pending(session_id):
+            await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures
+        }
+
+
+_chat_writer: Optional[ChatWriteBuffer] = None
+
+def get_chat_writer() -> ChatWriteBuffer:
+    """Get chat write-behind buffer instance (Singleton per worker)"""
+    global _chat_writer
+    if _chat_writer is None:
+        _chat_writer = ChatWriteBuffer(
+            flush_interval=settings.CHAT_WRITE_FLUSH_MS / 1000,
+            batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+            max_pending=settings.CHAT_WRITE_MAX_PENDING
+        )
+    return _chat_writer
@@ -3,14 +3,16 @@ Document upload and management service
 """
 import os
 import uuid
-from typing import List
+from typing import List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
-from app.core.auth import get_supabase_client
+from app.core.pagination import PageParams
+from app.repositories.documents import DocumentRepository
+from app.services.storage_service import StorageService
 
 class DocumentService:
     def __init__(self):
-        self.supabase = get_supabase_client()
+        self.documents = DocumentRepository()
     
     async def upload_document(self, file: UploadFile, user_id: str) -> dict:
         """Upload PDF to Supabase Storage and create database record"""
@@ -19,9 +21,11 @@ class DocumentService:
         if not file.filename.endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Read file
-        contents = await file.read()
-        file_size = len(contents)
+        # Size without reading the (spooled) upload into memory
+        file_size = file.size
+        if file_size is None:
+            file.file.seek(0, os.SEEK_END)
+            file_size = file.file.tell()
         
         if file_size > settings.MAX_UPLOAD_SIZE:
             raise HTTPException(status_code=400, detail="File too large")
@@ -31,11 +35,12 @@ class DocumentService:
         file_path = f"{user_id}/{file_id}.pdf"
         
         try:
-            # Upload to Supabase Storage
-            self.supabase.storage.from_("documents").upload(
+            # Stream to Supabase Storage
+            await StorageService("documents").upload_stream(
                 file_path,
-                contents,
-                {"content-type": "application/pdf"}
+                file,
+                file_size,
+                "application/pdf"
             )
             
             # Create database record
@@ -47,46 +52,34 @@ class DocumentService:
                 "status": "processing"
             }
             
-            result = self.supabase.table("documents").insert(document_data).execute()
-            
-            return result.data[0]
+            return await self.documents.insert(document_data)
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     
-    async def get_user_documents(self, user_id: str) -> List[dict]:
-        """Get all documents for a user"""
-        result = self.supabase.table("documents")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .order("created_at", desc=True)\
-            .execute()
-        
-        return result.data
+    async def get_user_documents(self, user_id: str, page: PageParams) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of a user's documents and the next cursor"""
+        return await self.documents.list_page(user_id, page)
     
     async def get_document(self, document_id: str, user_id: str) -> dict:
         """Get a specific document"""
-        result = self.supabase.table("documents")\
-            .select("*")\
-            .eq("id", document_id)\
-            .eq("user_id", user_id)\
-            .single()\
-            .execute()
+        document = await self.documents.get_for_user(document_id, user_id)
         
-        if not result.data:
+        if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        return result.data
+        return document
     
     async def delete_document(self, document_id: str, user_id: str):
-        """Delete a document"""
-        # Get document to get file path
-        document = await self.get_document(document_id, user_id)
-        
-        # Delete from storage
-        self.supabase.storage.from_("documents").remove([document["file_path"]])
+        """Delete a document (hidden now; storage and chunks are purged by the sweeper)"""
+        deleted = await self.documents.mark_deleted([document_id], user_id)
         
-        # Delete from database (cascades to chunks)
-        self.supabase.table("documents").delete().eq("id", document_id).execute()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Document not found")
         
         return {"message": "Document deleted successfully"}
+    
+    async def delete_documents(self, document_ids: List[str], user_id: str) -> dict:
+        """Delete many documents in one update; unknown or foreign ids are skipped"""
+        deleted = await self.documents.mark_deleted(list(dict.fromkeys(document_ids)), user_id)
+        return {"deleted": deleted}
@@ -0,0 +1,90 @@
+"""
+Background purge of soft-deleted documents
+
+Deleting a document only sets deleted_at, so requests return immediately and
+the document disappears from every query. This sweeper reclaims the rest off
+the request path: storage objects are removed in one call per pass, chunks
+are deleted in small batches (keeping each statement's lock and vector-index
+work short), and the document row goes last. Every step is idempotent, so
+sweepers in several workers can overlap safely.
+"""
+import asyncio
+from typing import Optional
+from app.core.config import settings
+from app.core.auth import get_async_supabase_client
+from app.repositories.documents import DocumentRepository
+from app.repositories.chunks import ChunkRepository
+
+
+class DocumentSweeper:
+    def __init__(self, interval: float, documents_per_pass: int, chunk_batch_size: int):
+        self.interval = interval
+        self.documents_per_pass = documents_per_pass
+        self.chunk_batch_size = chunk_batch_size
+        self.documents = DocumentRepository()
+        self.chunks = ChunkRepository()
+        self._task: Optional[asyncio.Task] = None
+
+        self.documents_purged = 0
+        self.chunks_purged = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep going while there is a backlog, then wait for the next interval
+                while await self.sweep() == self.documents_per_pass:
+                    pass
+            except Exception as e:
+                print(f"⚠️ [Sweeper] Pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """Purge one batch of deleted documents; returns how many were handled"""
+        pending = await self.documents.list_deleted(self.documents_per_pass)
+        if not pending:
+            return 0
+
+        paths = [doc["file_path"] for doc in pending if doc.get("file_path")]
+        if paths:
+            supabase = await get_async_supabase_client()
+            await supabase.storage.from_("documents").remove(paths)
+
+        for doc in pending:
+            while True:
+                deleted = await self.chunks.purge_batch(doc["id"], self.chunk_batch_size)
+                self.chunks_purged += deleted
+                if deleted < self.chunk_batch_size:
+                    break
+                await asyncio.sleep(0)  # Let request handlers run between batches
+            await self.documents.delete(doc["id"])
+            self.documents_purged += 1
+
+        print(f"🧹 [Sweeper] Purged {len(pending)} deleted documents")
+        return len(pending)
+
+
+_document_sweeper: Optional[DocumentSweeper] = None
+
+def get_document_sweeper() -> DocumentSweeper:
+    """Get document sweeper instance (Singleton per worker)"""
+    global _document_sweeper
+    if _document_sweeper is None:
+        _document_sweeper = DocumentSweeper(
+            interval=settings.DOCUMENT_SWEEP_INTERVAL_SECONDS,
+            documents_per_pass=settings.DOCUMENT_SWEEP_BATCH_SIZE,
+            chunk_batch_size=settings.CHUNK_DELETE_BATCH_SIZE
+        )
+    return _document_sweeper
@@ -1,27 +1,48 @@
 """
 OpenAI embedding service
 """
-from openai import AsyncOpenAI
-from typing import List
+from typing import List, Optional
 from app.core.config import settings
+from app.core.openai_client import get_openai_client
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_tokens
 
 class EmbeddingService:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.model = settings.OPENAI_EMBEDDING_MODEL
-    
-    async def create_embedding(self, text: str) -> List[float]:
+        self.scheduler = get_llm_scheduler(self.model)
+        self.tokens_used = 0  # Reported usage across this instance's calls
+
+    async def create_embedding(
+        self,
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: Optional[str] = None
+    ) -> List[float]:
         """Create embedding for a single text"""
-        response = await self.client.embeddings.create(
-            model=self.model,
-            input=text
-        )
+        async with self.scheduler.reserve(priority, user_id, tokens=estimate_tokens(text)) as slot:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=text
+            )
+            slot.settle(response.usage.total_tokens if response.usage else None)
+        if response.usage:
+            self.tokens_used += response.usage.total_tokens
         return response.data[0].embedding
-    
-    async def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+
+    async def create_embeddings_batch(
+        self,
+        texts: List[str],
+        priority: Priority = Priority.INGESTION,
+        user_id: Optional[str] = None
+    ) -> List[List[float]]:
         """Create embeddings for multiple texts"""
-        response = await self.client.embeddings.create(
-            model=self.model,
-            input=texts
-        )
+        async with self.scheduler.reserve(priority, user_id, tokens=estimate_tokens(*texts)) as slot:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=texts
+            )
+            slot.settle(response.usage.total_tokens if response.usage else None)
+        if response.usage:
+            self.tokens_used += response.usage.total_tokens
         return [item.embedding for item in response.data]
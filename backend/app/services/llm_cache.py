@@ -0,0 +1,166 @@
+"""
+Persistent LLM response cache (SQLite)
+
+Completions are keyed by a hash of (model, messages, parameters) and stored in
+a local SQLite file in WAL mode, so the cache survives restarts and is shared
+by every uvicorn worker on the host. The file is bounded in size and evicts
+least recently used entries. Routes opt in through settings.LLM_CACHE_ROUTES.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+
+
+def make_cache_key(model: str, messages: List[dict], params: dict) -> str:
+    """Hash of everything that determines a completion"""
+    raw = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; asyncio.to_thread runs on a pool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                route TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+
+    def get(self, key: str, ttl_seconds: int = 0) -> Optional[str]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        value, created_at = row
+        if ttl_seconds and now - created_at > ttl_seconds:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+        conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return value
+
+    def set(self, key: str, route: str, value: str):
+        conn = self._connection()
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, route, value, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, route, value, size, now, now)
+        )
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until the file is back under budget
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    async def aget(self, key: str, ttl_seconds: int = 0) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key, ttl_seconds)
+
+    async def aset(self, key: str, route: str, value: str):
+        await asyncio.to_thread(self.set, key, route, value)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get LLM response cache instance (Singleton)"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES)
+    return _llm_cache
+
+
+async def cached_completion(
+    route: str,
+    model: str,
+    messages: List[dict],
+    params: dict,
+    call: Callable[[], Awaitable[str]]
+) -> str:
+    """
+    Return the cached completion for this exact request if the route opted in,
+    otherwise run call() (which returns the completion text) and store it.
+    """
+    ttl = settings.LLM_CACHE_ROUTES.get(route)
+    if not settings.LLM_CACHE_ENABLED or ttl is None:
+        return await call()
+
+    cache = get_llm_cache()
+    key = make_cache_key(model, messages, params)
+
+    try:
+        cached = await cache.aget(key, ttl)
+        if cached is not None:
+            return cached
+    except sqlite3.Error as e:
+        print(f"⚠️ [LLMCache] Lookup failed: {e}")
+
+    value = await call()
+
+    if value:
+        try:
+            await cache.aset(key, route, value)
+        except sqlite3.Error as e:
+            print(f"⚠️ [LLMCache] Store failed: {e}")
+
+    return value
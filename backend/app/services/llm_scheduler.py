@@ -0,0 +1,185 @@
+"""
+Client-side scheduler for OpenAI traffic
+
+Every OpenAI call reserves capacity here before it is sent. Requests are
+admitted in strict priority order (interactive chat > generation endpoints >
+background ingestion), and inside a lane users are served by weighted fair
+queuing so one user's bulk upload cannot starve everyone else. Admission is
+gated by two token buckets: requests/min and tokens/min.
+
+Limits are per worker process and per model, since OpenAI enforces them per model.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import observe_llm_call
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # Chat queries
+    GENERATION = 1   # Summary / quiz / notes / planner endpoints
+    INGESTION = 2    # Background document processing
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 chars per token) plus the completion budget"""
+    return sum(len(t) for t in texts if t) // 4 + max_tokens + 1
+
+
+def estimate_message_tokens(messages: List[dict], max_tokens: int = 0) -> int:
+    """Token estimate for a chat completion request"""
+    return estimate_tokens(*[m.get("content") or "" for m in messages], max_tokens=max_tokens)
+
+
+class TokenBucket:
+    """Continuously refilling bucket sized to one minute of allowance"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (oversized requests wait for a full bucket)"""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        # May go negative: oversized requests and usage corrections are paid back by refill
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens")
+
+    def __init__(self, future: asyncio.Future, tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+
+class Reservation:
+    """Capacity granted to one call; settle() corrects the token estimate with real usage"""
+
+    def __init__(self, scheduler: "LLMScheduler", tokens: int):
+        self.scheduler = scheduler
+        self.tokens = tokens
+        self.started_at = time.monotonic()
+        self.used_tokens: Optional[int] = None
+
+    def settle(self, used_tokens: Optional[int]):
+        if used_tokens is None:
+            return
+        self.scheduler._token_bucket.consume(used_tokens - self.tokens)
+        self.tokens = used_tokens
+        self.used_tokens = used_tokens
+
+
+class LLMScheduler:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, model: str = ""):
+        self.model = model
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._queue: List[Tuple[int, float, int, _Waiter]] = []
+        self._seq = itertools.count()
+        # WFQ state per lane: virtual clock and each user's last finish tag
+        self._virtual_time: Dict[int, float] = {}
+        self._last_finish: Dict[int, Dict[str, float]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, priority: Priority, user_id: Optional[str] = None, tokens: int = 1, weight: float = 1.0):
+        """Wait until the request may be sent"""
+        loop = asyncio.get_running_loop()
+        lane = int(priority)
+        user_key = user_id or "anonymous"
+
+        # Finish tag = max(lane clock, user's previous tag) + cost / weight
+        lane_finish = self._last_finish.setdefault(lane, {})
+        start_tag = max(self._virtual_time.get(lane, 0.0), lane_finish.get(user_key, 0.0))
+        finish_tag = start_tag + tokens / max(weight, 1e-6)
+        lane_finish[user_key] = finish_tag
+
+        waiter = _Waiter(loop.create_future(), tokens)
+        heapq.heappush(self._queue, (lane, finish_tag, next(self._seq), waiter))
+
+        # A new arrival may outrank the current head, so re-evaluate now
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._dispatch()
+
+        await waiter.future
+
+    @asynccontextmanager
+    async def reserve(self, priority: Priority, user_id: Optional[str] = None, tokens: int = 1, weight: float = 1.0):
+        """Async context manager around acquire(); yields a Reservation to settle real usage"""
+        await self.acquire(priority, user_id=user_id, tokens=tokens, weight=weight)
+        reservation = Reservation(self, tokens)
+        outcome = "error"
+        try:
+            yield reservation
+            outcome = "ok"
+        finally:
+            observe_llm_call(
+                self.model,
+                priority.name.lower(),
+                time.monotonic() - reservation.started_at,
+                reservation.used_tokens,
+                outcome
+            )
+
+    def _dispatch(self):
+        self._timer = None
+        now = time.monotonic()
+
+        while self._queue:
+            lane, finish_tag, _, waiter = self._queue[0]
+            if waiter.future.done():
+                # Caller was cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+
+            wait = max(
+                self._request_bucket.wait_time(1, now),
+                self._token_bucket.wait_time(waiter.tokens, now)
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self._request_bucket.consume(1)
+            self._token_bucket.consume(waiter.tokens)
+            self._virtual_time[lane] = finish_tag
+            waiter.future.set_result(None)
+
+        # Idle: reset fairness state so it does not grow without bound
+        self._virtual_time.clear()
+        self._last_finish.clear()
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+
+def get_llm_scheduler(model: str) -> LLMScheduler:
+    """Get the scheduler for a model (Singleton per model)"""
+    scheduler = _schedulers.get(model)
+    if scheduler is None:
+        scheduler = LLMScheduler(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE, model)
+        _schedulers[model] = scheduler
+    return scheduler
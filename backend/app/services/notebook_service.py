@@ -1,12 +1,13 @@
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from app.core.auth import get_supabase_client
+from app.repositories.notebooks import NotebookRepository
 from app.models.schemas import NotebookCreate, NotebookUpdate
+from app.core.pagination import PageParams
 
 class NotebookService:
     def __init__(self):
-        self.supabase = get_supabase_client()
+        self.notebooks = NotebookRepository()
 
     async def create_notebook(self, user_id: str, notebook_data: NotebookCreate) -> Dict[str, Any]:
         data = {
@@ -15,31 +16,21 @@ class NotebookService:
             "document_ids": notebook_data.document_ids or []
         }
         
-        result = self.supabase.table("notebooks").insert(data).execute()
-        if not result.data:
+        notebook = await self.notebooks.insert(data)
+        if not notebook:
             raise Exception("Failed to create notebook")
             
-        return result.data[0]
+        return notebook
 
-    async def get_user_notebooks(self, user_id: str) -> List[Dict[str, Any]]:
-        result = self.supabase.table("notebooks")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .order("updated_at", desc=True)\
-            .execute()
-        return result.data
+    async def get_user_notebooks(self, user_id: str, page: PageParams) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await self.notebooks.list_page(user_id, page)
 
     async def get_notebook(self, notebook_id: str, user_id: str) -> Dict[str, Any]:
-        result = self.supabase.table("notebooks")\
-            .select("*")\
-            .eq("id", notebook_id)\
-            .eq("user_id", user_id)\
-            .single()\
-            .execute()
+        notebook = await self.notebooks.get_for_user(notebook_id, user_id)
             
-        if not result.data:
+        if not notebook:
             raise Exception("Notebook not found")
-        return result.data
+        return notebook
 
     async def update_notebook(self, notebook_id: str, user_id: str, updates: NotebookUpdate) -> Dict[str, Any]:
         data = {}
@@ -51,20 +42,12 @@ class NotebookService:
         if not data:
             return await self.get_notebook(notebook_id, user_id)
             
-        result = self.supabase.table("notebooks")\
-            .update(data)\
-            .eq("id", notebook_id)\
-            .eq("user_id", user_id)\
-            .execute()
+        notebook = await self.notebooks.update_for_user(notebook_id, user_id, data)
             
-        if not result.data:
+        if not notebook:
             raise Exception("Failed to update notebook")
-        return result.data[0]
+        return notebook
 
     async def delete_notebook(self, notebook_id: str, user_id: str):
-        result = self.supabase.table("notebooks")\
-            .delete()\
-            .eq("id", notebook_id)\
-            .eq("user_id", user_id)\
-            .execute()
+        await self.notebooks.delete_for_user(notebook_id, user_id)
         return {"success": True}
@@ -1,37 +1,49 @@
 """
 Notes Generation Service
 """
-from openai import AsyncOpenAI
 from app.core.config import settings
-from app.core.auth import get_supabase_client
+from app.core.openai_client import get_openai_client
+from app.repositories.chunks import ChunkRepository
+from app.repositories.notes import NoteRepository
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_message_tokens
+from app.services.single_flight import get_single_flight, make_key
+from app.services.llm_cache import cached_completion
+from app.core.pagination import PageParams
+from typing import List, Optional, Tuple
 import datetime
 import uuid
 
-_openai_client = None
-
 class NotesService:
     def __init__(self):
-        global _openai_client
-        if _openai_client is None:
-            _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.client = _openai_client
+        self.client = get_openai_client()
         self.model = settings.OPENAI_MODEL
-        self.supabase = get_supabase_client()
+        self.chunks = ChunkRepository()
+        self.notes = NoteRepository()
+        self.scheduler = get_llm_scheduler(self.model)
+        self.single_flight = get_single_flight("notes")
 
-    async def generate_notes(self, document_id: str, topic: str = None) -> dict:
+    async def generate_notes(self, document_id: str, topic: str = None, user_id: Optional[str] = None) -> dict:
         """Generate study notes from document"""
+        normalized_topic = " ".join(topic.split()).lower() if topic else ""
+        key = make_key(self.model, document_id, normalized_topic)
+        content = await self.single_flight.do(
+            key, lambda: self._generate_content(document_id, topic, user_id)
+        )
         
+        return {
+            "id": str(uuid.uuid4()),
+            "content": content,
+            "created_at": datetime.datetime.now().isoformat(),
+            "title": f"Notes on {topic}" if topic else "Study Notes"
+        }
+
+    async def _generate_content(self, document_id: str, topic: Optional[str], user_id: Optional[str]) -> str:
         # Get document chunks (context)
         # Fetch first 8 chunks (approx 8000 tokens context) for general notes
         # In a real app, we would use vector search if topic is provided
-        chunks = self.supabase.table("document_chunks")\
-            .select("content")\
-            .eq("document_id", document_id)\
-            .order("chunk_index")\
-            .limit(8)\
-            .execute()
+        chunks = await self.chunks.first_chunks(document_id, limit=8)
             
-        context = "\n".join([c['content'] for c in chunks.data])
+        context = "\n".join([c['content'] for c in chunks])
         
         prompt = f"""Create detailed study notes based on the following document content.
         Use Markdown formatting (Headers, bullet points, bold text).
@@ -43,45 +55,30 @@ class NotesService:
         {context[:15000]}
         """
         
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an expert tutor creating study materials."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        
-        content = response.choices[0].message.content
+        messages = [
+            {"role": "system", "content": "You are an expert tutor creating study materials."},
+            {"role": "user", "content": prompt}
+        ]
         
-        # Persist note in Supabase
-        user = self.supabase.auth.get_user()
-        user_id = user.user.id if user else None 
-        # Note: In a real service we get user_id passed in or from context. 
-        # Here we rely on AuthMiddleware or passed arguments.
-        # Actually generate_notes doesn't take user_id. We should pass it or handle it.
-        # But wait, self.supabase is service role or anon? 
-        # get_supabase_client() usually returns client with service key or anon key.
-        # If we need RLS we need authenticated client. 
-        # Current architecture passes user_id to route handlers.
+        params = {"temperature": 0.7}
         
-        # Return dict for now, but to persist we need user_id. 
-        # I'll update signature in next step or assume caller handles persistence?
-        # No, service should handle it if it has access.
-        # Let's return the content and handle persistence in route or update here.
+        async def call() -> str:
+            async with self.scheduler.reserve(Priority.GENERATION, user_id, tokens=estimate_message_tokens(messages, 2000)) as slot:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **params
+                )
+                slot.settle(response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
         
-        # BETTER APPROACH: Update method signature to accept user_id.
-        return {
-            "id": str(uuid.uuid4()),
-            "content": content,
-            "created_at": datetime.datetime.now().isoformat(),
-            "title": f"Notes on {topic}" if topic else "Study Notes"
-        }
+        # Persistence is per user and happens in create_note, outside the shared call
+        return await cached_completion("notes", self.model, messages, params, call)
 
     async def create_note(self, user_id: str, document_ids: list, topic: str) -> dict:
         """Generate and save note"""
         # 1. Generate content
-        gen_result = await self.generate_notes(document_ids[0], topic)
+        gen_result = await self.generate_notes(document_ids[0], topic, user_id=user_id)
         content = gen_result["content"]
         title = gen_result["title"]
         
@@ -93,10 +90,12 @@ class NotesService:
             "content": content
         }
         
-        res = self.supabase.table("notes").insert(data).execute()
-        return res.data[0]
+        return await self.notes.insert(data)
+
+    async def get_user_notes(self, user_id: str, page: PageParams) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of a user's notes (without bodies) and the next cursor"""
+        return await self.notes.list_page(user_id, page)
 
-    async def get_user_notes(self, user_id: str) -> list:
-        """Get all notes for a user"""
-        res = self.supabase.table("notes").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return res.data
+    async def get_note(self, note_id: str, user_id: str) -> Optional[dict]:
+        """Get a note with its full content"""
+        return await self.notes.get_for_user(note_id, user_id)
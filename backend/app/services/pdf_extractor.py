@@ -1,23 +1,23 @@
 """
 PDF text extraction service
 """
-import PyPDF2
-from typing import List, Dict
+from typing import BinaryIO, List, Dict, Union
 from io import BytesIO
 
 class PDFExtractor:
     @staticmethod
-    def extract_text(pdf_bytes: bytes) -> Dict[str, any]:
+    def extract_text(pdf: Union[bytes, BinaryIO]) -> Dict[str, any]:
         """
-        Extract text from PDF bytes
+        Extract text from PDF bytes or a seekable binary file (e.g. an mmap)
         Returns: {
             'text': str,
             'page_count': int,
             'pages': List[str]
         }
         """
+        import PyPDF2  # Only ingestion workers pay for the import
         try:
-            pdf_file = BytesIO(pdf_bytes)
+            pdf_file = BytesIO(pdf) if isinstance(pdf, bytes) else pdf
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
             page_count = len(pdf_reader.pages)
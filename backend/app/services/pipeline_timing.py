@@ -0,0 +1,151 @@
+"""
+Per-stage timing for the document ingestion pipeline
+
+Each processing job gets a DocumentTimings record. Every stage (download,
+extract, chunk, embed, store, summary) runs inside a span that records its
+wall time plus whatever sizes the stage reports (bytes, pages, chunks,
+tokens). Stages entered once per batch (embed, store) add up in one span. Finished records are kept in a bounded in-memory store with
+per-stage latency histograms across all documents, served by the admin
+routes. Data is per worker.
+"""
+import bisect
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+from app.core.metrics import INGESTION_JOBS, INGESTION_STAGE_DURATION
+
+# Histogram bucket upper bounds (seconds); the last bucket is +Inf
+STAGE_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+MAX_RECORDS = 500
+
+
+class StageSpan:
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.attributes: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        """Record sizes for this stage (bytes, pages, chunks, tokens, ...)"""
+        self.attributes.update(attributes)
+
+    def add(self, **attributes):
+        """Accumulate sizes across batches"""
+        for key, value in attributes.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        data = {"stage": self.name, "seconds": round(self.seconds, 4), **self.attributes}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class DocumentTimings:
+    """Timing record for one processing job"""
+
+    def __init__(self, document_id: str):
+        self.document_id = document_id
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.total_seconds: Optional[float] = None
+        self.status = "processing"
+        self.spans: List[StageSpan] = []
+        INGESTION_JOBS.inc()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageSpan]:
+        span = next((s for s in self.spans if s.name == name), None)
+        if span is None:
+            span = StageSpan(name)
+            self.spans.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.seconds += time.perf_counter() - start
+
+    def finish(self, status: str):
+        if self.total_seconds is None:
+            INGESTION_JOBS.dec()
+        self.status = status
+        self.total_seconds = time.perf_counter() - self._start
+        get_timing_store().add(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "document_id": self.document_id,
+            "started_at": self.started_at.isoformat(),
+            "status": self.status,
+            "total_seconds": round(self.total_seconds, 4) if self.total_seconds is not None else None,
+            "stages": [span.to_dict() for span in self.spans]
+        }
+
+
+class StageHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(STAGE_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(STAGE_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self) -> dict:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(STAGE_BUCKETS + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 4),
+            "mean_seconds": round(self.sum / self.count, 4) if self.count else None,
+            "buckets": buckets
+        }
+
+
+class TimingStore:
+    def __init__(self, max_records: int):
+        self.max_records = max_records
+        self._records: "OrderedDict[str, DocumentTimings]" = OrderedDict()
+        self._histograms: Dict[str, StageHistogram] = {}
+
+    def add(self, record: DocumentTimings):
+        self._records[record.document_id] = record
+        self._records.move_to_end(record.document_id)
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+        for span in record.spans:
+            self._histograms.setdefault(span.name, StageHistogram()).observe(span.seconds)
+            INGESTION_STAGE_DURATION.labels(span.name).observe(span.seconds)
+        self._histograms.setdefault("total", StageHistogram()).observe(record.total_seconds or 0)
+
+    def get(self, document_id: str) -> Optional[dict]:
+        record = self._records.get(document_id)
+        return record.to_dict() if record else None
+
+    def recent(self, limit: int) -> List[dict]:
+        records = list(self._records.values())[-limit:]
+        return [record.to_dict() for record in reversed(records)]
+
+    def histograms(self) -> Dict[str, dict]:
+        return {name: hist.to_dict() for name, hist in self._histograms.items()}
+
+
+_timing_store: Optional[TimingStore] = None
+
+def get_timing_store() -> TimingStore:
+    """Get pipeline timing store instance (Singleton per worker)"""
+    global _timing_store
+    if _timing_store is None:
+        _timing_store = TimingStore(MAX_RECORDS)
+    return _timing_store
@@ -1,131 +1,184 @@
 
 import json
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from app.core.config import settings
-from app.core.auth import get_supabase_client
-import openai
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from app.core.openai_client import get_openai_client
+from app.repositories.loader import RequestLoaders
+from app.core.pagination import PageParams
+from app.repositories.study_plans import StudyPlanRepository
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_message_tokens
+from app.services.single_flight import get_single_flight, make_key
+from app.services.llm_cache import cached_completion
+from app.services.study_scheduler import build_plan, normalize_topics, replan
 
 class PlannerService:
     def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.supabase = get_supabase_client()
+        self.client = get_openai_client()
+        self.plans = StudyPlanRepository()
+        self.scheduler = get_llm_scheduler("gpt-4o")
+        self.single_flight = get_single_flight("planner")
 
-    async def generate_study_plan(self, user_id: str, document_ids: List[str], exam_date: str, hours_per_day: int) -> Dict[str, Any]:
+    async def generate_study_plan(
+        self,
+        user_id: str,
+        document_ids: List[str],
+        exam_date: str,
+        hours_per_day: int,
+        loaders: Optional[RequestLoaders] = None
+    ) -> Dict[str, Any]:
         
-        # 1. Fetch document text
-        documents_text = ""
-        for doc_id in document_ids:
-            try:
-                # Get document chunks or summary to save context window
-                # For now using summary if available, else first few chunks
-                doc = self.supabase.table("documents").select("title, summary").eq("id", doc_id).single().execute()
-                if doc.data:
-                    title = doc.data.get('title', 'Untitled')
-                    summary = doc.data.get('summary', '')
-                    documents_text += f"-- Document: {title} --\nSummary: {summary}\n\n"
-                    
-                    # If summary is missing/short, maybe get some chunks (optional optimization)
-            except Exception as e:
-                print(f"Error fetching document {doc_id}: {e}")
-
-        # 2. Calculate duration
-        start = datetime.now()
-        end = datetime.strptime(exam_date, "%Y-%m-%d")
+        # 1. Calculate duration
+        start = datetime.now().date()
+        end = datetime.strptime(exam_date, "%Y-%m-%d").date()
         days_available = (end - start).days
         
         if days_available <= 0:
             raise Exception("Exam date must be in the future")
 
-        # 3. Prompt LLM
-        prompt = f"""
-        You are an expert personalized study planner. Create a detailed {days_available}-day study plan for a student preparing for an exam on {exam_date}.
-        They have {hours_per_day} hours available per day.
-        
-        Here is the context of the study material:
-        {documents_text}
-        
-        Rules:
-        1. Break down the material into logical topics.
-        2. Distribute topics across the {days_available} days.
-        3. Include specific "Review" or "Buffer" days.
-        4. Include a daily "Mock Test" or "Practice" session in the final days.
-        5. Output strictly valid JSON with this structure:
-        {{
-            "title": "Study Plan for [Subject]",
-            "days": [
-                {{
-                    "day_number": 1,
-                    "date": "YYYY-MM-DD",
-                    "topics": ["Topic 1", "Topic 2"],
-                    "tasks": [
-                        {{ "id": "t1", "description": "Read Chapter 1", "duration_minutes": 60, "type": "reading" }},
-                        {{ "id": "t2", "description": "Practice Quiz 1", "duration_minutes": 30, "type": "practice" }}
-                    ]
-                }}
-            ]
-        }}
-        """
-
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a helpful study planning assistant that outputs strict JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={ "type": "json_object" }
+            # 2. Extract topics with the LLM (identical concurrent requests share one call)
+            source_ids = sorted(set(document_ids))
+            key = make_key("gpt-4o", source_ids)
+            loaders = loaders or RequestLoaders()
+            extracted = await self.single_flight.do(
+                key,
+                lambda: self._extract_topics(source_ids, user_id, loaders)
             )
             
-            plan_json = json.loads(response.choices[0].message.content)
+            # 3. Lay topics out over the days locally
+            plan_json = build_plan(
+                extracted["title"],
+                extracted["topics"],
+                start,
+                end,
+                hours_per_day
+            )
             
-            # Save to DB
+            # 4. Save to DB (per user)
             data = {
                 "user_id": user_id,
                 "document_ids": document_ids,
-                "title": plan_json.get("title", "Generated Study Plan"),
+                "title": plan_json["title"],
                 "plan": plan_json,
                 "duration_days": days_available,
                 "hours_per_day": hours_per_day,
-                "start_date": start.strftime("%Y-%m-%d"),
+                "start_date": start.isoformat(),
                 "exam_date": exam_date,
                 "status": "active"
             }
             
-            result = self.supabase.table("study_plans").insert(data).execute()
-            if not result.data:
+            plan = await self.plans.insert(data)
+            if not plan:
                 raise Exception("Failed to save plan to database")
                 
-            return result.data[0]
+            return plan
 
         except Exception as e:
             print(f"Plan generation failed: {e}")
             raise Exception(f"Failed to generate plan: {e}")
 
-    async def get_user_plans(self, user_id: str):
-        result = self.supabase.table("study_plans").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return result.data
+    async def _extract_topics(self, document_ids: List[str], user_id: str, loaders: RequestLoaders) -> Dict[str, Any]:
+        """Ask the LLM only for the topic list and effort estimates"""
+        # 1. Fetch document summaries (one batched query for all documents)
+        documents_text = ""
+        try:
+            docs = await loaders.documents.load_many(document_ids)
+        except Exception as e:
+            print(f"Error fetching documents {document_ids}: {e}")
+            docs = []
+        
+        for doc in docs:
+            if doc:
+                # Using summary to save context window
+                title = doc.get('title') or 'Untitled'
+                summary = doc.get('summary') or ''
+                documents_text += f"-- Document: {title} --\nSummary: {summary}\n\n"
+
+        # 2. Prompt LLM (no dates in the prompt, so the result is reusable across days)
+        prompt = f"""
+        You are an expert study planner. Break the following study material into the logical topics
+        a student must learn for the exam, in a sensible learning order.
+        
+        Here is the context of the study material:
+        {documents_text}
+        
+        For each topic estimate the focused study hours an average student needs (including practice).
+        Output strictly valid JSON with this structure:
+        {{
+            "title": "Study Plan for [Subject]",
+            "topics": [
+                {{ "name": "Topic 1", "effort_hours": 2.5 }},
+                {{ "name": "Topic 2", "effort_hours": 1 }}
+            ]
+        }}
+        """
+
+        messages = [
+            {"role": "system", "content": "You are a helpful study planning assistant that outputs strict JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        params = {"response_format": { "type": "json_object" }}
+        
+        async def call() -> str:
+            async with self.scheduler.reserve(Priority.GENERATION, user_id, tokens=estimate_message_tokens(messages, 1000)) as slot:
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=messages,
+                    **params
+                )
+                slot.settle(response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
+        
+        content = await cached_completion("planner", "gpt-4o", messages, params, call)
+        data = json.loads(content)
+        
+        topics = normalize_topics(data.get("topics", []))
+        if not topics:
+            raise Exception("No topics could be extracted from the documents")
+        
+        return {
+            "title": data.get("title") or "Generated Study Plan",
+            "topics": topics
+        }
+
+    async def get_user_plans(self, user_id: str, page: PageParams) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of plan summaries (no plan JSON) and the next cursor"""
+        return await self.plans.list_page(user_id, page)
+
+    async def get_plan(self, plan_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Full plan including its JSON"""
+        return await self.plans.get_for_user(plan_id, user_id)
 
     async def update_task_status(self, plan_id: str, day_number: int, task_id: str, is_completed: bool, user_id: str):
-        # 1. Fetch current plan
-        result = self.supabase.table("study_plans").select("plan").eq("id", plan_id).eq("user_id", user_id).single().execute()
-        if not result.data:
+        # Single-statement jsonb_set on the task's path, located via plan.task_index.
+        # day_number only disambiguates legacy plans (no index, per-day task ids); <= 0 means unknown.
+        return await self.plans.set_task_completed(
+            plan_id,
+            user_id,
+            task_id,
+            is_completed,
+            day_number if day_number and day_number > 0 else None
+        )
+
+    async def replan(self, plan_id: str, user_id: str) -> Dict[str, Any]:
+        """Re-spread unfinished work from today until the exam (no LLM call)"""
+        current = await self.plans.get_for_user(plan_id, user_id, "plan, exam_date, hours_per_day")
+        if not current:
             raise Exception("Plan not found")
-            
-        plan_data = result.data['plan']
-        
-        # 2. Update local JSON state
-        updated = False
-        for day in plan_data.get('days', []):
-            if day.get('day_number') == day_number:
-                for task in day.get('tasks', []):
-                    if task.get('id') == task_id:
-                        task['completed'] = is_completed
-                        updated = True
-                        break
-            if updated: break
-            
-        if updated:
-            self.supabase.table("study_plans").update({"plan": plan_data}).eq("id", plan_id).execute()
-            return True
-        return False
+
+        plan_data = current["plan"]
+        if not plan_data.get("topics"):
+            raise Exception("Plan was generated before topic extraction and cannot be re-planned")
+
+        today = datetime.now().date()
+        exam_date = datetime.strptime(current["exam_date"], "%Y-%m-%d").date()
+        if exam_date <= today:
+            raise Exception("Exam date must be in the future")
+
+        updated_plan = replan(plan_data, today, exam_date, current["hours_per_day"])
+
+        updated = await self.plans.update_for_user(plan_id, user_id, {"plan": updated_plan})
+        if not updated:
+            raise Exception("Failed to save plan to database")
+        return updated
@@ -0,0 +1,158 @@
+"""
+Document processing progress events
+
+The ingestion pipeline publishes stage/progress updates for each document on
+an in-process bus; the SSE endpoint streams them to subscribers instead of
+clients polling the status route. The bus keeps the latest state per document
+so late subscribers start from a snapshot. Events are per worker: a
+subscriber connected to a different worker than the one processing the
+document falls back to an occasional status read (see routes/documents.py).
+
+The same updates are persisted to counter columns on the documents row
+(stage changes immediately, counters at most every PROGRESS_PERSIST_SECONDS),
+so the status route is a single primary-key read.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+from app.core.config import settings
+from app.repositories.documents import DocumentRepository
+
+TERMINAL_STAGES = {"ready", "failed"}
+SUBSCRIBER_QUEUE_SIZE = 32
+STATE_TTL_SECONDS = 300  # Keep finished documents' final state for late subscribers
+
+
+class ProgressBus:
+    def __init__(self):
+        self._state: Dict[str, dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def publish(self, document_id: str, **fields):
+        """Merge fields into the document's state and push the snapshot to subscribers"""
+        state = self._state.setdefault(document_id, {"document_id": document_id})
+        state.update(fields)
+        snapshot = dict(state)
+
+        for queue in self._subscribers.get(document_id, ()):
+            if queue.full():
+                # Slow consumer: drop the oldest snapshot, the newest supersedes it
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+        if snapshot.get("stage") in TERMINAL_STAGES:
+            self._finished_at[document_id] = time.monotonic()
+            self._expire()
+
+    def state(self, document_id: str) -> Optional[dict]:
+        state = self._state.get(document_id)
+        return dict(state) if state else None
+
+    async def subscribe(
+        self,
+        document_id: str,
+        timeout: float,
+        initial: Optional[dict] = None
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield the current state (or `initial` if the bus has none), then every
+        update until the document reaches a terminal stage. Yields None when
+        nothing arrived within `timeout` (heartbeat/fallback point).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Register before taking the snapshot so no update falls in between
+        self._subscribers.setdefault(document_id, set()).add(queue)
+        try:
+            snapshot = self.state(document_id) or initial
+            if snapshot is not None:
+                yield snapshot
+                if snapshot.get("stage") in TERMINAL_STAGES:
+                    return
+
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield snapshot
+                if snapshot.get("stage") in TERMINAL_STAGES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(document_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[document_id]
+
+    def _expire(self):
+        cutoff = time.monotonic() - STATE_TTL_SECONDS
+        for document_id, finished_at in list(self._finished_at.items()):
+            if finished_at < cutoff:
+                self._state.pop(document_id, None)
+                del self._finished_at[document_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": len(self._state),
+            "subscribers": sum(len(s) for s in self._subscribers.values())
+        }
+
+
+_progress_bus: Optional[ProgressBus] = None
+
+def get_progress_bus() -> ProgressBus:
+    """Get progress bus instance (Singleton per worker)"""
+    global _progress_bus
+    if _progress_bus is None:
+        _progress_bus = ProgressBus()
+    return _progress_bus
+
+
+# Columns on documents that mirror the progress state
+PROGRESS_COLUMNS = "stage, pages_extracted, chunks_total, chunks_embedded, chunks_stored, error_message"
+
+
+class DocumentProgress:
+    """Progress of one document through the ingestion pipeline"""
+
+    def __init__(self, document_id: str):
+        self.document_id = document_id
+        self.bus = get_progress_bus()
+        self.documents = DocumentRepository()
+        self._unsaved: dict = {}
+        self._saved_at = 0.0
+
+    async def stage(self, stage: str, extra: Optional[dict] = None, **counters):
+        """
+        Enter a stage; written to the row right away. `extra` holds other
+        document columns to write in the same update (e.g. status, page_count).
+        """
+        self.bus.publish(self.document_id, stage=stage, **counters)
+        self._unsaved.update(counters, stage=stage)
+        await self._save(extra)
+
+    async def update(self, **counters):
+        """Counter change; pushed to subscribers now, written to the row in batches"""
+        self.bus.publish(self.document_id, **counters)
+        self._unsaved.update(counters)
+        if time.monotonic() - self._saved_at >= settings.PROGRESS_PERSIST_SECONDS:
+            await self._save()
+
+    async def _save(self, extra: Optional[dict] = None):
+        data = {**self._unsaved, **(extra or {})}
+        if "error" in data:
+            data["error_message"] = data.pop("error")
+        if not data:
+            return
+        try:
+            await self.documents.update(self.document_id, data)
+            self._unsaved = {}
+            self._saved_at = time.monotonic()
+        except Exception as e:
+            # Progress is advisory; keep the counters for the next write, but
+            # make sure the columns the caller needs (e.g. status) still land
+            print(f"⚠️ [Progress] Could not save progress for {self.document_id}: {e}")
+            if extra:
+                await self.documents.update(self.document_id, extra)
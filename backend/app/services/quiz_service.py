@@ -1,31 +1,44 @@
 """
 Quiz Generation Service
 """
-from openai import AsyncOpenAI
 from app.core.config import settings
-from app.core.auth import get_supabase_client
+from app.core.openai_client import get_openai_client
+from app.repositories.chunks import ChunkRepository
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_message_tokens
+from app.services.single_flight import get_single_flight, make_key
+from app.services.llm_cache import cached_completion
+from typing import Optional
 import json
 import datetime
 import uuid
 
 class QuizService:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.model = settings.OPENAI_MODEL
-        self.supabase = get_supabase_client()
+        self.chunks = ChunkRepository()
+        self.scheduler = get_llm_scheduler(self.model)
+        self.single_flight = get_single_flight("quiz")
 
-    async def generate_quiz(self, document_id: str, num_questions: int = 5, difficulty: str = "medium") -> dict:
+    async def generate_quiz(self, document_id: str, num_questions: int = 5, difficulty: str = "medium", user_id: Optional[str] = None) -> dict:
         """Generate quiz from document"""
+        difficulty = (difficulty or "medium").strip().lower()
+        key = make_key(self.model, document_id, num_questions, difficulty)
+        questions = await self.single_flight.do(
+            key, lambda: self._generate_questions(document_id, num_questions, difficulty, user_id)
+        )
         
+        return {
+            "id": str(uuid.uuid4()),
+            "questions": questions,
+            "created_at": datetime.datetime.now().isoformat()
+        }
+
+    async def _generate_questions(self, document_id: str, num_questions: int, difficulty: str, user_id: Optional[str]) -> list:
         # Get chunks (context)
-        chunks = self.supabase.table("document_chunks")\
-            .select("content")\
-            .eq("document_id", document_id)\
-            .order("chunk_index")\
-            .limit(8)\
-            .execute()
+        chunks = await self.chunks.first_chunks(document_id, limit=8)
             
-        context = "\n".join([c['content'] for c in chunks.data])
+        context = "\n".join([c['content'] for c in chunks])
         
         prompt = f"""Generate a quiz with {num_questions} multiple choice questions.
         Difficulty: {difficulty}
@@ -46,21 +59,24 @@ class QuizService:
         {context[:15000]}
         """
         
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a quiz generator. Output valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            response_format={"type": "json_object"}
-        )
+        messages = [
+            {"role": "system", "content": "You are a quiz generator. Output valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
         
-        content = response.choices[0].message.content
+        params = {"temperature": 0.5, "response_format": {"type": "json_object"}}
+        
+        async def call() -> str:
+            async with self.scheduler.reserve(Priority.GENERATION, user_id, tokens=estimate_message_tokens(messages, 1500)) as slot:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **params
+                )
+                slot.settle(response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
+        
+        content = await cached_completion("quiz", self.model, messages, params, call)
         data = json.loads(content)
         
-        return {
-            "id": str(uuid.uuid4()),
-            "questions": data.get("questions", []),
-            "created_at": datetime.datetime.now().isoformat()
-        }
+        return data.get("questions", [])
@@ -0,0 +1,73 @@
+"""
+Single-flight coalescing of identical concurrent calls
+
+When several requests ask for the same generation at the same time (e.g. a
+class opening a shared notebook), only the first one calls the LLM. The rest
+await the same in-flight task and receive their own copy of its result.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def make_key(*parts: Any) -> str:
+    """Stable hash of already-normalized request parameters"""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key among concurrent callers and share its result"""
+        self.calls += 1
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.executed += 1
+            # Run detached so a disconnecting first caller does not cancel the others
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        else:
+            self.coalesced += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; callers re-raise it themselves
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get the single-flight group for a service (Singleton per name)"""
+    group = _groups.get(name)
+    if group is None:
+        group = SingleFlight(name)
+        _groups[name] = group
+    return group
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Coalescing metrics for every group"""
+    return {name: group.stats() for name, group in _groups.items()}
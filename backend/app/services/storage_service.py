@@ -0,0 +1,92 @@
+"""
+Streaming access to Supabase Storage
+
+The storage client's upload/download hold the whole object in memory. These
+helpers stream through the pooled HTTP client instead: uploads are sent in
+chunks from the request's spooled file, downloads are written to a
+SpooledTemporaryFile that spills to disk past STORAGE_SPOOL_MAX_MEMORY, and
+the parser reads large files through mmap, so the PDF's bytes are never held
+in memory whole.
+"""
+import mmap
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Iterator, Tuple
+from urllib.parse import quote
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.auth import get_async_http_client
+
+
+class StorageService:
+    def __init__(self, bucket: str = "documents"):
+        self.bucket = bucket
+
+    def _url(self, path: str) -> str:
+        return f"{settings.SUPABASE_URL}/storage/v1/object/{self.bucket}/{quote(path)}"
+
+    def _headers(self) -> dict:
+        return {
+            "apikey": settings.SUPABASE_SERVICE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}"
+        }
+
+    async def upload_stream(self, path: str, file: UploadFile, size: int, content_type: str):
+        """Upload an UploadFile in chunks without reading it into memory"""
+        async def body() -> AsyncIterator[bytes]:
+            await file.seek(0)
+            while True:
+                chunk = await file.read(settings.STORAGE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+        client = await get_async_http_client()
+        response = await client.post(
+            self._url(path),
+            content=body(),
+            headers={
+                **self._headers(),
+                "Content-Type": content_type,
+                "Content-Length": str(size),
+                "x-upsert": "false"
+            }
+        )
+        if response.status_code >= 400:
+            raise Exception(f"Storage upload failed ({response.status_code}): {response.text}")
+
+    async def download_to_spool(self, path: str, max_bytes: int) -> Tuple[SpooledTemporaryFile, int]:
+        """Stream an object into a spooled temp file; returns (file, size). Caller closes the file."""
+        spool = SpooledTemporaryFile(max_size=settings.STORAGE_SPOOL_MAX_MEMORY)
+        size = 0
+        try:
+            client = await get_async_http_client()
+            async with client.stream("GET", self._url(path), headers=self._headers()) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise Exception(f"Storage download failed ({response.status_code}): {response.text}")
+                async for chunk in response.aiter_bytes(settings.STORAGE_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise Exception(f"Object larger than {max_bytes} bytes")
+                    spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+
+        spool.seek(0)
+        return spool, size
+
+
+@contextmanager
+def mapped(spool: SpooledTemporaryFile, size: int) -> Iterator[BinaryIO]:
+    """
+    Readable view of a downloaded file: an mmap once it has spilled to disk
+    (pages are loaded lazily by the OS), the in-memory buffer otherwise.
+    """
+    if size > settings.STORAGE_SPOOL_MAX_MEMORY and size > 0:
+        with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+    else:
+        spool.seek(0)
+        yield spool
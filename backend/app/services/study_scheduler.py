@@ -0,0 +1,286 @@
+"""
+Deterministic study-plan scheduler
+
+Lays a list of topics (with effort estimates from the LLM) out over the days
+before an exam: study and practice sessions filled into each day's budget,
+periodic buffer/review days and mock tests in the final days. Runs locally in
+milliseconds, so re-planning after missed days needs no LLM call.
+
+Study time is handed out in MIN_SESSION_MINUTES slots, so sessions split
+across days without slivers and no day goes over its budget. When the topics
+don't fit before the exam, each topic is shortened (down to one slot), then
+several topics share a slot; topics that still don't fit are returned as
+unscheduled rather than dropped.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+BUFFER_EVERY_DAYS = 7       # Every 7th day is a review/catch-up day
+PRACTICE_SHARE = 0.25       # Share of each topic's effort spent on practice
+MIN_SESSION_MINUTES = 15    # Scheduling granularity; no session is shorter
+MAX_TOPICS_PER_SESSION = 3  # When short of time, up to 3 topics share one session
+MOCK_TEST_MINUTES = 120
+
+
+def _mock_day_count(total_days: int) -> int:
+    if total_days < 3:
+        return 0
+    return min(3, max(1, total_days // 14))
+
+
+def _day_kinds(total_days: int) -> List[str]:
+    """Kind of each day: 'study', 'buffer' or 'mock'"""
+    mock_days = _mock_day_count(total_days)
+    kinds = []
+    for day_number in range(1, total_days + 1):
+        if day_number > total_days - mock_days:
+            kinds.append("mock")
+        elif total_days >= BUFFER_EVERY_DAYS and day_number % BUFFER_EVERY_DAYS == 0:
+            kinds.append("buffer")
+        else:
+            kinds.append("study")
+    return kinds
+
+
+def _allocate_slots(topics: List[Dict[str, Any]], capacity_slots: int) -> Tuple[List[Tuple[List[str], int]], List[str]]:
+    """
+    Study slots per topic group within `capacity_slots`: the estimates if they
+    fit, else one slot each plus the rest shared in proportion to the
+    estimates, else topics merged into shared one-slot sessions.
+    Returns ([(topic names, slots)], unscheduled topic names).
+    """
+    names = [t["name"] for t in topics]
+    wanted = [max(1, round(t["effort_hours"] * 60 / MIN_SESSION_MINUTES)) for t in topics]
+    if sum(wanted) <= capacity_slots:
+        return [([name], slots) for name, slots in zip(names, wanted)], []
+
+    if len(topics) <= capacity_slots:
+        # Largest-remainder split of the slots left after everyone's first
+        spare = capacity_slots - len(topics)
+        excess = [w - 1 for w in wanted]
+        shares = [spare * e / sum(excess) for e in excess]
+        extra = [int(share) for share in shares]
+        by_remainder = sorted(range(len(topics)), key=lambda i: shares[i] - extra[i], reverse=True)
+        for i in by_remainder[:spare - sum(extra)]:
+            extra[i] += 1
+        return [([name], 1 + e) for name, e in zip(names, extra)], []
+
+    fitted = names[:capacity_slots * MAX_TOPICS_PER_SESSION]
+    groups, start = [], 0
+    for g in range(capacity_slots):
+        size = len(fitted) // capacity_slots + (1 if g < len(fitted) % capacity_slots else 0)
+        groups.append((fitted[start:start + size], 1))
+        start += size
+    return groups, names[len(fitted):]
+
+
+def _topic_sessions(groups: List[Tuple[List[str], int]]) -> List[Dict[str, Any]]:
+    """Expand topic groups into ordered reading + practice work items (minutes)"""
+    sessions = []
+    for topics, slots in groups:
+        label = ", ".join(topics)
+        practice = int(slots * PRACTICE_SHARE + 0.5) if slots >= 2 else 0
+        sessions.append({"topics": topics, "type": "reading",
+                         "minutes": (slots - practice) * MIN_SESSION_MINUTES,
+                         "description": f"Study: {label}"})
+        if practice:
+            sessions.append({"topics": topics, "type": "practice",
+                             "minutes": practice * MIN_SESSION_MINUTES,
+                             "description": f"Practice problems: {label}"})
+    return sessions
+
+
+def normalize_topics(raw_topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Clean the LLM's topic list into [{name, effort_hours}]"""
+    topics = []
+    for raw in raw_topics or []:
+        name = str(raw.get("name") or raw.get("topic") or "").strip()
+        if not name:
+            continue
+        try:
+            effort = float(raw.get("effort_hours", 1))
+        except (TypeError, ValueError):
+            effort = 1.0
+        topics.append({"name": name, "effort_hours": max(0.25, effort)})
+    return topics
+
+
+def build_schedule(
+    topics: List[Dict[str, Any]],
+    start_date: date,
+    total_days: int,
+    hours_per_day: int,
+    first_day_number: int = 1
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Spread topics over `total_days` days starting at `start_date`.
+    Returns plan days in the same shape the frontend renders, and the names
+    of topics that could not be fitted before the exam.
+    """
+    if total_days <= 0:
+        return [], [t["name"] for t in topics]
+
+    # Whole slots, so each day splits evenly into sessions
+    daily_minutes = max(MIN_SESSION_MINUTES, hours_per_day * 60 // MIN_SESSION_MINUTES * MIN_SESSION_MINUTES)
+    kinds = _day_kinds(total_days)
+    capacity_slots = kinds.count("study") * (daily_minutes // MIN_SESSION_MINUTES)
+
+    groups, unscheduled = _allocate_slots(topics, capacity_slots)
+    queue = _topic_sessions(groups)
+    days = []
+    studied_since_buffer: List[str] = []
+    all_topics = [t["name"] for t in topics]
+
+    for offset, kind in enumerate(kinds):
+        day_number = first_day_number + offset
+        day = {
+            "day_number": day_number,
+            "date": (start_date + timedelta(days=offset)).isoformat(),
+            "kind": kind,
+            "topics": [],
+            "tasks": []
+        }
+
+        def add_task(description: str, minutes: int, task_type: str, topics: Optional[List[str]] = None):
+            task = {
+                "id": f"d{day_number}-t{len(day['tasks']) + 1}",
+                "description": description,
+                "duration_minutes": int(minutes),
+                "type": task_type
+            }
+            if topics:
+                # One topic keeps the original "topic" key; a shared session lists them all
+                if len(topics) == 1:
+                    task["topic"] = topics[0]
+                else:
+                    task["topics"] = list(topics)
+                for topic in topics:
+                    if topic not in day["topics"]:
+                        day["topics"].append(topic)
+            day["tasks"].append(task)
+
+        if kind == "mock":
+            mock = min(MOCK_TEST_MINUTES, daily_minutes)
+            add_task("Full mock test under exam conditions", mock, "mock_test")
+            if daily_minutes - mock >= MIN_SESSION_MINUTES:
+                add_task("Review mock test mistakes", daily_minutes - mock, "review")
+            day["topics"] = ["Mock Test"]
+
+        elif kind == "buffer":
+            review_topics = studied_since_buffer or all_topics
+            review = max(MIN_SESSION_MINUTES, round(daily_minutes * 0.6))
+            add_task(f"Review: {', '.join(review_topics[:5])}", review, "review")
+            if daily_minutes - review >= MIN_SESSION_MINUTES:
+                add_task("Catch up on unfinished tasks", daily_minutes - review, "buffer")
+            day["topics"] = ["Review"]
+            studied_since_buffer = []
+
+        else:
+            remaining = daily_minutes
+            while queue and remaining >= MIN_SESSION_MINUTES:
+                session = queue[0]
+                # Both are whole slots, so neither part of a split is a sliver
+                take = min(session["minutes"], remaining)
+                add_task(session["description"], take, session["type"], session["topics"])
+                for topic in session["topics"]:
+                    if topic not in studied_since_buffer:
+                        studied_since_buffer.append(topic)
+                session["minutes"] -= take
+                remaining -= take
+                if session["minutes"] <= 0:
+                    queue.pop(0)
+                elif not session["description"].endswith("(continued)"):
+                    session["description"] += " (continued)"
+
+            if not queue and remaining >= MIN_SESSION_MINUTES and all_topics:
+                # Material covered early: spend spare time on spaced review
+                add_task("Spaced review of covered topics", remaining, "review")
+
+        days.append(day)
+
+    # Sessions fill the study slots exactly, so this only guards against miscounting
+    for session in queue:
+        unscheduled.extend(t for t in session["topics"] if t not in unscheduled)
+    return days, unscheduled
+
+
+def index_tasks(days: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """task_id -> [day position, task position]; lets the DB patch one task by path"""
+    index = {}
+    for day_pos, day in enumerate(days):
+        for task_pos, task in enumerate(day.get("tasks", [])):
+            index[task["id"]] = [day_pos, task_pos]
+    return index
+
+
+def build_plan(
+    title: str,
+    topics: List[Dict[str, Any]],
+    start_date: date,
+    exam_date: date,
+    hours_per_day: int
+) -> Dict[str, Any]:
+    """Full plan JSON from extracted topics"""
+    total_days = (exam_date - start_date).days
+    days, unscheduled = build_schedule(topics, start_date, total_days, hours_per_day)
+    if unscheduled:
+        print(f"⚠️ [Planner] {len(unscheduled)} of {len(topics)} topics don't fit before the exam")
+    return {
+        "title": title,
+        "topics": topics,
+        "days": days,
+        "task_index": index_tasks(days),
+        "unscheduled_topics": unscheduled
+    }
+
+
+def _completed_minutes_by_topic(days: List[Dict[str, Any]]) -> Dict[str, int]:
+    done: Dict[str, int] = {}
+    for day in days:
+        for task in day.get("tasks", []):
+            topics = task.get("topics") or ([task["topic"]] if task.get("topic") else [])
+            if task.get("completed") and topics:
+                # A shared session counts evenly towards each of its topics
+                for topic in topics:
+                    done[topic] = done.get(topic, 0) + int(task.get("duration_minutes", 0)) / len(topics)
+    return done
+
+
+def replan(
+    plan: Dict[str, Any],
+    today: date,
+    exam_date: date,
+    hours_per_day: int
+) -> Dict[str, Any]:
+    """
+    Rebuild the schedule from `today` after missed days.
+    Past days are kept as history; remaining effort per topic (estimate minus
+    completed study/practice minutes) is spread over the days left.
+    """
+    topics = plan.get("topics") or []
+    days = plan.get("days", [])
+
+    past_days = [d for d in days if d.get("date") and date.fromisoformat(d["date"]) < today]
+    done = _completed_minutes_by_topic(days)
+
+    remaining_topics = []
+    for topic in topics:
+        left = topic["effort_hours"] * 60 - done.get(topic["name"], 0)
+        if left >= MIN_SESSION_MINUTES:
+            remaining_topics.append({"name": topic["name"], "effort_hours": left / 60})
+
+    next_day_number = max([d["day_number"] for d in past_days], default=0) + 1
+    future_days, unscheduled = build_schedule(
+        remaining_topics,
+        today,
+        (exam_date - today).days,
+        hours_per_day,
+        first_day_number=next_day_number
+    )
+
+    updated = dict(plan)
+    updated["days"] = past_days + future_days
+    updated["task_index"] = index_tasks(updated["days"])
+    updated["unscheduled_topics"] = unscheduled
+    updated["replanned_at"] = today.isoformat()
+    return updated
@@ -1,21 +1,38 @@
 """
 OpenAI summary service
 """
-from openai import AsyncOpenAI
+from typing import Optional
 from app.core.config import settings
+from app.core.openai_client import get_openai_client
+from app.services.llm_scheduler import Priority, get_llm_scheduler, estimate_message_tokens
+from app.services.single_flight import get_single_flight, make_key
+from app.services.llm_cache import cached_completion
+
+# Only the start of a document is summarized (~4 chars per token)
+SUMMARY_INPUT_CHARS = 15000
 
 class SummaryService:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.model = settings.OPENAI_MODEL
+        self.scheduler = get_llm_scheduler(self.model)
+        self.single_flight = get_single_flight("summary")
     
-    async def generate_summary(self, text: str) -> str:
-        """Generate summary for text"""
-        
+    async def generate_summary(
+        self,
+        text: str,
+        priority: Priority = Priority.INGESTION,
+        user_id: Optional[str] = None
+    ) -> str:
+        """Generate summary for text (identical concurrent requests share one call)"""
+        key = make_key(self.model, text[:SUMMARY_INPUT_CHARS])
+        return await self.single_flight.do(
+            key, lambda: self._generate_summary(text, priority, user_id)
+        )
+    
+    async def _generate_summary(self, text: str, priority: Priority, user_id: Optional[str]) -> str:
         # Truncate text if too long (simple limit to avoid token limits)
-        # Assuming ~4 chars per token, 4000 tokens ~ 16000 chars.
-        # Safe limit 10000 chars for context
-        safe_text = text[:15000]
+        safe_text = text[:SUMMARY_INPUT_CHARS]
         
         prompt = f"""Please provide a comprehensive summary of the following document. 
         Focus on the main concepts, key arguments, and important details.
@@ -24,13 +41,21 @@ class SummaryService:
         {safe_text}
         """
         
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful study assistant that creates concise and accurate summaries."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5
-        )
+        messages = [
+            {"role": "system", "content": "You are a helpful study assistant that creates concise and accurate summaries."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        params = {"temperature": 0.5}
+        
+        async def call() -> str:
+            async with self.scheduler.reserve(priority, user_id, tokens=estimate_message_tokens(messages, 1000)) as slot:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **params
+                )
+                slot.settle(response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
         
-        return response.choices[0].message.content
+        return await cached_completion("summary", self.model, messages, params, call)
@@ -0,0 +1,4 @@
+"""
+Benchmarks package initialization
+Run modules from the backend directory, e.g. `python -m benchmarks.db_throughput`
+"""
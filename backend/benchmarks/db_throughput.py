@@ -0,0 +1,114 @@
+"""
+Requests/sec per worker: blocking supabase-py calls vs the async repository layer
+
+Mounts two endpoints that do the same work as a typical list call
+(one documents page + one chat_sessions page, one after the other) and drives
+each with the same number of concurrent clients inside one event loop, like
+one uvicorn worker:
+
+  /sync   - sync client `.execute()` inside `async def` (the old pattern)
+  /async  - DocumentRepository / ChatRepository on the pooled async client
+
+Both send identical queries (same projection, filters, keyset order and
+limit), so the difference is blocking vs non-blocking I/O only.
+
+Usage (needs a reachable Supabase, e.g. the local stand-in):
+  python -m benchmarks.db_throughput --user-id <uuid> --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import FastAPI
+from app.core.auth import get_supabase_client, close_async_supabase_client
+from app.core.pagination import PageParams, apply_keyset, split_page
+from app.repositories.documents import DocumentRepository
+from app.repositories.chat import ChatRepository
+
+PAGE = PageParams(limit=1000, after=None)
+DOCUMENT_COLUMNS = "id, title, updated_at"
+SESSION_COLUMNS = "id, updated_at"
+
+
+def build_app(user_id: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_endpoint():
+        # Same queries as DocumentRepository.list_page / ChatRepository.list_sessions
+        supabase = get_supabase_client()
+        docs_query = supabase.table("documents")\
+            .select(DOCUMENT_COLUMNS)\
+            .eq("user_id", user_id)\
+            .is_("deleted_at", "null")
+        docs, _ = split_page(apply_keyset(docs_query, PAGE).execute().data, PAGE)
+        sessions_query = supabase.table("chat_sessions")\
+            .select(SESSION_COLUMNS)\
+            .eq("user_id", user_id)
+        sessions, _ = split_page(apply_keyset(sessions_query, PAGE).execute().data, PAGE)
+        return {"documents": len(docs), "sessions": len(sessions)}
+
+    @app.get("/async")
+    async def async_endpoint():
+        docs, _ = await DocumentRepository().list_page(user_id, PAGE, DOCUMENT_COLUMNS)
+        sessions, _ = await ChatRepository().list_sessions(user_id, PAGE, SESSION_COLUMNS)
+        return {"documents": len(docs), "sessions": len(sessions)}
+
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = build_app(args.user_id)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Warm up both paths (client creation, TLS, connection pool)
+        await client.get("/sync")
+        await client.get("/async")
+
+        print(f"{'path':<8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for path in ("/sync", "/async"):
+            r = await drive(client, path, args.concurrency, args.duration)
+            print(f"{path:<8} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['errors']:>7}")
+
+    await close_async_supabase_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
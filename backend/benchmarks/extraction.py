@@ -0,0 +1,235 @@
+"""
+PDF extraction and chunking micro-benchmark
+
+Runs PDFExtractor.extract_text and chunk_text over a generated corpus
+(benchmarks/pdf_corpus.py: text, table, long-line, unicode and many-page PDFs
+from 1 to 2000 pages) and reports, per file:
+
+  extract/<extractor>      pages/s, MB/s, peak traced memory
+  chunk/<size>-<overlap>   chunks/s, chunk count and length statistics
+
+Timings are the best of --repeats runs; peak memory comes from a separate
+tracemalloc run so tracing doesn't skew the timings. Results are compared
+with a stored baseline (benchmarks/baselines/extraction.json): throughput
+lower or memory higher than baseline by more than --tolerance is reported as
+a regression, a different chunk count as a behaviour change. Timings are
+machine-specific, so refresh the baseline on the machine you compare on.
+
+Usage:
+  python -m benchmarks.extraction                  # full corpus, compare to baseline
+  python -m benchmarks.extraction --quick --check  # small corpus, exit 1 on regression
+  python -m benchmarks.extraction --save-baseline
+"""
+import argparse
+import importlib.util
+import json
+import mmap
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.config import Settings
+from app.services.pdf_extractor import PDFExtractor
+from benchmarks import pdf_corpus
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "extraction.json")
+
+
+def _extract_bytes(path: str) -> List[str]:
+    with open(path, "rb") as f:
+        return PDFExtractor.extract_text(f.read())["pages"]
+
+
+def _extract_mmap(path: str) -> List[str]:
+    # How the ingestion pipeline reads spooled downloads larger than memory
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return PDFExtractor.extract_text(mapped)["pages"]
+
+
+def _extract_pypdf(path: str) -> List[str]:
+    import pypdf
+    return [page.extract_text() for page in pypdf.PdfReader(path).pages]
+
+
+EXTRACTORS: Dict[str, Callable[[str], List[str]]] = {
+    "pypdf2": _extract_bytes,
+    "pypdf2_mmap": _extract_mmap,
+}
+if importlib.util.find_spec("pypdf") is not None:
+    EXTRACTORS["pypdf"] = _extract_pypdf  # Candidate replacement, only when installed
+
+# (chunk_size, overlap); the first is the app's default. Read from the field
+# defaults, not settings, so this offline benchmark needs no credentials.
+CHUNKERS: List[Tuple[int, int]] = [
+    (Settings.model_fields["CHUNK_SIZE"].default, Settings.model_fields["CHUNK_OVERLAP"].default),
+    (400, 50),
+    (1000, 200),
+    (2000, 200),
+]
+
+# Metric -> +1 if higher is better, -1 if lower is better
+COMPARED_METRICS = {"pages_per_sec": 1, "chunks_per_sec": 1, "peak_mb": -1}
+
+
+def best_time(fn: Callable[[], object], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_memory_mb(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_file(path: str, repeats: int) -> Dict[str, dict]:
+    name = os.path.splitext(os.path.basename(path))[0]
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    results: Dict[str, dict] = {}
+    pages: Optional[List[str]] = None
+
+    for extractor, extract in EXTRACTORS.items():
+        extracted = extract(path)
+        pages = pages or extracted
+        seconds = best_time(lambda: extract(path), repeats)
+        results[f"extract/{extractor}/{name}"] = {
+            "pages": len(extracted),
+            "seconds": round(seconds, 4),
+            "pages_per_sec": round(len(extracted) / seconds, 1),
+            "mb_per_sec": round(size_mb / seconds, 2),
+            "peak_mb": round(peak_memory_mb(lambda: extract(path)), 2),
+            "chars": sum(len(p) for p in extracted)
+        }
+
+    for size, overlap in CHUNKERS:
+        chunks = PDFExtractor.chunk_text(pages, chunk_size=size, overlap=overlap)
+        seconds = best_time(lambda: PDFExtractor.chunk_text(pages, chunk_size=size, overlap=overlap), repeats)
+        lengths = sorted(len(c) for c in chunks) or [0]
+        results[f"chunk/{size}-{overlap}/{name}"] = {
+            "chunks": len(chunks),
+            "seconds": round(seconds, 4),
+            "chunks_per_sec": round(len(chunks) / seconds, 1) if seconds else 0.0,
+            "peak_mb": round(peak_memory_mb(
+                lambda: PDFExtractor.chunk_text(pages, chunk_size=size, overlap=overlap)
+            ), 2),
+            "len_mean": round(statistics.fmean(lengths), 1),
+            "len_p50": lengths[len(lengths) // 2],
+            "len_p95": lengths[min(len(lengths) - 1, int(len(lengths) * 0.95))],
+            "len_max": lengths[-1]
+        }
+    return results
+
+
+def compare(result: dict, baseline: Optional[dict], tolerance: float) -> Tuple[str, List[str]]:
+    """Delta of the headline metric vs baseline, and the problems found"""
+    if baseline is None:
+        return "new", []
+    problems, delta = [], ""
+    for metric, direction in COMPARED_METRICS.items():
+        if metric not in result or not baseline.get(metric):
+            continue
+        change = (result[metric] - baseline[metric]) / baseline[metric]
+        if metric != "peak_mb":
+            delta = f"{change:+.0%}"
+        if change * direction < -tolerance:
+            problems.append(f"{metric} {baseline[metric]} -> {result[metric]} ({change:+.0%})")
+    for metric in ("pages", "chunks"):
+        if metric in result and metric in baseline and result[metric] != baseline[metric]:
+            problems.append(f"{metric} changed {baseline[metric]} -> {result[metric]}")
+    return delta, problems
+
+
+def print_row(key: str, r: dict, delta: str):
+    if key.startswith("extract/"):
+        detail = f"{r['pages_per_sec']:>9.1f} p/s {r['mb_per_sec']:>7.2f} MB/s"
+    else:
+        detail = f"{r['chunks_per_sec']:>9.1f} c/s {r['chunks']:>7} ch  len p50 {r['len_p50']:>4} p95 {r['len_p95']:>4}"
+    print(f"{key:<44} {detail}  {r['peak_mb']:>7.1f} MB  {delta:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Small corpus (up to 200 pages)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--profile", action="append", choices=list(pdf_corpus.PROFILES), help="Only these profiles")
+    parser.add_argument("--corpus-dir", default=pdf_corpus.CORPUS_DIR)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown/memory growth")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on regressions or changed chunk counts")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    corpus = pdf_corpus.QUICK_CORPUS if args.quick else pdf_corpus.DEFAULT_CORPUS
+    if args.profile:
+        corpus = [(profile, pages) for profile, pages in corpus if profile in args.profile]
+    started = time.perf_counter()
+    paths = pdf_corpus.generate(args.corpus_dir, corpus)
+    print(f"📚 Corpus: {len(paths)} PDFs in {args.corpus_dir} ({time.perf_counter() - started:.1f}s)")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored["meta"].get("corpus_version") == pdf_corpus.GENERATOR_VERSION:
+            baseline = stored["results"]
+        else:
+            print("⚠️ Baseline was recorded on another corpus version; not comparing")
+
+    results: Dict[str, dict] = {}
+    problems: List[str] = []
+    print(f"\n{'benchmark':<44} {'throughput':>35}  {'peak':>10}  {'vs base':>6}")
+    for path in paths:
+        for key, r in bench_file(path, args.repeats).items():
+            results[key] = r
+            delta, found = compare(r, baseline.get(key) if baseline else None, args.tolerance)
+            problems += [f"{key}: {p}" for p in found]
+            print_row(key, r, delta if baseline else "")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+            "cpu_count": os.cpu_count(),
+            "corpus_version": pdf_corpus.GENERATOR_VERSION,
+            "repeats": args.repeats
+        },
+        "results": results
+    }
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if os.path.exists(args.baseline):
+            # Keep entries of files not in this run (e.g. a --quick refresh)
+            with open(args.baseline, encoding="utf-8") as f:
+                report["results"] = {**json.load(f)["results"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline written to {args.baseline}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if problems:
+        print(f"\n⚠️ {len(problems)} regression(s) vs baseline (tolerance {args.tolerance:.0%}):")
+        for problem in problems:
+            print(f"   {problem}")
+    elif baseline:
+        print("\n✅ No regressions vs baseline")
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
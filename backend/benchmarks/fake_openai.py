@@ -0,0 +1,255 @@
+"""
+Fake OpenAI-compatible server for offline benchmarks
+
+Serves /v1/embeddings and /v1/chat/completions with deterministic output:
+embeddings are derived from a hash of the input text (same text, same
+vector), completions from a hash of the messages. Latency is simulated per
+request (base + per output token, with jitter), and the server enforces its
+own requests/tokens per minute limits, answering 429 with OpenAI's error body
+and retry headers, so the app's scheduler and the client's retry logic run
+exactly as they would against the real API. A fraction of requests can also
+be failed with 429 on purpose.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Usage:
+  python -m benchmarks.fake_openai --port 9100 --latency-ms 400 --jitter-ms 150 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import struct
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_PORT = 9100
+
+
+@dataclass
+class FakeOpenAIConfig:
+    latency_ms: float = 300.0  # Base latency of a chat completion
+    ms_per_token: float = 5.0  # Added per output token (generation time)
+    embedding_latency_ms: float = 80.0  # Base latency of an embeddings call
+    jitter_ms: float = 100.0  # Uniform +/- jitter on every call
+    rpm: int = 0  # Requests per minute before 429s (0 = unlimited)
+    tpm: int = 0  # Tokens per minute before 429s (0 = unlimited)
+    error_rate: float = 0.0  # Fraction of requests answered with an injected 429
+    completion_tokens: int = 200  # Length of generated completions
+    dimensions: int = 1536
+    seed: int = 0
+
+
+class _Bucket:
+    """Per-minute limit refilled continuously, like OpenAI's limiter"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def wait(self, amount: float) -> Optional[float]:
+        """None if amount is available now, else seconds until it would be (consumes nothing)"""
+        if self.capacity <= 0:
+            return None
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+        if self.level >= amount:
+            return None
+        return (amount - self.level) * 60 / self.capacity
+
+    def take(self, amount: float):
+        """Consume amount (after wait() said it is available)"""
+        if self.capacity > 0:
+            self.level -= amount
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), same scale as the app's estimate"""
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit vector for a text"""
+    raw = hashlib.shake_256(text.encode("utf-8")).digest(dimensions * 2)
+    values = [v / 32768.0 for v in struct.unpack(f"<{dimensions}h", raw)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def fake_completion(messages: list, tokens: int, json_mode: bool) -> str:
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    words = [f"w{digest[i % 60:i % 60 + 4]}" for i in range(tokens)]
+    if not json_mode:
+        return " ".join(words)
+    # One object that satisfies the JSON shapes the app asks for (quiz, planner)
+    return json.dumps({
+        "title": f"Study Plan {digest[:8]}",
+        "topics": [{"name": f"Topic {i + 1} {digest[i:i + 6]}", "effort_hours": 1 + i % 3} for i in range(5)],
+        "questions": [
+            {
+                "question": f"Question {i + 1} {digest[i:i + 6]}?",
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": i % 4,
+                "explanation": " ".join(words[:20])
+            }
+            for i in range(5)
+        ]
+    })
+
+
+def _rate_limited(message: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"error": {"message": message, "type": "requests", "param": None, "code": "rate_limit_exceeded"}},
+        headers={
+            "retry-after-ms": str(int(retry_after * 1000)),
+            "retry-after": str(max(1, math.ceil(retry_after)))
+        }
+    )
+
+
+def build_app(config: FakeOpenAIConfig) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(config.seed)
+    requests_bucket = _Bucket(config.rpm)
+    tokens_bucket = _Bucket(config.tpm)
+    stats = {"embeddings": 0, "chat_completions": 0, "rate_limited": 0, "injected_errors": 0, "tokens": 0}
+
+    def admit(tokens: int) -> Optional[JSONResponse]:
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["injected_errors"] += 1
+            return _rate_limited("Injected rate limit error", 0.5)
+        # Like OpenAI, a rejected request uses up neither its request slot nor its tokens
+        waits = [w for w in (requests_bucket.wait(1), tokens_bucket.wait(tokens)) if w is not None]
+        if waits:
+            stats["rate_limited"] += 1
+            return _rate_limited("Rate limit reached", max(waits))
+        requests_bucket.take(1)
+        tokens_bucket.take(tokens)
+        stats["tokens"] += tokens
+        return None
+
+    async def delay(base_ms: float):
+        jitter = rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, base_ms + jitter) / 1000)
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(count_tokens(text) for text in inputs)
+        rejected = admit(tokens)
+        if rejected:
+            return rejected
+
+        await delay(config.embedding_latency_ms)
+        stats["embeddings"] += 1
+        return {
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text, config.dimensions)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+        rejected = admit(prompt_tokens + completion_tokens)
+        if rejected:
+            return rejected
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        await delay(config.latency_ms + config.ms_per_token * completion_tokens)
+        stats["chat_completions"] += 1
+        return {
+            "id": f"chatcmpl-fake-{stats['chat_completions']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": fake_completion(messages, completion_tokens, json_mode)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "benchmarks"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"config": asdict(config), **stats}
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Fake server options, shared with benchmarks.offline_suite"""
+    defaults = FakeOpenAIConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--ms-per-token", type=float, default=defaults.ms_per_token)
+    parser.add_argument("--embedding-latency-ms", type=float, default=defaults.embedding_latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--rpm", type=int, default=defaults.rpm, help="0 = unlimited")
+    parser.add_argument("--tpm", type=int, default=defaults.tpm, help="0 = unlimited")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed (also used by the load generators)")
+
+
+def config_from_args(args: argparse.Namespace) -> FakeOpenAIConfig:
+    return FakeOpenAIConfig(
+        latency_ms=args.latency_ms,
+        ms_per_token=args.ms_per_token,
+        embedding_latency_ms=args.embedding_latency_ms,
+        jitter_ms=args.jitter_ms,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        error_rate=args.error_rate,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed
+    )
+
+
+def config_to_argv(config: FakeOpenAIConfig) -> List[str]:
+    """Command-line flags reproducing a config (to start the server as a subprocess)"""
+    argv = []
+    for key, value in asdict(config).items():
+        if key != "dimensions":
+            argv += [f"--{key.replace('_', '-')}", str(value)]
+    return argv
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(build_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
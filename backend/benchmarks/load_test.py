@@ -0,0 +1,364 @@
+"""
+Open-loop load test: a realistic mix of student traffic at increasing rates
+
+Replays the flows of test_upload_e2e.py and test_chat.py (and the other
+generators) as simulated students, each a user from the local seeder with
+their own documents and a notebook over them:
+
+  chat     - POST /api/chat/query over the student's notebook documents
+  upload   - POST /api/documents/upload, then poll /status until ready
+  quiz     - POST /api/quiz/generate for one document
+  notes    - POST /api/notes/generate for one document and topic
+  browse   - GET /api/notebooks and /api/documents (page loads)
+
+Arrivals are open-loop (Poisson at the offered rate, independent of
+responses), and latency counts from the scheduled arrival time, so a
+saturated server shows up as growing latency instead of a slower client.
+Each rate step reports per endpoint: throughput, error rate and
+p50/p95/p99. An endpoint is saturated at the first rate where its p95 passes
+--slo-ms, errors pass --max-error-rate, or it completes less than 90% of
+what was offered.
+
+By default the fake OpenAI server and the app (one uvicorn worker) are
+started as in benchmarks.offline_suite; SUPABASE_* should point at the local
+stand-in, seeded with local_supabase.seed (whose output lists the users).
+
+Usage:
+  python -m benchmarks.load_test --rates 1,2,4,8,16 --step-seconds 30
+  python -m benchmarks.load_test --mix chat=0.8,browse=0.2 --app-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import httpx
+from benchmarks import fake_openai, pdf_corpus
+from benchmarks.offline_suite import (
+    STATUS_POLL_SECONDS, free_port, mint_token, percentile, start_app, start_fake_openai, wait_until_up
+)
+
+DEFAULT_MIX = {"chat": 0.55, "browse": 0.2, "quiz": 0.1, "notes": 0.1, "upload": 0.05}
+DEFAULT_SLO_MS = {
+    "chat": 8000, "quiz": 15000, "notes": 15000, "upload": 5000, "status": 500,
+    "notebooks": 500, "documents": 500, "ingest": 120000,
+}
+# Endpoint a scenario's arrival is measured on (the others are endpoint names already)
+SCENARIO_ENDPOINT = {"browse": "notebooks"}
+SEEDED_USERS_PATH = "local_supabase/data/seeded_users.json"
+QUESTIONS = [
+    "What is this document about?",
+    "Summarize the key points of chapter two.",
+    "Explain the main formula with an example.",
+    "What should I revise before the exam?",
+    "Compare the two approaches described in the notes.",
+]
+
+
+@dataclass
+class Student:
+    user_id: str
+    headers: Dict[str, str]
+    document_ids: List[str]
+    notebook_id: Optional[str] = None
+    uploaded: List[str] = field(default_factory=list)
+
+
+class StepStats:
+    """Latencies and errors per endpoint for one rate step"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.offered: Dict[str, int] = defaultdict(int)
+        self.dropped = 0
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        if ok:
+            self.latencies[endpoint].append(seconds)
+        else:
+            self.errors[endpoint] += 1
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        result = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[endpoint])
+            total = len(latencies) + self.errors[endpoint]
+            result[endpoint] = {
+                "requests": total,
+                "completed": len(latencies),
+                # Follow-up requests (status polls, second browse call) have no arrivals of their own
+                "offered": self.offered.get(endpoint, total),
+                "rps": len(latencies) / duration,
+                "error_rate": self.errors[endpoint] / total if total else 0.0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000
+            }
+        return result
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, client: httpx.AsyncClient, students: List[Student], pdf: bytes):
+        self.args = args
+        self.client = client
+        self.students = students
+        self.pdf = pdf
+        self.rng = random.Random(args.seed)
+        self.scenarios = list(args.mix)
+        self.weights = [args.mix[s] for s in self.scenarios]
+
+    async def call(self, stats: StepStats, endpoint: str, started: float, method: str, url: str,
+                   student: Student, **kwargs) -> Optional[httpx.Response]:
+        try:
+            response = await self.client.request(method, url, headers=student.headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        stats.record(endpoint, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    # Scenarios; `scheduled` is the arrival time the first request is measured from
+
+    async def chat(self, stats: StepStats, student: Student, scheduled: float):
+        await self.call(stats, "chat", scheduled, "POST", "/api/chat/query", student, json={
+            "document_ids": student.document_ids,
+            "message": self.rng.choice(QUESTIONS)
+        })
+
+    async def browse(self, stats: StepStats, student: Student, scheduled: float):
+        await self.call(stats, "notebooks", scheduled, "GET", "/api/notebooks", student)
+        await self.call(stats, "documents", time.perf_counter(), "GET", "/api/documents", student)
+
+    async def quiz(self, stats: StepStats, student: Student, scheduled: float):
+        await self.call(stats, "quiz", scheduled, "POST", "/api/quiz/generate", student, json={
+            "document_ids": [self.rng.choice(student.document_ids)],
+            "num_questions": 5,
+            "difficulty": self.rng.choice(["easy", "medium", "hard"])
+        })
+
+    async def notes(self, stats: StepStats, student: Student, scheduled: float):
+        await self.call(stats, "notes", scheduled, "POST", "/api/notes/generate", student, json={
+            "document_ids": [self.rng.choice(student.document_ids)],
+            "topic": self.rng.choice([None, "definitions", "key formulas", "exam topics"])
+        })
+
+    async def upload(self, stats: StepStats, student: Student, scheduled: float):
+        response = await self.call(
+            stats, "upload", scheduled, "POST", "/api/documents/upload", student,
+            files={"file": ("load_test.pdf", self.pdf, "application/pdf")}
+        )
+        if response is None:
+            stats.record("ingest", 0, False)
+            return
+        document_id = response.json()["id"]
+        student.uploaded.append(document_id)
+
+        while True:
+            await asyncio.sleep(STATUS_POLL_SECONDS)
+            status = await self.call(
+                stats, "status", time.perf_counter(), "GET", f"/api/documents/{document_id}/status", student
+            )
+            if status is not None and status.json()["status"] in ("ready", "failed"):
+                stats.record("ingest", time.perf_counter() - scheduled, status.json()["status"] == "ready")
+                return
+            if time.perf_counter() - scheduled > DEFAULT_SLO_MS["ingest"] / 1000 * 2:
+                stats.record("ingest", time.perf_counter() - scheduled, False)
+                return
+
+    async def run_step(self, rate: float) -> Dict[str, dict]:
+        stats = StepStats()
+        tasks = set()
+        started = time.perf_counter()
+        arrival = started
+        while True:
+            arrival += self.rng.expovariate(rate)
+            if arrival - started >= self.args.step_seconds:
+                break
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            endpoint = SCENARIO_ENDPOINT.get(scenario, scenario)
+            stats.offered[endpoint] += 1
+            if len(tasks) >= self.args.max_in_flight:
+                stats.dropped += 1
+                stats.record(endpoint, 0, False)
+                continue
+            task = asyncio.create_task(getattr(self, scenario)(stats, self.rng.choice(self.students), arrival))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        # Let in-flight work finish so its latency counts toward this step
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.args.drain_seconds)
+            for task in tasks:
+                task.cancel()
+        summary = stats.summary(time.perf_counter() - started)
+        summary["_step"] = {"rate": rate, "dropped": stats.dropped}
+        return summary
+
+
+def saturated(endpoint: str, r: dict, args: argparse.Namespace) -> Optional[str]:
+    slo = args.slo_ms.get(endpoint)
+    if slo is not None and r["p95_ms"] > slo:
+        return f"p95 {r['p95_ms']:.0f}ms > {slo}ms"
+    if r["error_rate"] > args.max_error_rate:
+        return f"errors {r['error_rate']:.1%}"
+    if r["offered"] and r["completed"] < 0.9 * r["offered"]:
+        return "completed < 90% of offered"
+    return None
+
+
+async def setup_students(client: httpx.AsyncClient, args: argparse.Namespace, secret: str) -> List[Student]:
+    with open(args.users_file, encoding="utf-8") as f:
+        users = [u for u in json.load(f)["users"] if u["document_ids"]][:args.users]
+    if not users:
+        raise SystemExit(f"No seeded users with documents in {args.users_file} (run local_supabase.seed)")
+
+    students = []
+    for user in users:
+        student = Student(
+            user_id=user["id"],
+            headers={"Authorization": f"Bearer {mint_token(user['id'], secret)}"},
+            document_ids=user["document_ids"][:args.documents_per_chat]
+        )
+        response = await client.post("/api/notebooks", headers=student.headers, json={
+            "title": "Load test notebook",
+            "document_ids": student.document_ids
+        })
+        response.raise_for_status()
+        student.notebook_id = response.json()["id"]
+        students.append(student)
+    return students
+
+
+async def cleanup_students(client: httpx.AsyncClient, students: List[Student]):
+    for student in students:
+        if student.notebook_id:
+            await client.delete(f"/api/notebooks/{student.notebook_id}", headers=student.headers)
+        for i in range(0, len(student.uploaded), 500):
+            await client.post(
+                "/api/documents/bulk-delete",
+                headers=student.headers,
+                json={"document_ids": student.uploaded[i:i + 500]}
+            )
+
+
+def print_step(summary: Dict[str, dict]):
+    step = summary["_step"]
+    print(f"\n⏱️  {step['rate']:g} arrivals/s (dropped at client cap: {step['dropped']})")
+    print(f"{'endpoint':<10} {'reqs':>6} {'rps':>7} {'err':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, r in summary.items():
+        if endpoint == "_step":
+            continue
+        print(
+            f"{endpoint:<10} {r['requests']:>6} {r['rps']:>7.2f} {r['error_rate']:>6.1%} "
+            f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f}"
+        )
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+
+def parse_slo(value: str) -> Dict[str, float]:
+    return {**DEFAULT_SLO_MS, **{k: float(v) for k, v in (p.split("=") for p in value.split(","))}}
+
+
+async def run(args: argparse.Namespace, app_url: str, secret: str) -> dict:
+    pdf_path = args.pdf or pdf_corpus.generate(pdf_corpus.CORPUS_DIR, [("text", 20)])[0]
+    with open(pdf_path, "rb") as f:
+        pdf = f.read()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=app_url, timeout=args.drain_seconds, limits=limits) as client:
+        students = await setup_students(client, args, secret)
+        print(f"👩‍🎓 {len(students)} students, mix {args.mix}")
+        test = LoadTest(args, client, students, pdf)
+        steps = []
+        saturation: Dict[str, dict] = {}
+        try:
+            for rate in args.rates:
+                summary = await test.run_step(rate)
+                steps.append(summary)
+                print_step(summary)
+                for endpoint, r in summary.items():
+                    reason = saturated(endpoint, r, args) if endpoint != "_step" else None
+                    if reason and endpoint not in saturation:
+                        saturation[endpoint] = {"rate": rate, "reason": reason}
+        finally:
+            await cleanup_students(client, students)
+
+    print("\n📈 Saturation (first offered rate that broke the endpoint's limits)")
+    endpoints = sorted({e for s in steps for e in s if e != "_step"})
+    for endpoint in endpoints:
+        if endpoint in saturation:
+            s = saturation[endpoint]
+            print(f"   {endpoint:<10} at {s['rate']:g}/s ({s['reason']})")
+        else:
+            print(f"   {endpoint:<10} not saturated up to {args.rates[-1]:g}/s")
+    return {"mix": args.mix, "steps": steps, "saturation": saturation}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=lambda v: [float(r) for r in v.split(",")], default=[1, 2, 4, 8],
+                        help="Offered arrivals/s per step, e.g. 1,2,4,8")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX), help="e.g. chat=0.6,browse=0.3,upload=0.1")
+    parser.add_argument("--slo-ms", type=parse_slo, default=dict(DEFAULT_SLO_MS), help="p95 limits, e.g. chat=5000")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-in-flight", type=int, default=2000, help="Client-side cap on concurrent scenarios")
+    parser.add_argument("--drain-seconds", type=float, default=120.0, help="Wait for in-flight work after each step")
+    parser.add_argument("--users-file", default=SEEDED_USERS_PATH)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--documents-per-chat", type=int, default=5)
+    parser.add_argument("--pdf", help="PDF to upload (default: a generated 20-page text PDF)")
+    parser.add_argument("--app-url", help="Use a running app instead of starting one (with its own OpenAI setup)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the app")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+    fake_openai.add_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    from app.core.config import settings
+
+    processes = []
+    try:
+        app_url = args.app_url
+        if app_url is None:
+            openai_port, app_port = free_port(), free_port()
+            openai_url = f"http://127.0.0.1:{openai_port}/v1"
+            app_url = f"http://127.0.0.1:{app_port}"
+            processes.append(start_fake_openai(fake_openai.config_from_args(args), openai_port))
+            await wait_until_up(f"http://127.0.0.1:{openai_port}/stats", processes[-1])
+            processes.append(start_app(app_port, args.workers, openai_url))
+            await wait_until_up(f"{app_url}/health", processes[-1])
+
+        report = await run(args, app_url, settings.SUPABASE_JWT_SECRET)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\n💾 Report written to {args.json_path}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,292 @@
+"""
+Offline throughput benchmark: the real app against a fake OpenAI server
+
+Starts benchmarks.fake_openai and the FastAPI app (uvicorn, real workers) as
+subprocesses, with the app's OPENAI_BASE_URL pointing at the fake server and
+the LLM response cache off. Then measures:
+
+  ingestion - uploads PDFs through /api/documents/upload and follows each to
+              "ready"; reports pages/sec and per-document latency
+  chat      - closed-loop /api/chat/query clients at each concurrency level;
+              reports requests/sec and p50/p95/p99 latency
+
+OpenAI latency, jitter, rate limits and injected 429s are set with the fake
+server flags (see benchmarks/fake_openai.py). Supabase is still real: use the
+project from .env or a local stand-in. Requests are signed with
+SUPABASE_JWT_SECRET for --user-id, which must exist in auth.users.
+
+Usage:
+  python -m benchmarks.offline_suite --user-id <uuid> --pdf sample.pdf --uploads 10 \\
+      --concurrency 1,8,32 --duration 20 --latency-ms 400 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+import httpx
+from jose import jwt
+from benchmarks import fake_openai
+
+STATUS_POLL_SECONDS = 0.25
+STARTUP_TIMEOUT_SECONDS = 30.0
+CHAT_QUESTIONS = [
+    "Summarize the main ideas of this material.",
+    "What are the key definitions I should remember?",
+    "Explain the most important concept with an example.",
+    "Which topics are most likely to appear in an exam?",
+    "How do the sections of this document relate to each other?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+
+
+def mint_token(user_id: str, secret: str, ttl: int = 3600) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": user_id, "role": "authenticated", "email": "bench@example.com", "iat": now, "exp": now + ttl},
+        secret,
+        algorithm="HS256"
+    )
+
+
+async def wait_until_up(url: str, process: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+def start_fake_openai(config: fake_openai.FakeOpenAIConfig, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(port), *fake_openai.config_to_argv(config)]
+    )
+
+
+def start_app(port: int, workers: int, openai_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": "sk-fake",
+        "LLM_CACHE_ENABLED": "false",  # Every call should reach the (fake) API
+        "DEV_MODE": "false"
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env
+    )
+
+
+async def ingest_one(client: httpx.AsyncClient, pdf_path: str) -> dict:
+    started = time.perf_counter()
+    with open(pdf_path, "rb") as f:
+        response = await client.post(
+            "/api/documents/upload",
+            files={"file": (os.path.basename(pdf_path), f, "application/pdf")}
+        )
+    response.raise_for_status()
+    document_id = response.json()["id"]
+
+    while True:
+        status = (await client.get(f"/api/documents/{document_id}/status")).json()
+        if status["status"] in ("ready", "failed"):
+            break
+        await asyncio.sleep(STATUS_POLL_SECONDS)
+
+    return {
+        "id": document_id,
+        "status": status["status"],
+        "pages": status.get("page_count") or 0,
+        "seconds": time.perf_counter() - started
+    }
+
+
+async def run_ingestion(client: httpx.AsyncClient, pdfs: List[str], uploads: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[dict] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            try:
+                results.append(await ingest_one(client, pdfs[i % len(pdfs)]))
+            except Exception as e:
+                errors += 1
+                print(f"⚠️ [Bench] Upload failed: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(uploads)])
+    elapsed = time.perf_counter() - started
+
+    ready = [r for r in results if r["status"] == "ready"]
+    pages = sum(r["pages"] for r in ready)
+    per_doc = sorted(r["seconds"] for r in ready)
+    return {
+        "documents": len(ready),
+        "failed": len(results) - len(ready) + errors,
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "doc_p50_s": percentile(per_doc, 50),
+        "doc_p95_s": percentile(per_doc, 95),
+        "document_ids": [r["id"] for r in results]
+    }
+
+
+async def run_chat(client: httpx.AsyncClient, document_ids: List[str], concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int):
+        nonlocal errors
+        i = n
+        while time.perf_counter() < deadline:
+            payload = {"document_ids": document_ids, "message": CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]}
+            i += concurrency
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/chat/query", json=payload)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(n) for n in range(concurrency)])
+    return latency_summary(latencies, errors, time.perf_counter() - started)
+
+
+async def run_suite(args: argparse.Namespace, app_url: str, openai_url: str, token: str) -> Dict[str, object]:
+    report: Dict[str, object] = {}
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=app_url, headers=headers, timeout=300, limits=limits) as client:
+        document_ids: List[str] = list(args.document_id or [])
+        uploaded: List[str] = []
+
+        if args.pdf and args.uploads:
+            ingestion = await run_ingestion(client, args.pdf, args.uploads, args.upload_concurrency)
+            uploaded = ingestion.pop("document_ids")
+            document_ids += uploaded
+            report["ingestion"] = ingestion
+            print(
+                f"\n📄 Ingestion: {ingestion['documents']} docs, {ingestion['pages']} pages in "
+                f"{ingestion['seconds']:.1f}s = {ingestion['pages_per_sec']:.2f} pages/s "
+                f"(doc p50 {ingestion['doc_p50_s']:.1f}s, p95 {ingestion['doc_p95_s']:.1f}s, "
+                f"failed {ingestion['failed']})"
+            )
+
+        if document_ids and args.duration > 0:
+            report["chat"] = {}
+            print(f"\n💬 Chat ({len(document_ids)} documents, {args.duration:.0f}s per level)")
+            print(f"{'clients':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for concurrency in args.concurrency:
+                r = await run_chat(client, document_ids, concurrency, args.duration)
+                report["chat"][concurrency] = r
+                print(
+                    f"{concurrency:>8} {r['rps']:>8.2f} {r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} "
+                    f"{r['p99_ms']:>9.0f} {r['errors']:>7}"
+                )
+
+        if uploaded and not args.keep:
+            for i in range(0, len(uploaded), 500):
+                await client.post("/api/documents/bulk-delete", json={"document_ids": uploaded[i:i + 500]})
+
+    async with httpx.AsyncClient() as client:
+        report["fake_openai"] = (await client.get(f"{openai_url.rsplit('/v1', 1)[0]}/stats")).json()
+    stats = report["fake_openai"]
+    print(
+        f"\n🤖 Fake OpenAI: {stats['chat_completions']} completions, {stats['embeddings']} embedding calls, "
+        f"{stats['rate_limited']} rate limited, {stats['injected_errors']} injected 429s"
+    )
+    return report
+
+
+def parse_levels(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True, help="Existing user the requests are signed for")
+    parser.add_argument("--pdf", action="append", help="PDF to upload (repeatable; cycled through)")
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--upload-concurrency", type=int, default=5)
+    parser.add_argument("--document-id", action="append", help="Already ingested document to chat with (repeatable)")
+    parser.add_argument("--concurrency", type=parse_levels, default=[1, 8, 32], help="Chat client counts, e.g. 1,8,32")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per chat level (0 skips chat)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--keep", action="store_true", help="Keep uploaded documents")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+    fake_openai.add_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    from app.core.config import settings
+    token = mint_token(args.user_id, settings.SUPABASE_JWT_SECRET)
+
+    openai_port, app_port = free_port(), free_port()
+    openai_url = f"http://127.0.0.1:{openai_port}/v1"
+    app_url = f"http://127.0.0.1:{app_port}"
+
+    processes = [start_fake_openai(fake_openai.config_from_args(args), openai_port)]
+    try:
+        await wait_until_up(f"http://127.0.0.1:{openai_port}/stats", processes[0])
+        processes.append(start_app(app_port, args.workers, openai_url))
+        await wait_until_up(f"{app_url}/health", processes[1])
+
+        report = await run_suite(args, app_url, openai_url, token)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\n💾 Report written to {args.json_path}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,212 @@
+"""
+Synthetic PDF corpus for the extraction/chunking benchmark
+
+Writes small, valid PDFs without any PDF library: one Flate-compressed
+content stream per page and a standard Type1 font. Profiles stress different
+parts of PDFExtractor.extract_text and chunk_text:
+
+  text       - dense paragraphs of sentences (the common case)
+  table      - grids of short cells positioned one by one (many text operators)
+  long_line  - one unbroken line per page, no sentence or line breaks
+  unicode    - mixed scripts (Greek, Cyrillic, CJK, accents, symbols) mapped
+               through a ToUnicode CMap, so extraction goes through char maps
+  many_page  - many short pages (per-page overhead)
+
+Output is deterministic for a given seed, so a corpus can be regenerated on
+any machine instead of being checked in.
+"""
+import os
+import random
+import zlib
+from typing import Callable, Dict, Iterator, List, Tuple
+
+GENERATOR_VERSION = 1  # Bump when the output changes, invalidates cached corpora
+CORPUS_DIR = ".cache/pdf_corpus"
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+LINES_PER_PAGE = 55
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vi", "so", "de", "pa", "xo", "li", "em", "or", "un", "ba"]
+
+# Characters for the unicode profile: code 0x20 + i in the PDF maps to UNICODE_CHARS[i]
+UNICODE_CHARS = (
+    " .,;:-()0123456789"
+    "αβγδεζηθικλμνξοπρστυφχψωΑΒΓΔΘΛΞΠΣΦΨΩ"
+    "абвгдежзийклмнопрстуфхцчшщыэюяАБВГДЖЗИКЛМНПРСТ"
+    "的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年"
+    "éèêëàâäôöùûüçñßøåÉÀÇÑ"
+    "∑∫√∞≈≠≤≥±×÷∂∇∈∉∩∪⊂⊃→←↔"
+)
+assert len(UNICODE_CHARS) <= 224
+
+
+def _vocabulary(rng: random.Random, size: int = 3000) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_page(rng: random.Random, words: List[str]) -> bytes:
+    lines, line = [], ""
+    while len(lines) < LINES_PER_PAGE:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 20))).capitalize() + ". "
+        for word in sentence.split(" "):
+            if len(line) + len(word) > 95:
+                lines.append(line.rstrip())
+                line = ""
+            line += word + " "
+    ops = ["BT /F1 10 Tf 12 TL 40 760 Td"] + [f"({_escape(l)}) Tj T*" for l in lines] + ["ET"]
+    return "\n".join(ops).encode("latin-1")
+
+
+def _table_page(rng: random.Random, words: List[str]) -> bytes:
+    ops = ["BT /F1 8 Tf"]
+    for row in range(LINES_PER_PAGE):
+        y = 760 - row * 13
+        cells = [
+            f"R{row:03d}", rng.choice(words), f"{rng.uniform(0, 9999):.2f}", str(rng.randint(0, 10 ** 6)),
+            f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            rng.choice(words), f"{rng.randint(0, 100)}%", rng.choice(["yes", "no", "n/a"])
+        ]
+        ops.append(f"1 0 0 1 40 {y} Tm")
+        for i, cell in enumerate(cells):
+            # Each cell is its own positioned text operation, as table generators emit
+            ops.append(f"{0 if i == 0 else 68} 0 Td ({_escape(cell)}) Tj")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _long_line_page(rng: random.Random, words: List[str]) -> bytes:
+    line = " ".join(rng.choice(words) for _ in range(1500))
+    return f"BT /F1 10 Tf 40 760 Td ({_escape(line)}) Tj ET".encode("latin-1")
+
+
+def _unicode_page(rng: random.Random, words: List[str]) -> bytes:
+    letters = UNICODE_CHARS[18:]
+    ops = ["BT /F2 10 Tf 12 TL 40 760 Td"]
+    for _ in range(LINES_PER_PAGE):
+        tokens = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 8))) for _ in range(rng.randint(8, 14))]
+        line = " ".join(tokens) + "."
+        codes = "".join(f"{0x20 + UNICODE_CHARS.index(c):02X}" for c in line)
+        ops.append(f"<{codes}> Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def text_stream(text: str, width: int = 95) -> bytes:
+    """Content stream laying out given (latin-1) text in wrapped lines, for fixture PDFs"""
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) > width:
+            lines.append(line.rstrip())
+            line = ""
+        line += word + " "
+    lines.append(line.rstrip())
+    ops = ["BT /F1 10 Tf 12 TL 40 760 Td"] + [f"({_escape(l)}) Tj T*" for l in lines] + ["ET"]
+    return "\n".join(ops).encode("latin-1")
+
+
+def _many_page(rng: random.Random, words: List[str]) -> bytes:
+    sentence = " ".join(rng.choice(words) for _ in range(rng.randint(10, 40))).capitalize() + "."
+    return f"BT /F1 10 Tf 40 760 Td ({_escape(sentence)}) Tj ET".encode("latin-1")
+
+
+PROFILES: Dict[str, Callable[[random.Random, List[str]], bytes]] = {
+    "text": _text_page,
+    "table": _table_page,
+    "long_line": _long_line_page,
+    "unicode": _unicode_page,
+    "many_page": _many_page,
+}
+
+# (profile, pages) of the default corpus
+DEFAULT_CORPUS: List[Tuple[str, int]] = [
+    ("text", 1), ("text", 20), ("text", 200), ("text", 1000),
+    ("table", 20), ("table", 200),
+    ("long_line", 20), ("long_line", 200),
+    ("unicode", 20), ("unicode", 200),
+    ("many_page", 2000),
+]
+QUICK_CORPUS: List[Tuple[str, int]] = [
+    ("text", 1), ("text", 20), ("table", 20), ("long_line", 20), ("unicode", 20), ("many_page", 200),
+]
+
+
+def _to_unicode_cmap() -> bytes:
+    entries = [f"<{0x20 + i:02X}> <{ord(c):04X}>" for i, c in enumerate(UNICODE_CHARS)]
+    blocks = []
+    for i in range(0, len(entries), 100):
+        block = entries[i:i + 100]
+        blocks.append(f"{len(block)} beginbfchar\n" + "\n".join(block) + "\nendbfchar")
+    return (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+        "1 begincodespacerange\n<00> <FF>\nendcodespacerange\n"
+        + "\n".join(blocks) +
+        "\nendcmap\nCMapName currentdict /CMapResource defineresource pop\nend\nend"
+    ).encode("ascii")
+
+
+def _stream(data: bytes) -> bytes:
+    compressed = zlib.compress(data)
+    return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(compressed) + compressed + b"\nendstream"
+
+
+def write_pdf(path: str, page_streams: Iterator[bytes], page_count: int):
+    """Write a PDF with one content stream per page (objects: 1 catalog, 2 pages, 3-5 fonts)"""
+    first_page = 6
+    offsets: List[int] = []
+
+    with open(path, "wb") as f:
+        def obj(number: int, body: bytes):
+            offsets.append(f.tell())
+            assert len(offsets) == number
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{first_page + 2 * i} 0 R" for i in range(page_count))
+        obj(2, f"<< /Type /Pages /Count {page_count} /Kids [{kids}] >>".encode("ascii"))
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        obj(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /ToUnicode 5 0 R >>")
+        obj(5, _stream(_to_unicode_cmap()))
+
+        for i, content in enumerate(page_streams):
+            number = first_page + 2 * i
+            obj(number, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {number + 1} 0 R >>"
+            ).encode("ascii"))
+            obj(number + 1, _stream(content))
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+
+
+def corpus_file_name(profile: str, pages: int) -> str:
+    return f"{profile}_{pages:04d}p.pdf"
+
+
+def generate(directory: str, corpus: List[Tuple[str, int]], seed: int = 0) -> List[str]:
+    """Write the corpus into directory (skipping files already there); returns the paths"""
+    directory = os.path.join(directory, f"v{GENERATOR_VERSION}-seed{seed}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for profile, pages in corpus:
+        path = os.path.join(directory, corpus_file_name(profile, pages))
+        if not os.path.exists(path):
+            # Seeded per file so each file is the same whatever else is generated
+            rng = random.Random(f"{seed}-{profile}-{pages}")
+            words = _vocabulary(rng)
+            partial = path + ".part"
+            write_pdf(partial, (PROFILES[profile](rng, words) for _ in range(pages)), pages)
+            os.replace(partial, path)
+        paths.append(path)
+    return paths
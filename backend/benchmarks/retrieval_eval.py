@@ -0,0 +1,573 @@
+"""
+Retrieval quality vs latency evaluation
+
+Replays chat retrieval (chunk -> embed -> vector search down the
+SEARCH_THRESHOLDS ladder -> context) over a labeled question -> page set and
+reports, per configuration:
+
+  recall@k    share of each question's labeled pages found in the returned chunks
+  MRR         mean reciprocal rank of the first chunk from a labeled page
+  empty       questions where every threshold came back empty (chat's "couldn't find" answer)
+  ctx tok     estimated prompt tokens of the retrieved context
+  steps       searches per question (threshold ladder fallbacks)
+  p50/p95     retrieval latency of all steps
+
+Swept: chunk size/overlap (--chunkers), TOP_K_RESULTS (--top-k), the
+threshold ladder (--ladders) and the search backend (--backends):
+
+  memory        exact cosine in this process (what a perfect index returns)
+  pg-exact      pgvector without an index (sequential scan)
+  ivfflat:L:P   pgvector ivfflat with lists=L and probes=P (production is ivfflat:100:1)
+  hnsw:EF       pgvector hnsw (m=16, ef_construction=64) with ef_search=EF
+
+The pg-* backends rebuild the chunk index, so they only run against the local
+stand-in (local_supabase/); seed it first so the index covers a realistic
+number of rows. Eval documents belong to a throwaway user deleted afterwards,
+and the production index is restored at the end.
+
+By default the labeled set is generated: PDFs of filler text with planted
+facts ("The melting point of Kavilo is 1520 kelvin.") and one question per
+fact, labeled with its page. --labels takes a set over your own PDFs:
+  {"documents": [{"pdf": "notes.pdf", "questions": [{"question": "...", "pages": [3]}]}]}
+(PDF paths are relative to the JSON file).
+
+Embeddings: --embedder openai uses the app's EmbeddingService (the real API,
+vectors cached under .cache/retrieval_eval); lexical is a local hashed
+bag-of-words model for offline runs. Its similarities are on another scale,
+so tune thresholds with the production model. The fake OpenAI server's hash
+embeddings carry no meaning and are no use here.
+
+Usage:
+  python -m benchmarks.retrieval_eval
+  python -m benchmarks.retrieval_eval --embedder openai --top-k 5,10,20 --ladders "0.4,0.2,0.1;0.3;0.2"
+  python -m benchmarks.retrieval_eval --backends memory,pg-exact,ivfflat:100:1,ivfflat:100:10,hnsw:40
+"""
+import argparse
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import operator
+import os
+import random
+import re
+import statistics
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from postgrest.types import ReturnMethod
+from app.core.auth import get_async_supabase_client, close_async_supabase_client
+from app.core.config import settings
+from app.services.llm_scheduler import estimate_tokens
+from app.services.pdf_extractor import PDFExtractor
+from benchmarks import pdf_corpus
+from benchmarks.offline_suite import percentile
+
+EVAL_DIR = ".cache/retrieval_eval"
+FIXTURE_VERSION = 1  # Bump when the generated set changes
+DIMENSIONS = 1536  # document_chunks.embedding is vector(1536)
+PAGE_PATTERN = re.compile(r"\[Page (\d+)\]")
+EVAL_USER_PREFIX = "retrieval-eval"
+PRODUCTION_BACKEND = "ivfflat:100:1"
+
+FILLER = (
+    "the a of and to in is that for on with as by this are from at be it an which these can also "
+    "students lecture chapter section review example method theory result model process system "
+    "analysis data study course notes topic concept principle structure function property sample "
+    "experiment measurement observation evidence approach framework context question answer problem "
+    "solution equation value range change rate effect cause factor condition pattern trend level "
+    "important general specific different common simple complex several many most other early later "
+    "shows describes explains suggests compares depends remains follows requires provides includes "
+    "often usually typically rarely generally further however therefore because although while"
+).split()
+FIRST_NAMES = ["Ada", "Bela", "Chen", "Dara", "Emil", "Farah", "Goran", "Hana", "Ivo", "Jun", "Kira", "Lena"]
+REGIONS = ["the northern highlands", "the coastal plains", "the river delta", "the eastern steppe", "the volcanic islands"]
+USES = ["water filtration", "battery electrodes", "crop fertiliser", "optical lenses", "heat shielding", "textile dyes"]
+# Attribute -> value generator; each planted fact is "The <attribute> of <entity> is <value>."
+ATTRIBUTES = {
+    "melting point": lambda rng: f"{rng.randint(300, 3500)} kelvin",
+    "boiling point": lambda rng: f"{rng.randint(400, 5000)} kelvin",
+    "density": lambda rng: f"{rng.uniform(0.5, 20):.2f} grams per cubic centimetre",
+    "half life": lambda rng: f"{rng.randint(2, 900)} days",
+    "year of discovery": lambda rng: str(rng.randint(1600, 2020)),
+    "discoverer": lambda rng: f"{rng.choice(FIRST_NAMES)} {_entity_name(rng)}",
+    "native region": lambda rng: rng.choice(REGIONS),
+    "primary use": lambda rng: rng.choice(USES),
+}
+QUESTION_TEMPLATES = [
+    "What is the {attribute} of {entity}?",
+    "Which {attribute} does {entity} have?",
+    "Tell me the {attribute} of {entity}.",
+    "{entity}: what is its {attribute}?",
+]
+STOPWORDS = set("the a an of and to in is that for on with as by this are from at be it which what does its me tell have".split())
+
+
+@dataclass
+class Question:
+    document: int
+    text: str
+    pages: List[int]
+    vector: List[float] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class LabeledSet:
+    names: List[str]
+    pages: List[List[str]]  # Extracted page texts per document
+    questions: List[Question]
+
+
+@dataclass
+class ChunkSet:
+    chunker: Tuple[int, int]
+    contents: List[str] = field(default_factory=list)
+    documents: List[int] = field(default_factory=list)
+    pages: List[Optional[int]] = field(default_factory=list)
+    vectors: List[List[float]] = field(default_factory=list, repr=False)
+
+
+def _entity_name(rng: random.Random) -> str:
+    return "".join(rng.choice(pdf_corpus.SYLLABLES) for _ in range(3)).capitalize()
+
+
+def _filler_sentence(rng: random.Random, entities: List[str]) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randint(8, 18))]
+    if rng.random() < 0.2:
+        # Entities also appear away from their facts, as in real notes
+        words.insert(rng.randrange(len(words)), rng.choice(entities))
+    return " ".join(words).capitalize() + "."
+
+
+def generate_fixture(directory: str, documents: int, pages: int, facts_per_page: int, seed: int) -> str:
+    """Write PDFs with planted facts and their labels.json (skipped if present); returns the labels path"""
+    directory = os.path.join(directory, f"fixture-v{FIXTURE_VERSION}-seed{seed}-{documents}x{pages}x{facts_per_page}")
+    labels_path = os.path.join(directory, "labels.json")
+    if os.path.exists(labels_path):
+        return labels_path
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    used_names = set()
+    labels = {"documents": []}
+
+    for d in range(documents):
+        entities = []
+        while len(entities) < max(2, pages * facts_per_page // len(ATTRIBUTES) + 1):
+            name = _entity_name(rng)
+            if name not in used_names:
+                used_names.add(name)
+                entities.append(name)
+        facts = [(entity, attribute) for entity in entities for attribute in ATTRIBUTES]
+        rng.shuffle(facts)
+
+        streams, questions = [], []
+        for page in range(1, pages + 1):
+            sentences = [_filler_sentence(rng, entities) for _ in range(rng.randint(30, 40))]
+            for _ in range(facts_per_page):
+                entity, attribute = facts.pop()
+                sentences.insert(
+                    rng.randrange(len(sentences) + 1),
+                    f"The {attribute} of {entity} is {ATTRIBUTES[attribute](rng)}."
+                )
+                template = rng.choice(QUESTION_TEMPLATES)
+                questions.append({"question": template.format(attribute=attribute, entity=entity), "pages": [page]})
+            streams.append(pdf_corpus.text_stream(" ".join(sentences)))
+
+        name = f"document_{d + 1:02d}.pdf"
+        pdf_corpus.write_pdf(os.path.join(directory, name), iter(streams), pages)
+        labels["documents"].append({"pdf": name, "questions": questions})
+
+    with open(labels_path, "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=2)
+    return labels_path
+
+
+def load_labels(path: str) -> LabeledSet:
+    with open(path, encoding="utf-8") as f:
+        labels = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    labeled = LabeledSet([], [], [])
+    for d, document in enumerate(labels["documents"]):
+        with open(os.path.join(base, document["pdf"]), "rb") as f:
+            pages = PDFExtractor.extract_text(f.read())["pages"]
+        labeled.names.append(document["pdf"])
+        labeled.pages.append(pages)
+        for q in document["questions"]:
+            labeled.questions.append(Question(d, q["question"], [int(p) for p in q["pages"]]))
+    return labeled
+
+
+def build_chunks(labeled: LabeledSet, chunker: Tuple[int, int]) -> ChunkSet:
+    """Chunk every document the way ingestion does; pages come from the "[Page N]" prefix"""
+    chunk_set = ChunkSet(chunker)
+    for d, pages in enumerate(labeled.pages):
+        for content in PDFExtractor.chunk_text(pages, chunk_size=chunker[0], overlap=chunker[1]):
+            match = PAGE_PATTERN.match(content)
+            chunk_set.contents.append(content)
+            chunk_set.documents.append(d)
+            chunk_set.pages.append(int(match.group(1)) if match else None)
+    return chunk_set
+
+
+class LexicalEmbedder:
+    """Hashed bag-of-words vectors (signed feature hashing, log term frequency)"""
+    name = "lexical"
+
+    @staticmethod
+    def vector(text: str) -> List[float]:
+        values = [0.0] * DIMENSIONS
+        counts = Counter(t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS)
+        for token, count in counts.items():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+            # Two signed slots per token, so one collision can't cancel a short query out
+            for h in (int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")):
+                values[h % DIMENSIONS] += (1 + math.log(count)) * (1 if (h >> 32) & 1 else -1)
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.vector(text) for text in texts]
+
+
+class OpenAIEmbedder:
+    """The app's EmbeddingService, with vectors cached on disk by text hash"""
+
+    def __init__(self, cache_dir: str):
+        from app.services.embedding_service import EmbeddingService
+        self.service = EmbeddingService()
+        self.name = self.service.model
+        self.cache_path = os.path.join(cache_dir, f"embeddings-{self.name}.jsonl")
+        self.cache: Dict[str, List[float]] = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.cache[entry["key"]] = entry["embedding"]
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        missing = list(dict.fromkeys(t for t in texts if self.key(t) not in self.cache))
+        if missing:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "a", encoding="utf-8") as f:
+                for i in range(0, len(missing), settings.EMBEDDING_BATCH_SIZE):
+                    batch = missing[i:i + settings.EMBEDDING_BATCH_SIZE]
+                    for text, embedding in zip(batch, await self.service.create_embeddings_batch(batch)):
+                        self.cache[self.key(text)] = embedding
+                        f.write(json.dumps({"key": self.key(text), "embedding": embedding}) + "\n")
+            print(f"🧮 Embedded {len(missing)} new texts ({self.service.tokens_used} tokens so far)")
+        return [self.cache[self.key(t)] for t in texts]
+
+
+class MemoryBackend:
+    """Exact cosine search over the chunk vectors (all unit length)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.chunk_set: Optional[ChunkSet] = None
+
+    async def load(self, chunk_set: ChunkSet, store: Optional["PgVectorStore"]):
+        self.chunk_set = chunk_set
+
+    async def search(self, vector: List[float], threshold: float, count: int) -> List[int]:
+        scored = (
+            (sum(map(operator.mul, vector, chunk_vector)), i)
+            for i, chunk_vector in enumerate(self.chunk_set.vectors)
+        )
+        return [i for similarity, i in heapq.nlargest(count, scored) if similarity > threshold]
+
+
+class PgVectorBackend:
+    """match_document_chunks on the local stand-in, with per-call probes / ef_search"""
+
+    def __init__(self, name: str, index: Tuple[str, int], probes: int = 1, ef_search: int = 40):
+        self.name = name
+        self.index = index
+        self.probes = probes
+        self.ef_search = ef_search
+        self.document_ids: List[str] = []
+        self.chunk_index: Dict[str, int] = {}
+
+    async def load(self, chunk_set: ChunkSet, store: Optional["PgVectorStore"]):
+        self.document_ids, self.chunk_index = store.loaded[chunk_set.chunker]
+
+    async def search(self, vector: List[float], threshold: float, count: int) -> List[int]:
+        client = await get_async_supabase_client()
+        result = await client.rpc("local_match_chunks", {
+            "query_embedding": vector,
+            "match_threshold": threshold,
+            "match_count": count,
+            "document_ids": self.document_ids,
+            "p_probes": self.probes,
+            "p_ef_search": self.ef_search
+        }).execute()
+        return [self.chunk_index[row["id"]] for row in result.data]
+
+
+class PgVectorStore:
+    """Eval documents and chunks in the stand-in under a throwaway user"""
+
+    def __init__(self, batch_size: int = 200):
+        self.batch_size = batch_size
+        self.user_id: Optional[str] = None
+        self.current_index: Optional[Tuple[str, int]] = None
+        # chunker -> (eval document ids, chunk id -> position in its ChunkSet)
+        self.loaded: Dict[Tuple[int, int], Tuple[List[str], Dict[str, int]]] = {}
+
+    async def start(self):
+        client = await get_async_supabase_client()
+        # Leftovers of an interrupted run
+        await client.rpc("local_reset_users", {"p_email_prefix": EVAL_USER_PREFIX}).execute()
+        users = (await client.rpc("local_seed_users", {"p_count": 1, "p_email_prefix": EVAL_USER_PREFIX}).execute()).data
+        self.user_id = users[0]["id"]
+
+    async def insert(self, table: str, rows: List[dict]):
+        client = await get_async_supabase_client()
+        for i in range(0, len(rows), self.batch_size):
+            await client.table(table).insert(rows[i:i + self.batch_size], returning=ReturnMethod.minimal).execute()
+
+    async def load(self, labeled: LabeledSet, chunk_set: ChunkSet):
+        size, overlap = chunk_set.chunker
+        document_ids = [str(uuid.uuid4()) for _ in labeled.names]
+        await self.insert("documents", [{
+            "id": document_ids[d],
+            "user_id": self.user_id,
+            "title": f"{name} ({size}/{overlap})",
+            "file_path": f"{self.user_id}/retrieval-eval-{d}.pdf",
+            "file_size": 0,
+            "page_count": len(labeled.pages[d]),
+            "status": "ready"
+        } for d, name in enumerate(labeled.names)])
+
+        chunk_ids = [str(uuid.uuid4()) for _ in chunk_set.contents]
+        rows = []
+        for i, content in enumerate(chunk_set.contents):
+            rows.append({
+                "id": chunk_ids[i],
+                "document_id": document_ids[chunk_set.documents[i]],
+                "chunk_index": i,
+                "content": content,
+                "embedding": chunk_set.vectors[i],
+                "metadata": {"chunk_index": i, "page": chunk_set.pages[i]}
+            })
+        await self.insert("document_chunks", rows)
+        self.loaded[chunk_set.chunker] = (document_ids, {chunk_id: i for i, chunk_id in enumerate(chunk_ids)})
+
+    async def use_index(self, index: Tuple[str, int]):
+        if index == self.current_index:
+            return
+        started = time.perf_counter()
+        client = await get_async_supabase_client()
+        await client.rpc("local_rebuild_chunk_index", {"p_method": index[0], "p_lists": index[1]}).execute()
+        self.current_index = index
+        print(f"🔧 Index {index[0]}{f' lists={index[1]}' if index[0] == 'ivfflat' else ''} "
+              f"built in {time.perf_counter() - started:.1f}s")
+
+    async def close(self):
+        client = await get_async_supabase_client()
+        try:
+            await self.use_index(("ivfflat", 100))
+        finally:
+            if self.user_id:
+                await client.rpc("local_reset_users", {"p_email_prefix": EVAL_USER_PREFIX}).execute()
+
+
+def parse_backend(spec: str):
+    parts = spec.split(":")
+    if parts[0] == "memory" and len(parts) == 1:
+        return MemoryBackend(spec)
+    if parts[0] == "pg-exact" and len(parts) == 1:
+        return PgVectorBackend(spec, ("none", 0))
+    if parts[0] == "ivfflat" and len(parts) == 3:
+        return PgVectorBackend(spec, ("ivfflat", int(parts[1])), probes=int(parts[2]))
+    if parts[0] == "hnsw" and len(parts) == 2:
+        return PgVectorBackend(spec, ("hnsw", 0), ef_search=int(parts[1]))
+    raise argparse.ArgumentTypeError(f"Unknown backend {spec!r} (memory, pg-exact, ivfflat:LISTS:PROBES, hnsw:EF_SEARCH)")
+
+
+def parse_chunkers(value: str) -> List[Tuple[int, int]]:
+    chunkers = []
+    for item in value.split(","):
+        size, overlap = item.split("/")
+        chunkers.append((int(size), int(overlap)))
+    return list(dict.fromkeys(chunkers))
+
+
+def parse_ladders(value: str) -> List[Tuple[float, ...]]:
+    return list(dict.fromkeys(tuple(float(t) for t in ladder.split(",")) for ladder in value.split(";")))
+
+
+async def evaluate(backend, chunk_set: ChunkSet, questions: List[Question], top_k: int, ladder: Tuple[float, ...]) -> dict:
+    recalls, reciprocal_ranks, tokens, steps, latencies = [], [], [], [], []
+    empty = 0
+    for question in questions:
+        started = time.perf_counter()
+        found: List[int] = []
+        for step, threshold in enumerate(ladder, 1):
+            found = await backend.search(question.vector, threshold, top_k)
+            if found:
+                break
+        latencies.append(time.perf_counter() - started)
+        steps.append(step)
+
+        relevant = [
+            chunk_set.documents[i] == question.document and chunk_set.pages[i] in question.pages
+            for i in found
+        ]
+        pages_found = {chunk_set.pages[i] for i, hit in zip(found, relevant) if hit}
+        recalls.append(len(pages_found) / len(question.pages))
+        reciprocal_ranks.append(next((1 / rank for rank, hit in enumerate(relevant, 1) if hit), 0.0))
+        if found:
+            # Same context block chat_query builds from the chunks
+            tokens.append(estimate_tokens(
+                "RELEVANT TEXT FROM DOCUMENTS:\n" + "\n\n".join(chunk_set.contents[i] for i in found)
+            ))
+        else:
+            empty += 1
+            tokens.append(0)
+
+    latencies.sort()
+    return {
+        "recall": statistics.fmean(recalls),
+        "mrr": statistics.fmean(reciprocal_ranks),
+        "empty": empty / len(questions),
+        "ctx_tokens": statistics.fmean(tokens),
+        "steps": statistics.fmean(steps),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000
+    }
+
+
+def mark_pareto(rows: List[dict], recall_margin: float = 0.05):
+    """Flag rows within recall_margin of their backend's best recall that no other row of the
+    backend beats on recall, context tokens and p50 at once"""
+    best = {}
+    for row in rows:
+        best[row["backend"]] = max(best.get(row["backend"], 0.0), row["recall"])
+    for row in rows:
+        row["pareto"] = row["recall"] >= best[row["backend"]] - recall_margin and not any(
+            other is not row and other["backend"] == row["backend"]
+            and other["recall"] >= row["recall"] and other["ctx_tokens"] <= row["ctx_tokens"]
+            and other["p50_ms"] <= row["p50_ms"]
+            and (other["recall"], -other["ctx_tokens"], -other["p50_ms"]) != (row["recall"], -row["ctx_tokens"], -row["p50_ms"])
+            for other in rows
+        )
+
+
+def print_rows(rows: List[dict], production: dict):
+    print(f"\n  {'backend':<16} {'chunker':>9} {'k':>3} {'ladder':<14} {'chunks':>6} "
+          f"{'recall@k':>8} {'MRR':>6} {'empty':>6} {'ctx tok':>8} {'steps':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in rows:
+        is_production = all(r[key] == value for key, value in production.items()) and r["backend"] in ("memory", PRODUCTION_BACKEND)
+        flag = ("*" if is_production else " ") + ("◆" if r["pareto"] else " ")
+        print(f"{flag}{r['backend']:<16} {r['chunker']:>9} {r['top_k']:>3} {r['ladder']:<14} {r['chunks']:>6} "
+              f"{r['recall']:>8.3f} {r['mrr']:>6.3f} {r['empty']:>6.1%} {r['ctx_tokens']:>8.0f} "
+              f"{r['steps']:>5.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+    print("\n* current settings   ◆ near-best recall, not beaten on recall, context tokens and p50 by another row of its backend")
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    labels_path = args.labels or generate_fixture(args.eval_dir, args.documents, args.pages, args.facts_per_page, args.seed)
+    labeled = load_labels(labels_path)
+    print(f"📚 {len(labeled.questions)} questions over {len(labeled.names)} documents "
+          f"({sum(len(p) for p in labeled.pages)} pages) from {labels_path}")
+
+    embedder = OpenAIEmbedder(args.eval_dir) if args.embedder == "openai" else LexicalEmbedder()
+    vectors = await embedder.embed([q.text for q in labeled.questions])
+    for question, vector in zip(labeled.questions, vectors):
+        question.vector = vector
+
+    chunk_sets = []
+    for chunker in args.chunkers:
+        chunk_set = build_chunks(labeled, chunker)
+        chunk_set.vectors = await embedder.embed(chunk_set.contents)
+        chunk_sets.append(chunk_set)
+        print(f"✂️ {chunker[0]}/{chunker[1]}: {len(chunk_set.contents)} chunks")
+
+    store = None
+    if any(isinstance(b, PgVectorBackend) for b in args.backends):
+        store = PgVectorStore()
+        await store.start()
+        for chunk_set in chunk_sets:
+            await store.load(labeled, chunk_set)
+
+    rows = []
+    try:
+        # Backends sharing an index run back to back so each index is built once
+        backends = sorted(args.backends, key=lambda b: (isinstance(b, PgVectorBackend), getattr(b, "index", ("",))))
+        for backend in backends:
+            if isinstance(backend, PgVectorBackend):
+                await store.use_index(backend.index)
+            for chunk_set in chunk_sets:
+                await backend.load(chunk_set, store)
+                for question in labeled.questions[:3]:
+                    await backend.search(question.vector, 0.0, 1)  # Warm-up (connections, caches)
+                for top_k in args.top_k:
+                    for ladder in args.ladders:
+                        row = {
+                            "backend": backend.name,
+                            "chunker": f"{chunk_set.chunker[0]}/{chunk_set.chunker[1]}",
+                            "top_k": top_k,
+                            "ladder": ">".join(f"{t:g}" for t in ladder),
+                            "chunks": len(chunk_set.contents),
+                            **await evaluate(backend, chunk_set, labeled.questions, top_k, ladder)
+                        }
+                        rows.append(row)
+                        print(f"   {row['backend']} {row['chunker']} k={top_k} {row['ladder']}: "
+                              f"recall@k {row['recall']:.3f}, p50 {row['p50_ms']:.2f} ms")
+    finally:
+        if store:
+            await store.close()
+    return rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_ladder = ",".join(f"{t:g}" for t in settings.SEARCH_THRESHOLDS)
+    parser.add_argument("--labels", help="Labeled set JSON (default: generated)")
+    parser.add_argument("--documents", type=int, default=4, help="Generated documents")
+    parser.add_argument("--pages", type=int, default=15, help="Pages per generated document")
+    parser.add_argument("--facts-per-page", type=int, default=2, help="Planted facts (questions) per page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embedder", choices=["lexical", "openai"], default="lexical")
+    parser.add_argument("--chunkers", type=parse_chunkers,
+                        default=parse_chunkers(f"{settings.CHUNK_SIZE}/{settings.CHUNK_OVERLAP},400/50,1200/150"),
+                        help="size/overlap pairs, e.g. 800/100,400/50")
+    parser.add_argument("--top-k", type=lambda v: list(dict.fromkeys(int(k) for k in v.split(","))),
+                        default=list(dict.fromkeys([5, 10, settings.TOP_K_RESULTS])))
+    parser.add_argument("--ladders", type=parse_ladders, default=parse_ladders(f"{default_ladder};0.3;0.2;0"),
+                        help="Threshold ladders separated by ';', e.g. \"0.4,0.2,0.1;0.3\"")
+    parser.add_argument("--backends", type=lambda v: [parse_backend(s) for s in v.split(",")],
+                        default=[MemoryBackend("memory")])
+    parser.add_argument("--eval-dir", default=EVAL_DIR, help="Generated set and embedding cache")
+    parser.add_argument("--json", dest="json_path", help="Also write the rows as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        rows = await run(args)
+    finally:
+        if any(isinstance(b, PgVectorBackend) for b in args.backends):
+            await close_async_supabase_client()
+
+    mark_pareto(rows)
+    production = {
+        "chunker": f"{settings.CHUNK_SIZE}/{settings.CHUNK_OVERLAP}",
+        "top_k": settings.TOP_K_RESULTS,
+        "ladder": ">".join(f"{t:g}" for t in settings.SEARCH_THRESHOLDS)
+    }
+    print_rows(rows, production)
+    print(f"\n✅ {len(rows)} configurations in {time.perf_counter() - started:.1f}s")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"embedder": args.embedder, "production": production, "rows": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,212 @@
+"""
+Cold-start budget for the API process
+
+Measures, each in fresh interpreters (median of --runs):
+
+  import    `import app.main` under python -X importtime, with the packages
+            and modules that cost the most
+  process   interpreter start + import, wall clock
+  ready     spawning uvicorn until GET /health answers 200
+  deferred  what the lazily imported SDKs cost on first use; startup no longer
+            pays for them, the first request that needs each one does
+
+and exits 1 when the median import or ready time is over its budget, or when
+one of LAZY_MODULES is imported by app.main again (e.g. a new top-level
+`import openai`). Budgets are machine-specific: set them from a run on the
+hardware you deploy to.
+
+Required settings missing from the environment get placeholders; nothing is
+contacted before /health answers.
+
+Usage:
+  python -m benchmarks.startup
+  python -m benchmarks.startup --runs 10 --import-budget-ms 800 --ready-budget-ms 2000 --json startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+import httpx
+from benchmarks.offline_suite import free_port
+
+# Imported on first use by the app (app.core.openai_client, app.core.auth, PDFExtractor, app.core.profiling)
+LAZY_MODULES = ["openai", "supabase", "postgrest", "storage3", "supabase_auth", "realtime", "jose", "PyPDF2", "pyinstrument"]
+# First-use imports timed for the "deferred" report
+DEFERRED_IMPORTS = ["openai", "supabase", "jose.jwt", "PyPDF2"]
+PLACEHOLDER_ENV = {
+    "OPENAI_API_KEY": "sk-startup-benchmark",
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_SERVICE_KEY": "startup-benchmark",
+    "SUPABASE_JWT_SECRET": "startup-benchmark",
+}
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+READY_TIMEOUT_SECONDS = 60
+DEFERRED_SCRIPT = """
+import importlib, json, sys, time
+import app.main
+costs = {}
+for name in sys.argv[1:]:
+    started = time.perf_counter()
+    importlib.import_module(name)
+    costs[name] = (time.perf_counter() - started) * 1000
+print(json.dumps(costs))
+"""
+
+
+def app_env() -> Dict[str, str]:
+    return {**PLACEHOLDER_ENV, **os.environ}
+
+
+def measure_import() -> dict:
+    """One `import app.main` under -X importtime: totals per package and module (ms)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=app_env(), capture_output=True, text=True
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{result.stderr[-2000:]}")
+
+    packages: Dict[str, float] = defaultdict(float)
+    modules: Dict[str, float] = {}
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        modules[name] = int(cumulative_us) / 1000
+        if name == "app.main":
+            total_ms = int(cumulative_us) / 1000
+    return {"import_ms": total_ms, "process_ms": process_ms, "packages": dict(packages), "modules": modules}
+
+
+def measure_ready() -> float:
+    """Milliseconds from spawning uvicorn to the first 200 from /health"""
+    port = free_port()
+    with tempfile.TemporaryFile() as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            env=app_env(), stdout=subprocess.DEVNULL, stderr=log
+        )
+        try:
+            with httpx.Client(timeout=1.0) as client:
+                while time.perf_counter() - started < READY_TIMEOUT_SECONDS:
+                    if process.poll() is not None:
+                        log.seek(0)
+                        raise RuntimeError(f"uvicorn exited with code {process.returncode}:\n"
+                                           f"{log.read().decode(errors='replace')[-2000:]}")
+                    try:
+                        if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                            return (time.perf_counter() - started) * 1000
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.01)
+            raise RuntimeError(f"/health did not answer within {READY_TIMEOUT_SECONDS}s")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def measure_deferred() -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", DEFERRED_SCRIPT, *DEFERRED_IMPORTS],
+        env=app_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Deferred imports failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_of(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """Per-key median; a key missing from a run counts as 0 there"""
+    keys = set().union(*runs)
+    return {key: statistics.median(run.get(key, 0.0) for run in runs) for key in keys}
+
+
+def top(values: Dict[str, float], count: int) -> List[tuple]:
+    return sorted(values.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=1000.0)
+    parser.add_argument("--ready-budget-ms", type=float, default=2500.0)
+    parser.add_argument("--top", type=int, default=12, help="Packages/modules listed in the report")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    ready = sorted(measure_ready() for _ in range(args.runs))
+    deferred = median_of([measure_deferred() for _ in range(max(1, args.runs // 2))])
+
+    import_ms = statistics.median(run["import_ms"] for run in imports)
+    process_ms = statistics.median(run["process_ms"] for run in imports)
+    ready_ms = statistics.median(ready)
+    packages = median_of([run["packages"] for run in imports])
+    modules = median_of([run["modules"] for run in imports])
+    eager = sorted({name for run in imports for name in run["modules"] if name.split(".")[0] in LAZY_MODULES})
+
+    print(f"📦 import app.main   {import_ms:>8.0f} ms  (budget {args.import_budget_ms:.0f} ms)")
+    print(f"   process           {process_ms:>8.0f} ms  (interpreter + import)")
+    print(f"🚀 ready (/health)   {ready_ms:>8.0f} ms  (budget {args.ready_budget_ms:.0f} ms, "
+          f"min {ready[0]:.0f}, max {ready[-1]:.0f})")
+
+    print(f"\n{'package (self time)':<40} {'ms':>8} {'share':>6}")
+    for name, ms in top(packages, args.top):
+        print(f"{name:<40} {ms:>8.1f} {ms / import_ms:>6.1%}")
+    print(f"\n{'module (cumulative)':<40} {'ms':>8}")
+    for name, ms in top({k: v for k, v in modules.items() if k != "app.main"}, args.top):
+        print(f"{name:<40} {ms:>8.1f}")
+    print(f"\n{'deferred to first use':<40} {'ms':>8}")
+    for name, ms in top(deferred, len(deferred)):
+        print(f"{name:<40} {ms:>8.1f}")
+
+    problems = []
+    if import_ms > args.import_budget_ms:
+        problems.append(f"import app.main {import_ms:.0f} ms > budget {args.import_budget_ms:.0f} ms")
+    if ready_ms > args.ready_budget_ms:
+        problems.append(f"ready {ready_ms:.0f} ms > budget {args.ready_budget_ms:.0f} ms")
+    if eager:
+        problems.append(f"lazy modules imported at startup: {', '.join(eager[:10])}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "runs": args.runs,
+                "import_ms": import_ms,
+                "process_ms": process_ms,
+                "ready_ms": ready_ms,
+                "ready_samples_ms": ready,
+                "packages_ms": packages,
+                "deferred_ms": deferred,
+                "eager_lazy_modules": eager,
+                "budgets": {"import_ms": args.import_budget_ms, "ready_ms": args.ready_budget_ms},
+                "problems": problems
+            }, f, indent=2)
+
+    if problems:
+        print("\n❌ Over budget:")
+        for problem in problems:
+            print(f"   {problem}")
+        sys.exit(1)
+    print("\n✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Local Supabase stand-in for performance testing
+
+docker-compose.yml runs Postgres with pgvector (initialised from
+setup_database.sql), PostgREST, a filesystem-backed storage shim and an nginx
+gateway that exposes them under Supabase's /rest/v1 and /storage/v1 paths, so
+get_supabase_client() and StorageService work unchanged against LOCAL_URL.
+Only the data plane is emulated: there is no /auth/v1, tokens are minted
+locally (see local_keys) and users are created by the seeder.
+
+  docker compose -f local_supabase/docker-compose.yml up -d
+  python -m local_supabase > .env.local-supabase   # SUPABASE_* settings
+  set -a; . ./.env.local-supabase; set +a           # (environment overrides .env)
+  python -m local_supabase.seed --users 10 --documents-per-user 20
+"""
+import time
+from typing import Dict
+from jose import jwt
+
+LOCAL_URL = "http://localhost:54321"
+# Development-only secret shared by PostgREST, the storage shim and the app
+LOCAL_JWT_SECRET = "local-supabase-jwt-secret-not-for-production"
+KEY_LIFETIME_SECONDS = 10 * 365 * 24 * 3600
+
+
+def local_keys() -> Dict[str, str]:
+    """anon and service_role API keys signed with LOCAL_JWT_SECRET"""
+    now = int(time.time())
+    return {
+        role: jwt.encode(
+            {"iss": "local-supabase", "role": role, "iat": now, "exp": now + KEY_LIFETIME_SECONDS},
+            LOCAL_JWT_SECRET,
+            algorithm="HS256"
+        )
+        for role in ("anon", "service_role")
+    }
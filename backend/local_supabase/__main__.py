@@ -0,0 +1,12 @@
+"""
+Print the settings that point the backend at the local stand-in
+
+  python -m local_supabase > .env.local-supabase
+"""
+from local_supabase import LOCAL_JWT_SECRET, LOCAL_URL, local_keys
+
+keys = local_keys()
+print(f"SUPABASE_URL={LOCAL_URL}")
+print(f"SUPABASE_KEY={keys['anon']}")
+print(f"SUPABASE_SERVICE_KEY={keys['service_role']}")
+print(f"SUPABASE_JWT_SECRET={LOCAL_JWT_SECRET}")
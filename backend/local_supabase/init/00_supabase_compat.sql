@@ -0,0 +1,53 @@
+-- ============================================
+-- Local Supabase stand-in: the parts of Supabase that setup_database.sql
+-- relies on (API roles, auth.users, auth.uid()). Runs before it.
+-- ============================================
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+-- API roles; PostgREST logs in as authenticator and switches to the JWT role
+CREATE ROLE anon NOLOGIN NOINHERIT;
+CREATE ROLE authenticated NOLOGIN NOINHERIT;
+CREATE ROLE service_role NOLOGIN NOINHERIT BYPASSRLS;
+CREATE ROLE authenticator LOGIN NOINHERIT PASSWORD 'postgres';
+GRANT anon, authenticated, service_role TO authenticator;
+
+-- Users (only what the foreign keys and the app need)
+CREATE SCHEMA auth;
+
+CREATE TABLE auth.users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email TEXT UNIQUE,
+    role TEXT NOT NULL DEFAULT 'authenticated',
+    raw_user_meta_data JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE FUNCTION auth.uid()
+RETURNS uuid
+LANGUAGE sql STABLE
+AS $$
+    SELECT nullif(
+        coalesce(
+            nullif(current_setting('request.jwt.claim.sub', true), ''),
+            nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'sub'
+        ),
+        ''
+    )::uuid;
+$$;
+
+CREATE FUNCTION auth.role()
+RETURNS text
+LANGUAGE sql STABLE
+AS $$
+    SELECT nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'role';
+$$;
+
+GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role;
+GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA auth TO anon, authenticated, service_role;
+
+-- Everything created in public by the setup scripts is reachable through the API
+GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO anon, authenticated, service_role;
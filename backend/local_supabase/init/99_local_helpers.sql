@@ -0,0 +1,111 @@
+-- ============================================
+-- Local-only helpers used by local_supabase/seed.py and
+-- benchmarks/retrieval_eval.py (service_role only).
+-- Never run these against a real project.
+-- ============================================
+
+-- Create synthetic users (auth is not exposed through the API)
+CREATE OR REPLACE FUNCTION local_seed_users(p_count int, p_email_prefix text)
+RETURNS TABLE (id uuid, email text)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public, auth
+AS $$
+    INSERT INTO auth.users (email)
+    SELECT p_email_prefix || '-' || gen_random_uuid() || '@example.com'
+    FROM generate_series(1, p_count)
+    RETURNING users.id, users.email;
+$$;
+
+-- Remove synthetic users; their rows go with them (ON DELETE CASCADE)
+CREATE OR REPLACE FUNCTION local_reset_users(p_email_prefix text)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, auth
+AS $$
+DECLARE
+    deleted_count int;
+BEGIN
+    DELETE FROM auth.users WHERE email LIKE p_email_prefix || '-%';
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$;
+
+-- The ivfflat index is created on an empty table by setup_database.sql; its
+-- lists must be rebuilt after a bulk load for realistic recall and plans
+CREATE OR REPLACE FUNCTION local_reindex_chunks()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REINDEX INDEX idx_chunks_embedding;
+    ANALYZE documents;
+    ANALYZE document_chunks;
+    ANALYZE chat_sessions;
+    ANALYZE chat_messages;
+END;
+$$;
+
+-- Recreate the chunk vector index with other parameters (retrieval eval):
+-- 'ivfflat' with p_lists, 'hnsw' with pgvector's defaults, or 'none' (exact scans)
+CREATE OR REPLACE FUNCTION local_rebuild_chunk_index(p_method text, p_lists int DEFAULT 100)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DROP INDEX IF EXISTS idx_chunks_embedding;
+    IF p_method = 'ivfflat' THEN
+        EXECUTE format(
+            'CREATE INDEX idx_chunks_embedding ON document_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = %s)',
+            p_lists
+        );
+    ELSIF p_method = 'hnsw' THEN
+        CREATE INDEX idx_chunks_embedding ON document_chunks USING hnsw (embedding vector_cosine_ops);
+    ELSIF p_method <> 'none' THEN
+        RAISE EXCEPTION 'Unknown index method: %', p_method;
+    END IF;
+    ANALYZE document_chunks;
+END;
+$$;
+
+-- match_document_chunks with the index search settings of one call
+-- (SET LOCAL lasts for the RPC's transaction only)
+CREATE OR REPLACE FUNCTION local_match_chunks(
+    query_embedding vector(1536),
+    match_threshold float,
+    match_count int,
+    document_ids uuid[],
+    p_probes int DEFAULT 1,
+    p_ef_search int DEFAULT 40
+)
+RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('ivfflat.probes', p_probes::text, true);
+    PERFORM set_config('hnsw.ef_search', p_ef_search::text, true);
+    RETURN QUERY SELECT * FROM match_document_chunks(query_embedding, match_threshold, match_count, document_ids);
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION local_seed_users(int, text) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION local_reset_users(text) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION local_reindex_chunks() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION local_rebuild_chunk_index(text, int) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION local_match_chunks(vector, float, int, uuid[], int, int) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION local_seed_users(int, text) TO service_role;
+GRANT EXECUTE ON FUNCTION local_reset_users(text) TO service_role;
+GRANT EXECUTE ON FUNCTION local_reindex_chunks() TO service_role;
+GRANT EXECUTE ON FUNCTION local_rebuild_chunk_index(text, int) TO service_role;
+GRANT EXECUTE ON FUNCTION local_match_chunks(vector, float, int, uuid[], int, int) TO service_role;
@@ -0,0 +1,201 @@
+"""
+Seed the local stand-in with a synthetic corpus
+
+Creates users, ready documents with chunks and embeddings, and chat history
+through the app's own Supabase client (so it also works against any
+PostgREST endpoint with the local helper functions installed). Text is
+generated from a seeded vocabulary, each document with its own topic words;
+embeddings are the same hash-derived vectors benchmarks.fake_openai returns,
+so retrieval against the fake server is deterministic. Documents have no
+stored PDF (ingestion benchmarks upload real files).
+
+Usage (with the SUPABASE_* settings from `python -m local_supabase`):
+  python -m local_supabase.seed --users 10 --documents-per-user 50 --chunks-per-document 200
+  python -m local_supabase.seed --reset           # drop everything seeded with the prefix
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+from postgrest.types import ReturnMethod
+from app.core.auth import get_async_supabase_client, close_async_supabase_client
+from app.core.config import settings
+from benchmarks.fake_openai import fake_embedding
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vi", "so", "de", "pa", "xo", "li", "em", "or", "un", "ba"]
+EMBEDDING_DIMENSIONS = 1536
+
+
+def build_vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def chunk_text(rng: random.Random, vocabulary: List[str], topic: List[str], chars: int) -> str:
+    """Sentences of common words with the document's topic words mixed in"""
+    sentences, length = [], 0
+    while length < chars:
+        words = [rng.choice(topic) if rng.random() < 0.25 else rng.choice(vocabulary) for _ in range(rng.randint(8, 18))]
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+class Seeder:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.vocabulary = build_vocabulary(self.rng, 5000)
+        self.semaphore = asyncio.Semaphore(args.concurrency)
+        self.rows_written = 0
+
+    async def insert(self, table: str, rows: List[dict]):
+        client = await get_async_supabase_client()
+        for i in range(0, len(rows), self.args.batch_size):
+            batch = rows[i:i + self.args.batch_size]
+            await client.table(table).insert(batch, returning=ReturnMethod.minimal).execute()
+            self.rows_written += len(batch)
+
+    async def create_users(self) -> List[dict]:
+        client = await get_async_supabase_client()
+        response = await client.rpc(
+            "local_seed_users",
+            {"p_count": self.args.users, "p_email_prefix": self.args.prefix}
+        ).execute()
+        return response.data
+
+    def document_rows(self, user_id: str, now: datetime) -> List[dict]:
+        rows = []
+        for i in range(self.args.documents_per_user):
+            chunks = self.args.chunks_per_document
+            pages = max(1, chunks // 3)
+            updated = now - timedelta(minutes=self.rng.randint(0, 60 * 24 * 90))
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "title": f"{' '.join(self.rng.sample(self.vocabulary, 3)).title()}.pdf",
+                "file_path": f"{user_id}/seed-{i}.pdf",
+                "file_size": pages * 60_000,
+                "page_count": pages,
+                "status": "ready",
+                "stage": "ready",
+                "pages_extracted": pages,
+                "chunks_total": chunks,
+                "chunks_embedded": chunks,
+                "chunks_stored": chunks,
+                "summary": chunk_text(self.rng, self.vocabulary, self.vocabulary[:50], 400),
+                "created_at": updated.isoformat(),
+                "updated_at": updated.isoformat()
+            })
+        return rows
+
+    def chunk_rows(self, document: dict) -> List[dict]:
+        topic = self.rng.sample(self.vocabulary, 30)
+        rows = []
+        for index in range(self.args.chunks_per_document):
+            content = chunk_text(self.rng, self.vocabulary, topic, settings.CHUNK_SIZE)
+            rows.append({
+                "document_id": document["id"],
+                "chunk_index": index,
+                "content": content,
+                "embedding": fake_embedding(content, EMBEDDING_DIMENSIONS),
+                "metadata": {"chunk_index": index, "page": index // 3 + 1}
+            })
+        return rows
+
+    def chat_rows(self, user_id: str, now: datetime):
+        sessions, messages = [], []
+        for _ in range(self.args.sessions_per_user):
+            session_id = str(uuid.uuid4())
+            started = now - timedelta(minutes=self.rng.randint(0, 60 * 24 * 30))
+            sessions.append({
+                "id": session_id,
+                "user_id": user_id,
+                "title": " ".join(self.rng.sample(self.vocabulary, 4)),
+                "created_at": started.isoformat(),
+                "updated_at": started.isoformat()
+            })
+            for m in range(self.args.messages_per_session):
+                messages.append({
+                    "session_id": session_id,
+                    "role": "user" if m % 2 == 0 else "assistant",
+                    "content": chunk_text(self.rng, self.vocabulary, self.vocabulary[:50], 120 if m % 2 == 0 else 600),
+                    "sources": [],
+                    "created_at": (started + timedelta(seconds=10 * m)).isoformat()
+                })
+        return sessions, messages
+
+    async def seed_chunks(self, document: dict):
+        # Generated inside the semaphore so only `concurrency` documents' rows are in memory
+        async with self.semaphore:
+            await self.insert("document_chunks", self.chunk_rows(document))
+
+    async def seed_user(self, user: dict, now: datetime) -> dict:
+        documents = self.document_rows(user["id"], now)
+        await self.insert("documents", documents)
+        await asyncio.gather(*[self.seed_chunks(document) for document in documents])
+
+        sessions, messages = self.chat_rows(user["id"], now)
+        await self.insert("chat_sessions", sessions)
+        await self.insert("chat_messages", messages)
+        return {"id": user["id"], "email": user["email"], "document_ids": [d["id"] for d in documents]}
+
+    async def run(self) -> List[dict]:
+        users = await self.create_users()
+        now = datetime.now(timezone.utc)
+        seeded = []
+        for user in users:
+            seeded.append(await self.seed_user(user, now))
+            print(f"🌱 [Seed] {len(seeded)}/{len(users)} users, {self.rows_written} rows")
+
+        client = await get_async_supabase_client()
+        print("🔧 [Seed] Rebuilding the vector index and statistics...")
+        await client.rpc("local_reindex_chunks", {}).execute()
+        return seeded
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--documents-per-user", type=int, default=20)
+    parser.add_argument("--chunks-per-document", type=int, default=60)
+    parser.add_argument("--sessions-per-user", type=int, default=10)
+    parser.add_argument("--messages-per-session", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per insert request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents whose chunks are inserted concurrently")
+    parser.add_argument("--prefix", default="seed", help="Email prefix of seeded users")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="local_supabase/data/seeded_users.json", help="Seeded user/document ids")
+    parser.add_argument("--reset", action="store_true", help="Delete users seeded with --prefix and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.reset:
+            client = await get_async_supabase_client()
+            deleted = (await client.rpc("local_reset_users", {"p_email_prefix": args.prefix}).execute()).data
+            print(f"🗑️ [Seed] Deleted {deleted} users and their data")
+            return
+
+        started = time.perf_counter()
+        seeder = Seeder(args)
+        users = await seeder.run()
+        print(f"✅ [Seed] {seeder.rows_written} rows in {time.perf_counter() - started:.1f}s")
+
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"users": users}, f, indent=2)
+        print(f"💾 [Seed] User and document ids written to {args.out}")
+    finally:
+        await close_async_supabase_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
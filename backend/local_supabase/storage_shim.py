@@ -0,0 +1,210 @@
+"""
+Filesystem-backed stand-in for Supabase Storage (/storage/v1)
+
+Implements the bucket and object endpoints the backend and storage3 use:
+create/list buckets, upload (streamed to disk), download (sendfile), list
+and remove objects. Objects live at STORAGE_ROOT/<bucket>/<path>. Requests
+must carry a JWT signed with JWT_SECRET, like the real service. Standalone
+(no app imports) so it can run in its own container:
+
+  JWT_SECRET=... STORAGE_ROOT=./local_supabase/data/storage \\
+      uvicorn storage_shim:app --app-dir local_supabase --port 5000
+"""
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse
+from jose import JWTError, jwt
+
+# Same default as local_supabase.LOCAL_JWT_SECRET
+JWT_SECRET = os.environ.get("JWT_SECRET", "local-supabase-jwt-secret-not-for-production")
+ROOT = Path(os.environ.get("STORAGE_ROOT", "./data/storage")).resolve()
+DEFAULT_BUCKETS = [b for b in os.environ.get("STORAGE_BUCKETS", "documents").split(",") if b]
+
+app = FastAPI(title="Local Storage")
+
+
+class StorageError(Exception):
+    def __init__(self, status: int, error: str, message: str):
+        self.status = status
+        self.error = error
+        self.message = message
+
+
+@app.exception_handler(StorageError)
+async def storage_error_handler(request: Request, exc: StorageError):
+    # Supabase Storage error body (storage3 reads statusCode/error/message)
+    return JSONResponse(
+        status_code=exc.status,
+        content={"statusCode": str(exc.status), "error": exc.error, "message": exc.message}
+    )
+
+
+@app.on_event("startup")
+async def create_default_buckets():
+    for bucket in DEFAULT_BUCKETS:
+        (ROOT / bucket).mkdir(parents=True, exist_ok=True)
+
+
+def _authorize(request: Request) -> dict:
+    header = request.headers.get("authorization", "")
+    token = header[7:] if header.lower().startswith("bearer ") else request.headers.get("apikey", "")
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=["HS256"], options={"verify_aud": False})
+    except JWTError:
+        raise StorageError(403, "Unauthorized", "Invalid JWT")
+
+
+def _bucket_dir(bucket: str) -> Path:
+    path = ROOT / bucket
+    if "/" in bucket or bucket in ("", ".", "..") or not path.is_dir():
+        raise StorageError(404, "Bucket not found", "Bucket not found")
+    return path
+
+
+def _object_path(bucket: str, name: str) -> Path:
+    base = _bucket_dir(bucket)
+    path = (base / name).resolve()
+    if base != path and base not in path.parents:
+        raise StorageError(400, "Invalid key", f"Invalid key: {name}")
+    return path
+
+
+def _bucket_info(path: Path) -> dict:
+    created = datetime.fromtimestamp(path.stat().st_ctime, timezone.utc).isoformat()
+    return {
+        "id": path.name, "name": path.name, "owner": "", "public": False,
+        "file_size_limit": None, "allowed_mime_types": None,
+        "created_at": created, "updated_at": created
+    }
+
+
+# Buckets
+
+@app.get("/storage/v1/bucket")
+async def list_buckets(request: Request):
+    _authorize(request)
+    return [_bucket_info(p) for p in sorted(ROOT.iterdir()) if p.is_dir()]
+
+
+@app.get("/storage/v1/bucket/{bucket}")
+async def get_bucket(bucket: str, request: Request):
+    _authorize(request)
+    return _bucket_info(_bucket_dir(bucket))
+
+
+@app.post("/storage/v1/bucket")
+async def create_bucket(request: Request):
+    _authorize(request)
+    body = await request.json()
+    name = body.get("id") or body.get("name")
+    if not name or "/" in name or name in (".", ".."):
+        raise StorageError(400, "Invalid bucket", "Invalid bucket name")
+    path = ROOT / name
+    if path.exists():
+        raise StorageError(409, "Duplicate", "The resource already exists")
+    path.mkdir(parents=True)
+    return {"name": name}
+
+
+# Objects
+
+# Declared before the upload route, which would otherwise match "list/<bucket>"
+@app.post("/storage/v1/object/list/{bucket}")
+async def list_objects(bucket: str, request: Request):
+    _authorize(request)
+    body = await request.json()
+    prefix: str = body.get("prefix", "") or ""
+    limit: int = body.get("limit", 100)
+    offset: int = body.get("offset", 0)
+    directory = _object_path(bucket, prefix) if prefix else _bucket_dir(bucket)
+    if not directory.is_dir():
+        return []
+
+    entries = sorted(p for p in directory.iterdir() if not p.name.startswith("."))
+    items = []
+    for p in entries[offset:offset + limit]:
+        stat = p.stat()
+        modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        items.append({
+            "name": p.name,
+            "id": None if p.is_dir() else p.name,
+            "updated_at": modified, "created_at": modified, "last_accessed_at": modified,
+            "metadata": None if p.is_dir() else {"size": stat.st_size, "mimetype": "application/octet-stream"}
+        })
+    return items
+
+
+async def _write_object(bucket: str, name: str, request: Request, upsert: bool) -> dict:
+    _authorize(request)
+    path = _object_path(bucket, name)
+    if path.exists() and not upsert:
+        raise StorageError(409, "Duplicate", "The resource already exists")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(partial, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+    return {"Id": str(uuid.uuid4()), "Key": f"{bucket}/{name}"}
+
+
+@app.post("/storage/v1/object/{bucket}/{name:path}")
+async def upload_object(bucket: str, name: str, request: Request):
+    upsert = request.headers.get("x-upsert", "false").lower() == "true"
+    return await _write_object(bucket, name, request, upsert)
+
+
+@app.put("/storage/v1/object/{bucket}/{name:path}")
+async def update_object(bucket: str, name: str, request: Request):
+    return await _write_object(bucket, name, request, upsert=True)
+
+
+def _read_object(bucket: str, name: str, request: Request) -> FileResponse:
+    _authorize(request)
+    path = _object_path(bucket, name)
+    if not path.is_file():
+        raise StorageError(404, "not_found", "Object not found")
+    return FileResponse(path, media_type="application/octet-stream")
+
+
+@app.get("/storage/v1/object/authenticated/{bucket}/{name:path}")
+async def download_authenticated(bucket: str, name: str, request: Request):
+    return _read_object(bucket, name, request)
+
+
+@app.get("/storage/v1/object/{bucket}/{name:path}")
+async def download_object(bucket: str, name: str, request: Request):
+    return _read_object(bucket, name, request)
+
+
+def _remove(bucket: str, name: str) -> Optional[dict]:
+    path = _object_path(bucket, name)
+    if not path.is_file():
+        return None
+    path.unlink()
+    return {"name": name, "bucket_id": bucket}
+
+
+@app.delete("/storage/v1/object/{bucket}")
+async def remove_objects(bucket: str, request: Request):
+    _authorize(request)
+    body = await request.json()
+    removed = [_remove(bucket, name) for name in body.get("prefixes", [])]
+    return [r for r in removed if r is not None]
+
+
+@app.delete("/storage/v1/object/{bucket}/{name:path}")
+async def remove_object(bucket: str, name: str, request: Request):
+    _authorize(request)
+    if _remove(bucket, name) is None:
+        raise StorageError(404, "not_found", "Object not found")
+    return {"message": "Successfully deleted"}
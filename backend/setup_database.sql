@@ -286,6 +286,119 @@ BEGIN
 END;
 $$;
 
+-- Step 7: Create Study Plan Task Update Function
+-- ============================================
+CREATE OR REPLACE FUNCTION update_study_plan_task(
+    p_plan_id uuid,
+    p_user_id uuid,
+    p_task_id text,
+    p_completed boolean,
+    p_day_number int DEFAULT NULL
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Fast path: plan.task_index maps task id -> [day position, task position]
+    UPDATE study_plans
+    SET plan = jsonb_set(
+        plan,
+        ARRAY[
+            'days', plan->'task_index'->p_task_id->>0,
+            'tasks', plan->'task_index'->p_task_id->>1,
+            'completed'
+        ],
+        to_jsonb(p_completed),
+        true
+    )
+    WHERE id = p_plan_id
+        AND user_id = p_user_id
+        AND plan->'task_index' ? p_task_id;
+
+    IF FOUND THEN
+        RETURN true;
+    END IF;
+
+    -- Legacy plans without an index: locate the task inside the same statement
+    UPDATE study_plans
+    SET plan = jsonb_set(
+        study_plans.plan,
+        ARRAY['days', (loc.day_pos - 1)::text, 'tasks', (loc.task_pos - 1)::text, 'completed'],
+        to_jsonb(p_completed),
+        true
+    )
+    FROM (
+        SELECT d.ord AS day_pos, t.ord AS task_pos
+        FROM study_plans s,
+            jsonb_array_elements(s.plan->'days') WITH ORDINALITY AS d(day, ord),
+            jsonb_array_elements(d.day->'tasks') WITH ORDINALITY AS t(task, ord)
+        WHERE s.id = p_plan_id
+            AND s.user_id = p_user_id
+            AND t.task->>'id' = p_task_id
+            AND (p_day_number IS NULL OR (d.day->>'day_number')::int = p_day_number)
+        ORDER BY d.ord, t.ord
+        LIMIT 1
+    ) loc
+    WHERE study_plans.id = p_plan_id
+        AND study_plans.user_id = p_user_id;
+
+    RETURN FOUND;
+END;
+$$;
+
+-- Step 8: Create Pagination Indexes
+-- ============================================
+CREATE INDEX IF NOT EXISTS documents_user_updated_idx
+    ON documents (user_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS chat_sessions_user_updated_idx
+    ON chat_sessions (user_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS notes_user_updated_idx
+    ON notes (user_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS study_plans_user_updated_idx
+    ON study_plans (user_id, updated_at DESC, id DESC);
+-- Step 9: Create Chat History Index
+-- ============================================
+CREATE INDEX IF NOT EXISTS chat_messages_session_created_idx
+    ON chat_messages (session_id, created_at, id);
+
+-- Step 10: Add Document Progress Counters
+-- ============================================
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS stage TEXT NOT NULL DEFAULT 'queued';
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS pages_extracted INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_total INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_embedded INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunks_stored INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS error_message TEXT;
+
+-- Step 11: Add Soft Delete for Documents
+-- ============================================
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS documents_deleted_at_idx
+    ON documents (deleted_at)
+    WHERE deleted_at IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION purge_document_chunks(
+    p_document_id uuid,
+    p_batch_size int
+)
+RETURNS int
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    deleted_count int;
+BEGIN
+    DELETE FROM document_chunks
+    WHERE id IN (
+        SELECT id FROM document_chunks
+        WHERE document_id = p_document_id
+        LIMIT p_batch_size
+    );
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$;
+
 -- ============================================
 -- Setup Complete! 
 -- Next: Create 'documents' storage bucket in Supabase Storage
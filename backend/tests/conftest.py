@@ -0,0 +1,12 @@
+"""
+Placeholder credentials so settings validate; tests never contact these services
+"""
+import os
+
+for name, value in {
+    "OPENAI_API_KEY": "sk-test",
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_SERVICE_KEY": "test",
+    "SUPABASE_JWT_SECRET": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,120 @@
+"""
+Ingestion pipeline: a failure after some batches were stored leaves no chunks behind
+"""
+import asyncio
+from contextlib import nullcontext
+import pytest
+from app.core.config import settings
+from app.repositories.chunks import ChunkRepository
+from app.routes import documents as pipeline
+from app.services.progress import DocumentProgress, get_progress_bus
+
+DOCUMENT_ID = "doc-1"
+PAGES = [f"[Page {i}] " + "word " * 300 for i in range(1, 5)]
+
+
+class FakeStorage:
+    def __init__(self, bucket):
+        pass
+
+    async def download_to_spool(self, path, max_size):
+        return nullcontext(), 1
+
+
+class FakeExtractor(pipeline.PDFExtractor):
+    def extract_text(self, pdf):
+        return {"text": "\n".join(PAGES), "pages": PAGES, "page_count": len(PAGES)}
+
+
+class FakeChunks(ChunkRepository):
+    """document_chunks table; the nth insert fails if asked (purge_document is the real one)"""
+    rows = []
+    fail_insert_on = None
+
+    def __init__(self):
+        self.inserts = 0
+
+    async def insert_many(self, records):
+        self.inserts += 1
+        if self.inserts == FakeChunks.fail_insert_on:
+            raise RuntimeError("insert failed")
+        FakeChunks.rows.extend(records)
+
+    async def purge_batch(self, document_id, batch_size):
+        matching = [r for r in FakeChunks.rows if r["document_id"] == document_id][:batch_size]
+        FakeChunks.rows = [r for r in FakeChunks.rows if r not in matching]
+        return len(matching)
+
+
+class FakeEmbeddings:
+    fail_on_batch = None
+
+    def __init__(self):
+        self.batches = 0
+        self.tokens_used = 0
+
+    async def create_embeddings_batch(self, texts, priority=None, user_id=None):
+        self.batches += 1
+        if self.batches == FakeEmbeddings.fail_on_batch:
+            raise RuntimeError("embedding failed")
+        return [[0.1] * 4 for _ in texts]
+
+
+class FakeSummary:
+    async def generate_summary(self, text, priority=None, user_id=None):
+        return "summary"
+
+
+class FakeDocuments:
+    async def update(self, document_id, data):
+        return data
+
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    FakeChunks.rows = []
+    FakeChunks.fail_insert_on = None
+    FakeEmbeddings.fail_on_batch = None
+    monkeypatch.setattr(pipeline, "StorageService", FakeStorage)
+    monkeypatch.setattr(pipeline, "PDFExtractor", FakeExtractor)
+    monkeypatch.setattr(pipeline, "ChunkRepository", FakeChunks)
+    monkeypatch.setattr(pipeline, "EmbeddingService", FakeEmbeddings)
+    monkeypatch.setattr(pipeline, "SummaryService", FakeSummary)
+    monkeypatch.setattr(pipeline, "DocumentRepository", FakeDocuments)
+    monkeypatch.setattr(pipeline, "mapped", lambda spool, size: nullcontext(b""))
+
+    async def no_save(self, extra=None):
+        pass
+    monkeypatch.setattr(DocumentProgress, "_save", no_save)
+    # Several embedding batches, each one insert
+    monkeypatch.setattr(settings, "CHUNK_SIZE", 400)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP", 0)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "CHUNK_DELETE_BATCH_SIZE", 1)
+
+
+def run_pipeline():
+    asyncio.run(pipeline.process_document_background(DOCUMENT_ID, "user/doc.pdf"))
+    return get_progress_bus().state(DOCUMENT_ID)
+
+
+def test_all_batches_stored(fake_services):
+    state = run_pipeline()
+    assert state["stage"] == "ready"
+    assert len(FakeChunks.rows) == state["chunks_total"] > 2
+    assert [r["chunk_index"] for r in FakeChunks.rows] == list(range(len(FakeChunks.rows)))
+
+
+def test_second_embedding_batch_failure_removes_stored_chunks(fake_services):
+    FakeEmbeddings.fail_on_batch = 2
+    state = run_pipeline()
+    assert state["stage"] == "failed"
+    assert "embedding failed" in state["error"]
+    assert FakeChunks.rows == []
+
+
+def test_second_insert_failure_removes_stored_chunks(fake_services):
+    FakeChunks.fail_insert_on = 2
+    state = run_pipeline()
+    assert state["stage"] == "failed"
+    assert FakeChunks.rows == []
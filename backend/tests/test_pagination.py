@@ -0,0 +1,33 @@
+"""
+Keyset cursors: round trip, and tampered cursors are a 400 before they reach a filter
+"""
+import base64
+import json
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import encode_cursor, parse_cursor
+
+ROW = {"updated_at": "2026-10-19T19:22:43.123456+00:00", "id": "6f1c1c1e-8a39-4d4e-9a0c-1b2c3d4e5f60"}
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    assert parse_cursor(encode_cursor(ROW)) == (ROW["updated_at"], ROW["id"])
+    assert parse_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor({"updated_at": ROW["updated_at"]}),
+    raw_cursor([ROW["updated_at"]]),
+    raw_cursor([1, 2]),
+    raw_cursor([ROW["updated_at"], "1),id.gt.0"]),
+    raw_cursor(['2026-01-01"),or(id.gt.0', ROW["id"]]),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        parse_cursor(cursor)
+    assert error.value.status_code == 400
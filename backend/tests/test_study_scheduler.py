@@ -0,0 +1,75 @@
+"""
+Study scheduler: every topic fits the days before the exam, or is reported
+"""
+from datetime import date
+from app.services.study_scheduler import (
+    MIN_SESSION_MINUTES, build_plan, build_schedule, replan
+)
+
+START = date(2026, 1, 5)
+
+
+def topics(count: int, hours: float = 2.0):
+    return [{"name": f"Topic {i}", "effort_hours": hours} for i in range(1, count + 1)]
+
+
+def scheduled_topics(days):
+    names = set()
+    for day in days:
+        for task in day["tasks"]:
+            names.update(task.get("topics") or ([task["topic"]] if task.get("topic") else []))
+    return names
+
+
+def assert_within_budget(days, hours_per_day):
+    for day in days:
+        assert sum(t["duration_minutes"] for t in day["tasks"]) <= hours_per_day * 60, day
+        assert all(t["duration_minutes"] >= MIN_SESSION_MINUTES for t in day["tasks"]), day
+
+
+def test_estimates_that_fit_are_kept():
+    days, unscheduled = build_schedule(topics(3, hours=1), START, 5, 2)
+    assert unscheduled == []
+    assert scheduled_topics(days) == {"Topic 1", "Topic 2", "Topic 3"}
+    study = [t for d in days for t in d["tasks"] if t.get("topic") == "Topic 1"]
+    assert sum(t["duration_minutes"] for t in study) == 60
+    assert_within_budget(days, 2)
+
+
+def test_over_capacity_topics_are_shortened_not_dropped():
+    # 10 topics x 2h over 2 study days of 1h: every topic gets at least one session
+    days, unscheduled = build_schedule(topics(10), START, 3, 1)
+    assert unscheduled == []
+    assert scheduled_topics(days) == {f"Topic {i}" for i in range(1, 11)}
+    assert_within_budget(days, 1)
+
+
+def test_minimum_sessions_exceeding_capacity_share_sessions():
+    # 20 topics need 20 x 15 min but 3 days at 1h/day leave 2 study days (8 slots)
+    days, unscheduled = build_schedule(topics(20), START, 3, 1)
+    assert unscheduled == []
+    assert len(scheduled_topics(days)) == 20
+    assert_within_budget(days, 1)
+
+
+def test_topics_that_cannot_fit_are_reported():
+    # 2 study days x 4 slots x 3 topics per shared session = 24 topics at most
+    plan = build_plan("Exam", topics(30), START, date(2026, 1, 8), 1)
+    assert plan["unscheduled_topics"] == [f"Topic {i}" for i in range(25, 31)]
+    assert len(scheduled_topics(plan["days"])) == 24
+    assert_within_budget(plan["days"], 1)
+
+
+def test_no_day_exceeds_budget_when_sessions_split():
+    days, unscheduled = build_schedule(topics(7, hours=1.6), START, 10, 1)
+    assert unscheduled == []
+    assert_within_budget(days, 1)
+
+
+def test_replan_credits_shared_sessions_and_reports_leftovers():
+    plan = build_plan("Exam", topics(20), START, date(2026, 1, 8), 1)
+    for task in plan["days"][0]["tasks"]:
+        task["completed"] = True
+    updated = replan(plan, date(2026, 1, 6), date(2026, 1, 8), 1)
+    assert "unscheduled_topics" in updated
+    assert_within_budget(updated["days"], 1)
@@ -9,18 +9,30 @@ import { formatDistanceToNow } from "date-fns"
 import { Loader2 } from "lucide-react"
 import { useAuth } from "@/hooks/use-auth" // Assuming this or supabase direct
 
+const PAGE_SIZE = 50
+
 export default function LibraryPage() {
-    const { getDocuments, deleteDocument, uploadDocument, loading } = useAPI()
+    const { getDocumentsPage, deleteDocument, uploadDocument, loading } = useAPI()
     const [documents, setDocuments] = useState<Document[]>([])
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
     const [searchQuery, setSearchQuery] = useState("")
 
     useEffect(() => {
         loadDocuments()
     }, [])
 
+    // First page; later pages are appended by "Load more"
     const loadDocuments = async () => {
-        const docs = await getDocuments()
-        setDocuments(docs)
+        const page = await getDocumentsPage(null, PAGE_SIZE)
+        setDocuments(page.items)
+        setNextCursor(page.nextCursor)
+    }
+
+    const loadMore = async () => {
+        if (!nextCursor) return
+        const page = await getDocumentsPage(nextCursor, PAGE_SIZE)
+        setDocuments(prev => [...prev, ...page.items])
+        setNextCursor(page.nextCursor)
     }
 
     const handleUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -111,7 +123,7 @@ export default function LibraryPage() {
                         </Card>
                     ))}
                 </div>
-            ) : (
+            ) : nextCursor ? null : (
                 /* Empty State */
                 <div className="p-16 border border-dashed border-zinc-300 bg-zinc-50 text-center">
                     <FaBook className="h-12 w-12 text-zinc-300 mx-auto mb-4" />
@@ -130,6 +142,14 @@ export default function LibraryPage() {
                     </div>
                 </div>
             )}
+
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <Button variant="outline" onClick={loadMore} disabled={loading} className="gap-2">
+                        {loading && <Loader2 className="h-3 w-3 animate-spin" />} LOAD MORE
+                    </Button>
+                </div>
+            )}
         </div>
     )
 }
@@ -37,7 +37,8 @@ export default function PlannerPage() {
             if (userPlans.length > 0) {
                 // Determine active plan (e.g., most recent active one)
                 // For MVP just taking the first one
-                setActivePlan(userPlans[0]);
+                // The list only has summaries; fetch the full plan
+                setActivePlan(await api.getPlan(userPlans[0].id, authToken));
             }
         } catch (e) {
             console.error(e);
@@ -116,7 +117,7 @@ export default function PlannerPage() {
                                             key={p.id}
                                             variant={activePlan.id === p.id ? "default" : "outline"}
                                             size="sm"
-                                            onClick={() => setActivePlan(p)}
+                                            onClick={async () => token && setActivePlan(await api.getPlan(p.id, token))}
                                         >
                                             {p.title || `Plan ${p.created_at.split('T')[0]}`}
                                         </Button>
@@ -144,7 +144,7 @@ export function UploadModal({ isOpen, onClose }: UploadModalProps) {
                                 <div className="text-center space-y-2">
                                     <p className="text-sm font-bold uppercase tracking-wide">Click to Upload PDF</p>
                                     <p className="text-xs text-zinc-500 max-w-[200px]">
-                                        Support for .PDF files. Max size 10MB.
+                                        Support for .PDF files. Max size 200MB.
                                     </p>
                                 </div>
                             </>
@@ -5,7 +5,7 @@
 
 import { useState } from 'react';
 import { supabase } from '@/lib/supabase';
-import { api, type Document, type ChatResponse } from '@/services/api';
+import { api, type Document, type ChatResponse, type Page } from '@/services/api';
 
 export function useAPI() {
     const [loading, setLoading] = useState(false);
@@ -51,6 +51,21 @@ export function useAPI() {
         }
     };
 
+    const getDocumentsPage = async (cursor: string | null = null, limit?: number): Promise<Page<Document>> => {
+        setLoading(true);
+        setError(null);
+        try {
+            const token = await getToken();
+            return await api.getDocumentsPage(token, cursor, limit);
+        } catch (err) {
+            const message = err instanceof Error ? err.message : 'Failed to fetch documents';
+            setError(message);
+            return { items: [], nextCursor: cursor };
+        } finally {
+            setLoading(false);
+        }
+    };
+
     const deleteDocument = async (documentId: string): Promise<boolean> => {
         setLoading(true);
         setError(null);
@@ -229,6 +244,7 @@ export function useAPI() {
         error,
         uploadDocument,
         getDocuments,
+        getDocumentsPage,
         getDocument,
         deleteDocument,
         chatQuery,
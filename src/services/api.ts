@@ -4,6 +4,14 @@
  */
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000/api';
+// List endpoints return one page at a time; the next page's cursor comes in this header
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+const LIST_PAGE_SIZE = 200;
+// Whole-list getters back pickers and lookups (planner form, notebook documents,
+// dashboard counts) that need every row, so they follow the cursor - but stop
+// after 1000 rows so one very large account can't stall a page on sequential fetches.
+// Views that show the list itself should page with the *Page getters instead.
+const MAX_LIST_PAGES = 5;
 
 export interface Document {
     id: string;
@@ -18,16 +26,51 @@ export interface Document {
     summary?: string;
 }
 
+export interface DocumentProgress {
+    document_id: string;
+    stage: string;
+    pages_extracted?: number | null;
+    chunks_total?: number;
+    chunks_embedded?: number;
+    chunks_stored?: number;
+    error?: string;
+}
+
+export interface SourceRef {
+    chunk_id: string;
+    similarity: number;
+    page?: number | null;
+}
+
+export interface SourceText {
+    chunk_id: string;
+    document_id: string;
+    chunk_index: number;
+    content: string;
+}
+
 export interface ChatMessage {
     role: 'user' | 'assistant';
     content: string;
-    sources?: Array<{ chunk_id: string; similarity: number }>;
+    sources?: SourceRef[];
 }
 
 export interface ChatResponse {
     session_id: string;
     message: string;
-    sources: Array<{ chunk_id: string; similarity: number }>;
+    sources: SourceRef[];
+}
+
+export interface Page<T> {
+    items: T[];
+    nextCursor: string | null;
+}
+
+export interface ChatHistory {
+    session: any;
+    messages: Array<ChatMessage & { id: string; created_at: string }>;
+    next_cursor: string | null;
+    has_more: boolean;
 }
 
 class APIClient {
@@ -37,6 +80,42 @@ class APIClient {
         };
     }
 
+    // One page of a list endpoint and the cursor for the next (null on the last page)
+    private async fetchPage<T = any>(
+        path: string,
+        token: string,
+        errorMessage: string,
+        cursor: string | null = null,
+        limit: number = LIST_PAGE_SIZE
+    ): Promise<Page<T>> {
+        const query = `?limit=${limit}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+        const response = await fetch(`${API_BASE_URL}${path}${query}`, {
+            headers: this.getAuthHeaders(token),
+        });
+
+        if (!response.ok) {
+            throw new Error(`${errorMessage}: ${response.statusText}`);
+        }
+
+        return { items: await response.json(), nextCursor: response.headers.get(NEXT_CURSOR_HEADER) };
+    }
+
+    // Follows X-Next-Cursor for up to MAX_LIST_PAGES pages
+    private async fetchAllPages<T = any>(path: string, token: string, errorMessage: string): Promise<T[]> {
+        const rows: T[] = [];
+        let cursor: string | null = null;
+        for (let pages = 0; pages < MAX_LIST_PAGES; pages++) {
+            const page: Page<T> = await this.fetchPage<T>(path, token, errorMessage, cursor);
+            rows.push(...page.items);
+            cursor = page.nextCursor;
+            if (!cursor) {
+                return rows;
+            }
+        }
+        console.warn(`${path}: showing the first ${rows.length} rows`);
+        return rows;
+    }
+
     // Documents
     async uploadDocument(file: File, token: string): Promise<Document> {
         const formData = new FormData();
@@ -56,27 +135,60 @@ class APIClient {
     }
 
     async getDocuments(token: string): Promise<Document[]> {
-        const response = await fetch(`${API_BASE_URL}/documents`, {
+        return this.fetchAllPages<Document>('/documents', token, 'Failed to fetch documents');
+    }
+
+    // Pass the previous page's nextCursor to continue
+    async getDocumentsPage(token: string, cursor: string | null = null, limit?: number): Promise<Page<Document>> {
+        return this.fetchPage<Document>('/documents', token, 'Failed to fetch documents', cursor, limit);
+    }
+
+    async getDocument(documentId: string, token: string): Promise<Document> {
+        const response = await fetch(`${API_BASE_URL}/documents/${documentId}`, {
             headers: this.getAuthHeaders(token),
         });
 
         if (!response.ok) {
-            throw new Error(`Failed to fetch documents: ${response.statusText}`);
+            throw new Error(`Failed to fetch document: ${response.statusText}`);
         }
 
         return response.json();
     }
 
-    async getDocument(documentId: string, token: string): Promise<Document> {
-        const response = await fetch(`${API_BASE_URL}/documents/${documentId}`, {
+    // Server-Sent Events over fetch (EventSource can't send the auth header).
+    // Resolves when processing finishes or the signal aborts.
+    async streamDocumentProgress(
+        documentId: string,
+        token: string,
+        onProgress: (progress: DocumentProgress) => void,
+        signal?: AbortSignal
+    ): Promise<void> {
+        const response = await fetch(`${API_BASE_URL}/documents/${documentId}/events`, {
             headers: this.getAuthHeaders(token),
+            signal,
         });
 
-        if (!response.ok) {
-            throw new Error(`Failed to fetch document: ${response.statusText}`);
+        if (!response.ok || !response.body) {
+            throw new Error(`Failed to stream document progress: ${response.statusText}`);
         }
 
-        return response.json();
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const data = frame.split('\n').find(line => line.startsWith('data: '));
+                if (data) onProgress(JSON.parse(data.slice(6)));
+            }
+        }
     }
 
     async deleteDocument(documentId: string, token: string): Promise<void> {
@@ -90,6 +202,23 @@ class APIClient {
         }
     }
 
+    async bulkDeleteDocuments(documentIds: string[], token: string): Promise<{ deleted: string[] }> {
+        const response = await fetch(`${API_BASE_URL}/documents/bulk-delete`, {
+            method: 'POST',
+            headers: {
+                ...this.getAuthHeaders(token),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ document_ids: documentIds }),
+        });
+
+        if (!response.ok) {
+            throw new Error(`Failed to delete documents: ${response.statusText}`);
+        }
+
+        return response.json();
+    }
+
     // Chat
     async chatQuery(
         documentIds: string[],
@@ -118,24 +247,35 @@ class APIClient {
     }
 
     async getChatSessions(token: string) {
-        const response = await fetch(`${API_BASE_URL}/chat/sessions`, {
+        return this.fetchAllPages('/chat/sessions', token, 'Failed to fetch chat sessions');
+    }
+
+    // Pass the previous next_cursor as `since` to fetch only newer messages
+    async getChatSession(sessionId: string, token: string, since?: string | null): Promise<ChatHistory> {
+        const query = since ? `?since=${encodeURIComponent(since)}` : '';
+        const response = await fetch(`${API_BASE_URL}/chat/sessions/${sessionId}${query}`, {
             headers: this.getAuthHeaders(token),
         });
 
         if (!response.ok) {
-            throw new Error(`Failed to fetch chat sessions: ${response.statusText}`);
+            throw new Error(`Failed to fetch chat session: ${response.statusText}`);
         }
 
         return response.json();
     }
 
-    async getChatSession(sessionId: string, token: string) {
-        const response = await fetch(`${API_BASE_URL}/chat/sessions/${sessionId}`, {
-            headers: this.getAuthHeaders(token),
+    async getSourceTexts(chunkIds: string[], token: string): Promise<SourceText[]> {
+        const response = await fetch(`${API_BASE_URL}/chat/sources`, {
+            method: 'POST',
+            headers: {
+                ...this.getAuthHeaders(token),
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ chunk_ids: chunkIds }),
         });
 
         if (!response.ok) {
-            throw new Error(`Failed to fetch chat session: ${response.statusText}`);
+            throw new Error(`Failed to fetch sources: ${response.statusText}`);
         }
 
         return response.json();
@@ -159,15 +299,7 @@ class APIClient {
     }
 
     async getNotes(token: string) {
-        const response = await fetch(`${API_BASE_URL}/notes`, {
-            headers: this.getAuthHeaders(token),
-        });
-
-        if (!response.ok) {
-            throw new Error(`Failed to fetch notes: ${response.statusText}`);
-        }
-
-        return response.json();
+        return this.fetchAllPages('/notes', token, 'Failed to fetch notes');
     }
 
     async generateQuiz(
@@ -244,12 +376,16 @@ class APIClient {
     }
 
     async getPlans(token: string) {
-        const response = await fetch(`${API_BASE_URL}/planner`, {
+        return this.fetchAllPages('/planner', token, 'Failed to fetch plans');
+    }
+
+    async getPlan(planId: string, token: string) {
+        const response = await fetch(`${API_BASE_URL}/planner/${planId}`, {
             headers: this.getAuthHeaders(token),
         });
 
         if (!response.ok) {
-            throw new Error(`Failed to fetch plans: ${response.statusText}`);
+            throw new Error(`Failed to fetch plan: ${response.statusText}`);
         }
 
         return response.json();
@@ -295,13 +431,7 @@ class APIClient {
     }
 
     async getNotebooks(token: string) {
-        const response = await fetch(`${API_BASE_URL}/notebooks`, {
-            headers: this.getAuthHeaders(token),
-        });
-        if (!response.ok) {
-            throw new Error(`Failed to fetch notebooks: ${response.statusText}`);
-        }
-        return response.json();
+        return this.fetchAllPages('/notebooks', token, 'Failed to fetch notebooks');
     }
 
     async updateNotebook(id: string, documentIds: string[], token: string) {